@@ -0,0 +1,151 @@
+"""
+VRChat Discord Uploader - 転送履歴検索のベンチマーク
+N件の履歴を持つDBに対して TransferRepository.query_records の
+各種条件（ページ送り・期間・圧縮・ワールド・全文検索）のレイテンシを計測する。
+最後に転送記録の追加時の変更通知（履歴ページが先頭に行を追加するのに使う）を検証する
+
+使い方:
+    python benchmarks/bench_history_query.py [--rows 500000] [--db FILE]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import threading
+from pathlib import Path
+from datetime import datetime, timedelta
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.db.models import TransferRecord
+from src.db.repository import TransferRepository
+from log_corpus import ASCII_NAMES, UNICODE_NAMES, WORLD_NAMES
+
+
+def populate(repository: TransferRepository, rows: int, seed: int = 0) -> None:
+    """履歴を直接挿入（トリガーで全文検索インデックスも更新される）"""
+    rng = random.Random(seed)
+    names = ASCII_NAMES + UNICODE_NAMES
+    start = datetime(2022, 1, 1).timestamp()
+    span = datetime(2026, 1, 1).timestamp() - start
+    
+    def generate():
+        for i in range(rows):
+            epoch = int(start + span * i / rows)
+            size = rng.randint(2_000_000, 15_000_000)
+            compressed = size > 10_000_000
+            users = rng.sample(names, rng.randint(0, 6))
+            yield (
+                f"VRChat_{datetime.fromtimestamp(epoch):%Y-%m-%d_%H-%M-%S}.{i % 1000:03d}_2560x1440.png",
+                f"C:/Users/user/Pictures/VRChat/{i}.png",
+                f"{rng.getrandbits(256):064x}",
+                size,
+                9_000_000 if compressed else None,
+                compressed,
+                rng.choice(WORLD_NAMES),
+                "\n".join(users) if users else None,
+                epoch,
+            )
+    
+    with repository.db.write() as conn:
+        conn.executemany("""
+            INSERT INTO transferred_images (
+                filename, file_path, file_hash, file_size_original, file_size_compressed,
+                was_compressed, world_name, instance_users, transferred_at_epoch
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, generate())
+        conn.execute("ANALYZE")
+    repository.rebuild_stats()
+
+
+def measure(label: str, func, repeat: int = 30) -> None:
+    func()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    p50 = samples[len(samples) // 2]
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    print(f"   {label:<28} p50 {p50:7.3f} ms  p95 {p95:7.3f} ms")
+
+
+def verify_notifications(repository: TransferRepository) -> bool:
+    """続けて追加した2件の変更通知が、それぞれ別のIDと転送日時を持っているか"""
+    received = []
+    done = threading.Event()
+    
+    def listener(record):
+        received.append(record)
+        if len(received) >= 2:
+            done.set()
+    
+    repository.add_listener(listener)
+    try:
+        suffix = time.time_ns()
+        futures = [
+            repository.add_record_async(TransferRecord(
+                filename=f"verify_{i}.png", file_path=f"/verify/{suffix}_{i}.png",
+                file_hash=f"verify_{suffix}_{i}"
+            ))
+            for i in range(2)
+        ]
+        added = all(future.result() for future in futures)
+        done.wait(5)
+    finally:
+        repository.remove_listener(listener)
+    
+    ids = [record.id if record else None for record in received]
+    ok = (
+        added and len(received) == 2 and None not in ids and len(set(ids)) == 2
+        and all(record.transferred_at for record in received)
+    )
+    print(f"   変更通知   {'OK' if ok else 'NG'}  (ID: {ids})")
+    return ok
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="転送履歴検索のベンチマーク")
+    arg_parser.add_argument("--rows", type=int, default=500_000)
+    arg_parser.add_argument("--db", type=Path, help="使用するDBファイル（存在すれば再利用）")
+    args = arg_parser.parse_args()
+    
+    db_path = args.db or Path(tempfile.mkdtemp(prefix="vrcu_bench_")) / "history.db"
+    exists = db_path.exists()
+    repository = TransferRepository(db_path)
+    if not exists:
+        print(f"履歴を作成中: {args.rows:,} 件 -> {db_path}")
+        start = time.perf_counter()
+        populate(repository, args.rows)
+        print(f"   {time.perf_counter() - start:.1f} s, {os.path.getsize(db_path) / 1024 / 1024:.1f} MB")
+    print(f"件数: {repository.get_total_count():,} (全文検索: {repository._search_tokenizer})")
+    
+    deep_cursor = None
+    for _ in range(20):
+        deep_cursor = repository.query_records(cursor=deep_cursor).next_cursor
+    
+    print("\n== query_records (50件/ページ)")
+    measure("最初のページ", lambda: repository.query_records())
+    measure("21ページ目", lambda: repository.query_records(cursor=deep_cursor))
+    measure("期間（1か月）", lambda: repository.query_records(
+        start=datetime(2024, 6, 1), end=datetime(2024, 7, 1)))
+    measure("圧縮のみ", lambda: repository.query_records(compressed=True))
+    measure("ワールド", lambda: repository.query_records(world_name=WORLD_NAMES[3]))
+    measure("全文検索（ワールド名）", lambda: repository.query_records(text="図書館"))
+    measure("全文検索（ユーザー名）", lambda: repository.query_records(text="ねこまた"))
+    measure("全文検索（2文字, LIKE）", lambda: repository.query_records(text="桜花"))
+    measure("全文検索＋期間", lambda: repository.query_records(
+        text="Movie", start=datetime(2025, 1, 1), end=datetime(2025, 2, 1)))
+    measure("ヒットしない検索", lambda: repository.query_records(text="存在しないワールド"))
+    measure("ワールド別集計", lambda: repository.get_world_counts())
+    
+    print("\n== 検証")
+    return 0 if verify_notifications(repository) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
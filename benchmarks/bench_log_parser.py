@@ -0,0 +1,253 @@
+"""
+VRChat Discord Uploader - VRChatLogParser ベンチマークスイート
+合成コーパス（log_corpus.py）に対して以下を計測し、スループット・
+レイテンシのパーセンタイル・メモリ使用量を表示する
+
+- 単発の過去時刻検索（mmap二分探索）
+- イベントストアへの取り込みと範囲クエリ
+- 複数時刻の一括解決
+- 最新ログの追従（追記分の読み込みと現在時刻の検索）
+
+使い方:
+    python benchmarks/bench_log_parser.py [--corpus DIR] [--files 2] [--size-mb 200]
+        [--lookups 200] [--batch 10000] [--verify 50] [--trace-memory] [--keep]
+
+生成したコーパスとDBは終了時に削除する（--keep で残す）
+"""
+import sys
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+from pathlib import Path
+from datetime import datetime, timedelta
+from typing import Callable, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.core.vrchat_log_parser import VRChatLogParser, SessionState, LogEvent, EVENT_ENTERING_ROOM
+from src.db.log_events import LogEventStore
+from log_corpus import CorpusSpec, generate_corpus, _Session
+from bench_log_scan import legacy_scan
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def percentiles(samples: List[float]) -> str:
+    """p50/p95/p99 をミリ秒で整形"""
+    ordered = sorted(samples)
+    
+    def pick(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+    
+    return f"p50 {pick(0.50):8.3f} ms  p95 {pick(0.95):8.3f} ms  p99 {pick(0.99):8.3f} ms"
+
+
+def peak_rss_mb() -> str:
+    """プロセスの最大RSS"""
+    if resource is None:
+        return "N/A"
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux は KiB, macOS は bytes
+    return f"{peak / 1024 / (1024 if sys.platform == 'darwin' else 1):.1f} MB"
+
+
+def run_section(title: str, func: Callable[[], None], trace_memory: bool) -> None:
+    """セクションを実行し、メモリ使用量を表示
+    
+    trace_memory=True の場合はPythonヒープのピークも計測する
+    （tracemallocの負荷で計測時間は数倍に膨らむ）。
+    """
+    print(f"\n== {title}")
+    if trace_memory:
+        tracemalloc.start()
+    func()
+    if trace_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"   heap peak {peak / 1024 / 1024:.1f} MB")
+    print(f"   process peak RSS {peak_rss_mb()}")
+
+
+def random_times(log_files: List[Tuple[Path, datetime, datetime]], count: int, rng: random.Random) -> List[datetime]:
+    """ログファイルの期間内のランダムな時刻"""
+    times = []
+    for _ in range(count):
+        _, start, end = rng.choice(log_files)
+        times.append(start + timedelta(seconds=rng.random() * (end - start).total_seconds()))
+    return times
+
+
+def reference_results(paths: List[Path], times: List[datetime], work_dir: Path) -> List[Tuple]:
+    """旧実装の走査結果から期待値を計算（検証用）"""
+    parser = VRChatLogParser(paths[0].parent, LogEventStore(work_dir / "ref.db"))
+    expected = []
+    events_by_file = {}
+    for target_time in times:
+        log_file = parser.find_log_file_for_time(target_time)
+        if log_file is None:
+            expected.append((None, []))
+            continue
+        if log_file not in events_by_file:
+            events_by_file[log_file] = legacy_scan(log_file)
+        state = SessionState()
+        for event in events_by_file[log_file]:
+            if event[0] > target_time:
+                break
+            state.apply(LogEvent(*event))
+        expected.append(state.snapshot())
+    return expected
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="VRChatLogParser ベンチマーク")
+    arg_parser.add_argument("--corpus", type=Path, help="既存のコーパスディレクトリ（省略時は生成）")
+    arg_parser.add_argument("--files", type=int, default=2)
+    arg_parser.add_argument("--size-mb", type=float, default=200.0, help="1ファイルあたりのサイズ")
+    arg_parser.add_argument("--lookups", type=int, default=200, help="単発検索の回数")
+    arg_parser.add_argument("--batch", type=int, default=10000, help="一括解決する時刻の数")
+    arg_parser.add_argument("--tail-mb", type=float, default=32.0, help="追従ベンチで追記する量")
+    arg_parser.add_argument("--verify", type=int, default=50, help="旧実装と突き合わせる時刻の数")
+    arg_parser.add_argument("--trace-memory", action="store_true",
+                            help="Pythonヒープのピークを計測する（計測時間は参考値になる）")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--keep", action="store_true", help="作業ディレクトリ（コーパス・DB）を残す")
+    args = arg_parser.parse_args()
+    
+    work_dir = Path(tempfile.mkdtemp(prefix="vrcu_bench_"))
+    try:
+        return run_benchmarks(args, work_dir)
+    finally:
+        if args.keep:
+            print(f"\n作業ディレクトリ: {work_dir}")
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def run_benchmarks(args: argparse.Namespace, work_dir: Path) -> int:
+    """work_dir にコーパス（--corpus 省略時）とDBを作って計測する"""
+    rng = random.Random(args.seed)
+    corpus_dir = args.corpus
+    if corpus_dir is None:
+        corpus_dir = work_dir / "logs"
+        print(f"コーパスを生成中: {args.files} x {args.size_mb} MB -> {corpus_dir}")
+        start = time.perf_counter()
+        generate_corpus(corpus_dir, CorpusSpec(files=args.files, size_mb=args.size_mb, seed=args.seed))
+        print(f"   {time.perf_counter() - start:.1f} s")
+    
+    parser = VRChatLogParser(corpus_dir, LogEventStore(work_dir / "events.db"))
+    log_files = []
+    for path, start_time in reversed(parser.get_log_files()):
+        last_time = max(event.time for event in parser.scan_events(path.read_bytes()[-1024 * 1024:]))
+        log_files.append((path, start_time, last_time))
+    total_bytes = sum(path.stat().st_size for path, _, _ in log_files)
+    print(f"コーパス: {len(log_files)} ファイル, {total_bytes / 1024 / 1024:.1f} MB")
+    
+    def single_lookups():
+        times = random_times(log_files, args.lookups, rng)
+        cold, warm = [], []
+        for target_time in times:
+            log_file = parser.find_log_file_for_time(target_time)
+            start = time.perf_counter()
+            parser._read_state_at(log_file, target_time)
+            cold.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            parser._read_state_at(log_file, target_time)
+            warm.append(time.perf_counter() - start)
+        print(f"   1回目      {percentiles(cold)}")
+        print(f"   2回目      {percentiles(warm)}  (チェックポイント利用)")
+    
+    def store_lookups():
+        start = time.perf_counter()
+        parser.ingest_logs()
+        elapsed = time.perf_counter() - start
+        print(f"   取り込み   {elapsed:8.3f} s  {total_bytes / 1024 / 1024 / elapsed:8.1f} MB/s")
+        start = time.perf_counter()
+        parser.ingest_logs()
+        print(f"   差分なし   {(time.perf_counter() - start) * 1000:8.3f} ms")
+        samples = []
+        for target_time in random_times(log_files, args.lookups, rng):
+            start = time.perf_counter()
+            parser.event_store.get_session_events(target_time, EVENT_ENTERING_ROOM)
+            samples.append(time.perf_counter() - start)
+        print(f"   範囲クエリ {percentiles(samples)}")
+    
+    def batch_lookups():
+        times = random_times(log_files, args.batch, rng)
+        start = time.perf_counter()
+        parser.get_world_and_users_at_times(times)
+        elapsed = time.perf_counter() - start
+        print(f"   {len(times)} 件  {elapsed:8.3f} s  ({elapsed / len(times) * 1e6:.1f} us/件, "
+              f"{total_bytes / 1024 / 1024 / elapsed:.1f} MB/s 相当)")
+    
+    def live_tailing():
+        tail_dir = work_dir / "tail"
+        tail_dir.mkdir(exist_ok=True)
+        tail_parser = VRChatLogParser(tail_dir, LogEventStore(work_dir / "tail.db"))
+        now = datetime(2026, 6, 1, 12, 0, 0)
+        log_file = tail_dir / f"output_log_{now.strftime('%Y-%m-%d_%H-%M-%S')}.txt"
+        session = _Session(CorpusSpec(seed=args.seed), random.Random(args.seed))
+        poll_samples, lookup_samples = [], []
+        appended = 0
+        target = int(args.tail_mb * 1024 * 1024)
+        n = 0
+        with open(log_file, "w", encoding="utf-8", newline="\n") as f:
+            while appended < target:
+                # 約256KBずつ追記してから追従
+                lines = []
+                size = 0
+                while size < 256 * 1024:
+                    now += timedelta(milliseconds=rng.randint(1, 150))
+                    stamp = now.strftime("%Y.%m.%d %H:%M:%S")
+                    for line in session.next_lines(n):
+                        text = f"{stamp} {line}\n\n"
+                        lines.append(text)
+                        size += len(text.encode("utf-8"))
+                    n += 1
+                f.write("".join(lines))
+                f.flush()
+                appended += size
+                
+                start = time.perf_counter()
+                tail_parser.tailer.poll()
+                poll_samples.append(time.perf_counter() - start)
+                start = time.perf_counter()
+                tail_parser.tailer.lookup(now)
+                lookup_samples.append(time.perf_counter() - start)
+        print(f"   追記読込   {percentiles(poll_samples)}  "
+              f"({appended / 1024 / 1024 / sum(poll_samples):.1f} MB/s)")
+        print(f"   現在時刻   {percentiles(lookup_samples)}")
+    
+    run_section("単発検索（mmap二分探索）", single_lookups, args.trace_memory)
+    run_section("イベントストア", store_lookups, args.trace_memory)
+    run_section("一括解決", batch_lookups, args.trace_memory)
+    run_section("最新ログの追従", live_tailing, args.trace_memory)
+    
+    if args.verify:
+        print(f"\n== 検証（旧実装と {args.verify} 件を比較）")
+        times = random_times(log_files, args.verify, rng)
+        expected = reference_results([path for path, _, _ in log_files], times, work_dir)
+        mmap_results = [
+            parser._read_state_at(parser.find_log_file_for_time(t), t).snapshot() for t in times
+        ]
+        batch_results = parser.get_world_and_users_at_times(times)
+        store_results = []
+        for target_time in times:
+            state = SessionState()
+            for event in parser.event_store.get_session_events(target_time, EVENT_ENTERING_ROOM) or []:
+                state.apply(LogEvent(*event))
+            store_results.append(state.snapshot())
+        for label, results in (("mmap", mmap_results), ("batch", batch_results), ("store", store_results)):
+            mismatches = sum(1 for a, b in zip(results, expected) if a != b)
+            print(f"   {label:<6} {'OK' if mismatches == 0 else f'{mismatches} 件不一致'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
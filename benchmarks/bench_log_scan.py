@@ -0,0 +1,130 @@
+"""
+VRChat Discord Uploader - ログ走査ベンチマーク
+旧実装（行ごとのデコード＋3つの正規表現＋strptime）と
+バイト列走査エンジン（VRChatLogParser.iter_log_events）のスループットを比較
+
+使い方:
+    python benchmarks/bench_log_scan.py [--size-mb 200] [--log FILE]
+"""
+import re
+import sys
+import time
+import random
+import argparse
+import tempfile
+from pathlib import Path
+from datetime import datetime, timedelta
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.core.vrchat_log_parser import (
+    VRChatLogParser, EVENT_ENTERING_ROOM, EVENT_PLAYER_JOINED, EVENT_PLAYER_LEFT
+)
+from src.db.log_events import LogEventStore
+
+# 旧実装のパターン
+LEGACY_ENTERING_ROOM_PATTERN = re.compile(
+    r"(\d{4}\.\d{2}\.\d{2} \d{2}:\d{2}:\d{2}) Debug\s+-\s+\[Behaviour\] Entering Room: (.+)"
+)
+LEGACY_PLAYER_JOINED_PATTERN = re.compile(
+    r"(\d{4}\.\d{2}\.\d{2} \d{2}:\d{2}:\d{2}) Debug\s+-\s+\[Behaviour\] OnPlayerJoined (.+) \(usr_[a-zA-Z0-9-]+\)"
+)
+LEGACY_PLAYER_LEFT_PATTERN = re.compile(
+    r"(\d{4}\.\d{2}\.\d{2} \d{2}:\d{2}:\d{2}) Debug\s+-\s+\[Behaviour\] OnPlayerLeft (.+) \(usr_[a-zA-Z0-9-]+\)"
+)
+
+
+def legacy_scan(log_file: Path) -> list:
+    """旧実装と同じ方法でイベントを抽出"""
+    events = []
+    with open(log_file, "r", encoding="utf-8", errors="ignore") as f:
+        for line in f:
+            stripped_line = line.strip()
+            if not stripped_line.startswith("20") or "Debug" not in stripped_line:
+                continue
+            for pattern, kind in (
+                (LEGACY_ENTERING_ROOM_PATTERN, EVENT_ENTERING_ROOM),
+                (LEGACY_PLAYER_JOINED_PATTERN, EVENT_PLAYER_JOINED),
+                (LEGACY_PLAYER_LEFT_PATTERN, EVENT_PLAYER_LEFT),
+            ):
+                match = pattern.match(stripped_line)
+                if match:
+                    try:
+                        log_time = datetime.strptime(match.group(1), "%Y.%m.%d %H:%M:%S")
+                    except ValueError:
+                        break
+                    events.append((log_time, kind, match.group(2)))
+                    break
+    return events
+
+
+def engine_scan(parser: VRChatLogParser, log_file: Path) -> list:
+    """バイト列走査エンジンでイベントを抽出"""
+    events = []
+    for chunk_events, _ in parser.iter_log_events(log_file):
+        events.extend(tuple(event) for event in chunk_events)
+    return events
+
+
+def write_sample_log(path: Path, size_mb: int) -> None:
+    """ノイズ行が大半を占めるサンプルログを書き出す"""
+    random.seed(0)
+    now = datetime(2026, 1, 1)
+    target = size_mb * 1024 * 1024
+    written = 0
+    with open(path, "w", encoding="utf-8") as f:
+        while written < target:
+            now += timedelta(milliseconds=random.randint(1, 200))
+            stamp = now.strftime("%Y.%m.%d %H:%M:%S")
+            r = random.random()
+            if r < 0.001:
+                line = f"{stamp} Debug      -  [Behaviour] Entering Room: ワールド {random.randint(0, 999)}\n"
+            elif r < 0.006:
+                line = f"{stamp} Debug      -  [Behaviour] OnPlayerJoined ユーザー{random.randint(0, 80)} (usr_{random.randint(0, 10**8):08x})\n"
+            elif r < 0.010:
+                line = f"{stamp} Debug      -  [Behaviour] OnPlayerLeft ユーザー{random.randint(0, 80)} (usr_{random.randint(0, 10**8):08x})\n"
+            elif r < 0.030:
+                line = f"{stamp} Debug      -  [Behaviour] Restoring player state for avatar {random.random()}\n"
+            else:
+                line = f"{stamp} Log        -  [Network] Processing {random.randint(0, 10**6)} bytes of unrelated payload data\n"
+            f.write(line)
+            written += len(line.encode("utf-8"))
+
+
+def measure(label: str, func, size_bytes: int) -> list:
+    """関数を実行してスループットを表示"""
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<12} {elapsed:8.3f} s  {size_bytes / 1024 / 1024 / elapsed:8.1f} MB/s  ({len(result)} events)")
+    return result
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="VRChatログ走査ベンチマーク")
+    arg_parser.add_argument("--size-mb", type=int, default=200, help="生成するサンプルログのサイズ")
+    arg_parser.add_argument("--log", type=Path, help="既存のログファイルを使用する")
+    args = arg_parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        log_file = args.log
+        if log_file is None:
+            log_file = Path(temp_dir) / "output_log_2026-01-01_00-00-00.txt"
+            print(f"サンプルログを生成中 ({args.size_mb} MB)...")
+            write_sample_log(log_file, args.size_mb)
+        
+        size_bytes = log_file.stat().st_size
+        parser = VRChatLogParser(log_file.parent, LogEventStore(Path(temp_dir) / "events.db"))
+        
+        legacy = measure("legacy", lambda: legacy_scan(log_file), size_bytes)
+        engine = measure("engine", lambda: engine_scan(parser, log_file), size_bytes)
+        
+        if legacy != engine:
+            print("警告: 抽出結果が一致しません")
+            return 1
+        print("抽出結果は一致しました")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+"""
+VRChat Discord Uploader - スキーママイグレーションのベンチマーク
+バージョン0（マイグレーション導入前）のスキーマでN件の履歴を持つDBを作成し、
+マイグレーションの所要時間と、期間検索のクエリ時間の変化を計測する
+
+使い方:
+    python benchmarks/bench_migrations.py [--rows 1000000] [--db FILE]
+"""
+import os
+import sys
+import time
+import random
+import sqlite3
+import argparse
+import tempfile
+from pathlib import Path
+from datetime import datetime, timedelta
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.db.connection import ConnectionManager
+from src.db.migrations import run_migrations, get_schema_version
+from src.db.models import _create_schema, init_database
+
+
+def create_legacy_database(db_path: Path, rows: int, seed: int = 0) -> None:
+    """バージョン0のスキーマで履歴を生成"""
+    rng = random.Random(seed)
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute("PRAGMA journal_mode = WAL")
+        _create_schema(conn.cursor())
+        start = datetime(2022, 1, 1)
+        span = (datetime(2026, 1, 1) - start).total_seconds()
+        
+        def generate():
+            for i in range(rows):
+                ts = start + timedelta(seconds=span * i / rows + rng.random())
+                size = rng.randint(2_000_000, 15_000_000)
+                compressed = size > 10_000_000
+                yield (
+                    f"VRChat_{ts:%Y-%m-%d_%H-%M-%S}.{i % 1000:03d}_2560x1440.png",
+                    f"C:/Users/user/Pictures/VRChat/{ts:%Y-%m}/{i}.png",
+                    f"{rng.getrandbits(256):064x}",
+                    size,
+                    9_000_000 if compressed else None,
+                    ts.strftime("%Y-%m-%d %H:%M:%S"),
+                    str(rng.getrandbits(60)),
+                    compressed,
+                )
+        
+        conn.executemany("""
+            INSERT INTO transferred_images (
+                filename, file_path, file_hash, file_size_original, file_size_compressed,
+                transferred_at, discord_message_id, was_compressed
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, generate())
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def time_query(conn: sqlite3.Connection, sql: str, params: tuple, repeat: int = 20) -> float:
+    """クエリの平均時間（ミリ秒）"""
+    conn.execute(sql, params).fetchall()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        conn.execute(sql, params).fetchall()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="スキーママイグレーションのベンチマーク")
+    arg_parser.add_argument("--rows", type=int, default=1_000_000)
+    arg_parser.add_argument("--db", type=Path, help="作成するDBファイル（省略時は一時ディレクトリ）")
+    args = arg_parser.parse_args()
+    
+    db_path = args.db or Path(tempfile.mkdtemp(prefix="vrcu_bench_")) / "history.db"
+    if db_path.exists():
+        db_path.unlink()
+    
+    print(f"バージョン0のDBを作成中: {args.rows:,} 件 -> {db_path}")
+    start = time.perf_counter()
+    create_legacy_database(db_path, args.rows)
+    print(f"   {time.perf_counter() - start:.1f} s, {os.path.getsize(db_path) / 1024 / 1024:.1f} MB")
+    
+    month_start, month_end = datetime(2025, 6, 1), datetime(2025, 7, 1)
+    conn = sqlite3.connect(db_path)
+    legacy_range = time_query(conn, """
+        SELECT COUNT(*) FROM transferred_images
+        WHERE transferred_at >= ? AND transferred_at < ?
+    """, (month_start.strftime("%Y-%m-%d %H:%M:%S"), month_end.strftime("%Y-%m-%d %H:%M:%S")))
+    legacy_recent = time_query(conn, """
+        SELECT id, filename, file_size_original, file_size_compressed, was_compressed
+        FROM transferred_images ORDER BY transferred_at DESC LIMIT 50
+    """, ())
+    conn.close()
+    
+    db = ConnectionManager(db_path)
+    print(f"\n== マイグレーション (user_version {get_schema_version(db.reader())} から)")
+    start = time.perf_counter()
+    applied = run_migrations(db)
+    elapsed = time.perf_counter() - start
+    print(f"   {applied} 件適用  {elapsed:.2f} s  ({args.rows / elapsed:,.0f} 行/s)")
+    print(f"   user_version {get_schema_version(db.reader())}")
+    
+    start = time.perf_counter()
+    init_database(db)
+    print(f"   init_database（統計の再集計を含む） {time.perf_counter() - start:.2f} s")
+    start = time.perf_counter()
+    init_database(db)
+    print(f"   2回目の init_database {(time.perf_counter() - start) * 1000:.1f} ms")
+    # 再起動でインデックスが作り直されていないことを確認できるよう一覧を出す
+    indexes = [row[0] for row in db.reader().execute(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'transferred_images'"
+        " AND name NOT LIKE 'sqlite_%' ORDER BY name"
+    )]
+    print(f"   インデックス: {', '.join(indexes)}")
+    db.close()
+    
+    conn = sqlite3.connect(db_path)
+    epoch_range = time_query(conn, """
+        SELECT COUNT(*) FROM transferred_images
+        WHERE transferred_at_epoch >= ? AND transferred_at_epoch < ?
+    """, (int(month_start.timestamp()), int(month_end.timestamp())))
+    epoch_recent = time_query(conn, """
+        SELECT id, filename, file_size_original, file_size_compressed, was_compressed
+        FROM transferred_images ORDER BY transferred_at_epoch DESC, id DESC LIMIT 50
+    """, ())
+    conn.close()
+    
+    print("\n== クエリ（平均）")
+    print(f"   1か月の件数      旧 {legacy_range:8.3f} ms  ->  新 {epoch_range:8.3f} ms")
+    print(f"   最近の50件       旧 {legacy_recent:8.3f} ms  ->  新 {epoch_recent:8.3f} ms")
+    print(f"\nDBサイズ: {os.path.getsize(db_path) / 1024 / 1024:.1f} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
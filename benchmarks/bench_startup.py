@@ -0,0 +1,148 @@
+"""
+VRChat Discord Uploader - 起動時間のベンチマーク
+新しいPythonプロセスで計測し、リリース間の比較に使う
+  - import時間: python -X importtime の累積時間（エントリーモジュールごと、上位のモジュール）
+  - 初回描画までの時間: プロセス起動からメインウィンドウの最初の描画まで
+
+使い方:
+    python benchmarks/bench_startup.py [--repeat 5] [--top 15] [--json FILE]
+    （ディスプレイのない環境では QT_QPA_PLATFORM=offscreen を指定する）
+"""
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+# 計測するエントリーモジュール（GUI・ヘッドレス）
+IMPORT_TARGETS = ["src.gui.main_window", "src.headless"]
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+# 子プロセスで実行する初回描画の計測。main.gui_main と同じ手順でウィンドウを作る
+PAINT_PROBE = """
+import os, sys, time, json
+sys.path.insert(0, {root!r})
+from main import create_application
+app = create_application()
+from PyQt6.QtCore import QObject, QEvent, QTimer
+from src.gui.main_window import MainWindow
+
+class PaintProbe(QObject):
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Type.Paint and "painted" not in result:
+            result["painted"] = time.time()
+            QTimer.singleShot(0, app.quit)
+        return False
+
+result = {{}}
+window = MainWindow()
+result["constructed"] = time.time()
+window.installEventFilter(PaintProbe(window))
+window.show()
+app.exec()
+print(json.dumps(result), flush=True)
+# 起動直後のワーカースレッドが動いたままなので、後始末を待たずに終了する
+os._exit(0)
+"""
+
+
+def child_env(appdata: str) -> dict:
+    env = dict(os.environ)
+    # 実際の設定・履歴に触れないよう一時フォルダを使う
+    env["APPDATA"] = appdata
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    return env
+
+
+def measure_imports(module: str, appdata: str) -> tuple:
+    """-X importtime で1回importし、(合計ms, [(累積ms, モジュール)]) を返す"""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c",
+         f"import sys; sys.path.insert(0, {str(ROOT)!r}); import {module}"],
+        capture_output=True, text=True, env=child_env(appdata), cwd=ROOT
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr[-2000:])
+    total_us = 0
+    modules = []
+    for line in completed.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        cumulative = int(match.group(2))
+        modules.append((cumulative / 1000, match.group(4)))
+        if len(match.group(3)) == 1:  # 最上位のimport
+            total_us += cumulative
+    return total_us / 1000, modules
+
+
+def measure_first_paint(appdata: str) -> dict:
+    start = time.time()
+    completed = subprocess.run(
+        [sys.executable, "-c", PAINT_PROBE.format(root=str(ROOT))],
+        capture_output=True, text=True, env=child_env(appdata), cwd=ROOT
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr[-2000:])
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    return {
+        "constructed_ms": (result["constructed"] - start) * 1000,
+        "first_paint_ms": (result["painted"] - start) * 1000,
+    }
+
+
+def median(values):
+    values = sorted(values)
+    return values[len(values) // 2]
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="起動時間のベンチマーク")
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    arg_parser.add_argument("--top", type=int, default=15, help="表示する遅いモジュールの数")
+    arg_parser.add_argument("--json", type=Path, help="結果をJSONで書き出す")
+    args = arg_parser.parse_args()
+    
+    appdata = tempfile.mkdtemp(prefix="vrcu_bench_")
+    report = {"python": sys.version.split()[0], "imports": {}, "first_paint": {}}
+    
+    # 初回はバイトコードのコンパイル・DB作成を含むため捨てる
+    measure_imports(IMPORT_TARGETS[0], appdata)
+    
+    for module in IMPORT_TARGETS:
+        totals = []
+        slowest = {}
+        for _ in range(args.repeat):
+            total, modules = measure_imports(module, appdata)
+            totals.append(total)
+            for cumulative, name in modules:
+                slowest.setdefault(name, []).append(cumulative)
+        top = sorted(((median(v), k) for k, v in slowest.items()), reverse=True)[:args.top]
+        report["imports"][module] = {"total_ms": median(totals), "top": top}
+        
+        print(f"\n== import {module}: p50 {median(totals):.1f} ms")
+        for cumulative, name in top:
+            print(f"   {cumulative:8.1f} ms  {name}")
+    
+    samples = [measure_first_paint(appdata) for _ in range(args.repeat)]
+    for key in ("constructed_ms", "first_paint_ms"):
+        report["first_paint"][key] = median([s[key] for s in samples])
+    print("\n== 起動（プロセス開始から）")
+    print(f"   MainWindow生成  p50 {report['first_paint']['constructed_ms']:7.1f} ms")
+    print(f"   初回描画        p50 {report['first_paint']['first_paint_ms']:7.1f} ms")
+    
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,203 @@
+"""
+VRChat Discord Uploader - VRChatログコーパス生成
+VRChatLogParser のベンチマーク・検証用に、実際の形式に近い
+output_log_YYYY-MM-DD_HH-MM-SS.txt を生成する
+
+使い方:
+    python benchmarks/log_corpus.py OUT_DIR [--files 3] [--size-mb 500]
+        [--world-hops-per-hour 6] [--joins-per-minute 2] [--noise-ratio 0.995]
+        [--ascii-names] [--seed 0]
+"""
+import sys
+import uuid
+import random
+import argparse
+from pathlib import Path
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import List
+
+# 表示名の素材（unicode_names=True の場合は日本語・絵文字・記号を混ぜる）
+ASCII_NAMES = [
+    "Alice", "Bob", "Carol", "Dave", "Eve", "Mallory", "Trent", "Peggy",
+    "Victor", "Walter", "Sybil", "Oscar", "Judy", "Grace", "Heidi", "Ivan",
+]
+UNICODE_NAMES = [
+    "あいす", "ねこまた", "しろくま", "ゆきだるま", "ほしぞら", "月見団子", "桜花",
+    "🐈くろねこ", "✨キラキラ✨", "Ｆｕｌｌｗｉｄｔｈ", "Ünïcødé", "名無し (AFK)",
+    "ぷにぷに-Punipuni", "漆黒の翼", "Ｒｅｉ", "こんにちは世界",
+]
+WORLD_NAMES = [
+    "The Black Cat", "Japan Street", "Midnight Rooftop", "Void Club",
+    "夜の図書館", "温泉旅館「湯けむり」", "桜の丘", "Movie & Chill",
+    "Udon Tutorial World", "Avatar Testing!", "Furi Cafe", "Ramen Shop ラーメン屋",
+]
+NOISE_LINES = [
+    "Log        -  [Network] Processing {n} bytes of unrelated payload data",
+    "Log        -  [AssetBundleDownloadManager] Unpacking asset {n}",
+    "Debug      -  [Always] Shader ({n}) could not be found, using fallback",
+    "Warning    -  [UdonBehaviour] Heap variable {n} is null",
+    "Log        -  [VRCFlowManagerVRC] Tick {n}",
+    "Log        -  [ModerationManager] Refreshing {n} moderations",
+]
+BEHAVIOUR_CHATTER = [
+    "Debug      -  [Behaviour] Restoring player state for avatar {n}",
+    "Debug      -  [Behaviour] Initialized PlayerAPI \"{name}\" is remote",
+    "Debug      -  [Behaviour] Switching {name} to avatar {n}",
+    "Debug      -  [Behaviour] Joining wrld_{uuid}:{n}~private",
+]
+STACK_TRACE = (
+    "Error      -  NullReferenceException: Object reference not set to an instance of an object.\n"
+    "  at VRC.Core.ApiModel.Fetch () [0x00000] in <00000000000000000000000000000000>:0 \n"
+    "  at VRC.UI.Elements.QuickMenu.Update () [0x00000] in <00000000000000000000000000000000>:0 "
+)
+
+
+@dataclass
+class CorpusSpec:
+    """生成するコーパスの設定"""
+    files: int = 1
+    size_mb: float = 100.0  # 1ファイルあたりのサイズ
+    world_hops_per_hour: float = 6.0
+    joins_per_minute: float = 2.0  # 参加と同数程度の退出も発生する
+    noise_ratio: float = 0.995  # 全行に占める無関係な行の割合
+    unicode_names: bool = True
+    seed: int = 0
+    start_time: datetime = field(default_factory=lambda: datetime(2026, 1, 1, 9, 0, 0))
+
+
+class _Session:
+    """1つのログファイルを書き出す間のシミュレーション状態"""
+    
+    def __init__(self, spec: CorpusSpec, rng: random.Random):
+        self.spec = spec
+        self.rng = rng
+        names = ASCII_NAMES + (UNICODE_NAMES if spec.unicode_names else [])
+        self.name_pool = [f"{name}{i}" if i else name for i in range(8) for name in names]
+        self.users: List[str] = []
+        
+        # イベント発生率（1秒あたり）から1行あたりの経過時間を決める
+        hop_rate = spec.world_hops_per_hour / 3600
+        join_rate = spec.joins_per_minute / 60
+        event_rate = hop_rate + join_rate * 2
+        self.line_interval = (1 - spec.noise_ratio) / max(event_rate, 1e-9)
+        self.event_weights = (hop_rate, join_rate, join_rate)
+        self.event_probability = 1 - spec.noise_ratio
+    
+    def user_id(self) -> str:
+        return f"usr_{uuid.UUID(int=self.rng.getrandbits(128))}"
+    
+    def next_lines(self, n: int) -> List[str]:
+        """時刻を除いた次の行（複数行になる場合あり）を返す"""
+        rng = self.rng
+        if rng.random() < self.event_probability:
+            kind = rng.choices(("hop", "join", "leave"), self.event_weights)[0]
+            if kind == "hop" or (kind == "leave" and not self.users):
+                world = rng.choice(WORLD_NAMES)
+                self.users = rng.sample(self.name_pool, rng.randint(0, 16))
+                lines = [f"Debug      -  [Behaviour] Entering Room: {world}"]
+                lines.extend(
+                    f"Debug      -  [Behaviour] OnPlayerJoined {user} ({self.user_id()})"
+                    for user in self.users
+                )
+                return lines
+            if kind == "join":
+                user = rng.choice(self.name_pool)
+                if user not in self.users:
+                    self.users.append(user)
+                return [f"Debug      -  [Behaviour] OnPlayerJoined {user} ({self.user_id()})"]
+            user = self.users.pop(rng.randrange(len(self.users)))
+            return [f"Debug      -  [Behaviour] OnPlayerLeft {user} ({self.user_id()})"]
+        
+        r = rng.random()
+        if r < 0.002:
+            return [STACK_TRACE]
+        if r < 0.2:
+            template = rng.choice(BEHAVIOUR_CHATTER)
+            return [template.format(n=n, name=rng.choice(self.name_pool), uuid=uuid.UUID(int=rng.getrandbits(128)))]
+        return [rng.choice(NOISE_LINES).format(n=n)]
+
+
+def generate_log_file(path: Path, spec: CorpusSpec, start_time: datetime, rng: random.Random) -> datetime:
+    """ログファイルを1つ生成し、最後の行の時刻を返す"""
+    session = _Session(spec, rng)
+    target = int(spec.size_mb * 1024 * 1024)
+    written = 0
+    now = start_time
+    stamp_second = None
+    stamp = ""
+    buffer: List[str] = []
+    buffered = 0
+    n = 0
+    
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        while written < target:
+            now += timedelta(seconds=rng.expovariate(1 / session.line_interval))
+            second = now.replace(microsecond=0)
+            if second != stamp_second:
+                stamp_second = second
+                stamp = second.strftime("%Y.%m.%d %H:%M:%S")
+            
+            for line in session.next_lines(n):
+                # VRChatのログは各エントリの後に空行が入る
+                text = f"{stamp} {line}\n\n"
+                buffer.append(text)
+                size = len(text.encode("utf-8"))
+                buffered += size
+                written += size
+            n += 1
+            
+            if buffered >= 1024 * 1024:
+                f.write("".join(buffer))
+                buffer.clear()
+                buffered = 0
+        
+        f.write("".join(buffer))
+    return now
+
+
+def generate_corpus(out_dir: Path, spec: CorpusSpec) -> List[Path]:
+    """コーパスを生成してログファイルのパスを返す（古い順）"""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(spec.seed)
+    
+    paths = []
+    start_time = spec.start_time
+    for _ in range(spec.files):
+        path = out_dir / f"output_log_{start_time.strftime('%Y-%m-%d_%H-%M-%S')}.txt"
+        end_time = generate_log_file(path, spec, start_time, rng)
+        paths.append(path)
+        # 次のセッションは少し間を空けて開始
+        start_time = (end_time + timedelta(minutes=rng.randint(5, 120))).replace(microsecond=0)
+    return paths
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="VRChatログコーパス生成")
+    arg_parser.add_argument("out_dir", type=Path)
+    arg_parser.add_argument("--files", type=int, default=1)
+    arg_parser.add_argument("--size-mb", type=float, default=100.0, help="1ファイルあたりのサイズ")
+    arg_parser.add_argument("--world-hops-per-hour", type=float, default=6.0)
+    arg_parser.add_argument("--joins-per-minute", type=float, default=2.0)
+    arg_parser.add_argument("--noise-ratio", type=float, default=0.995)
+    arg_parser.add_argument("--ascii-names", action="store_true", help="表示名をASCIIのみにする")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    args = arg_parser.parse_args()
+    
+    spec = CorpusSpec(
+        files=args.files,
+        size_mb=args.size_mb,
+        world_hops_per_hour=args.world_hops_per_hour,
+        joins_per_minute=args.joins_per_minute,
+        noise_ratio=args.noise_ratio,
+        unicode_names=not args.ascii_names,
+        seed=args.seed,
+    )
+    for path in generate_corpus(args.out_dir, spec):
+        print(f"{path} ({path.stat().st_size / 1024 / 1024:.1f} MB)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,7 @@
 """
 VRChat Discord Uploader - エントリーポイント
+--headless を付けるとQtを読み込まずに常駐サービスとして起動する（src.headless）
+upload / backfill / pause / resume / stats は実行中のインスタンスを操作する（src.cli）
 """
 import sys
 from pathlib import Path
@@ -7,30 +9,45 @@ from pathlib import Path
 # srcディレクトリをパスに追加
 sys.path.insert(0, str(Path(__file__).parent))
 
-from PyQt6.QtWidgets import QApplication
-from PyQt6.QtCore import Qt
-
 from src.utils.logger import setup_logger, get_logger
-from src.core.config_manager import config_manager
-from src.db.models import init_database
-from src.gui.main_window import MainWindow
-
 
-def check_single_instance() -> bool:
-    """二重起動チェック"""
-    import socket
-    
-    try:
-        # ローカルソケットでロックを取得
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.bind(('127.0.0.1', 47891))  # 任意のポート
-        return True
-    except socket.error:
-        return False
+CLI_COMMANDS = ("upload", "backfill", "pause", "resume", "stats")
 
 
 def main():
     """メインエントリーポイント"""
+    args = sys.argv[1:]
+    if args and args[0] in CLI_COMMANDS:
+        # 実行中のインスタンスを操作するだけなので、Qtも設定も読み込まない
+        from src.cli import main as cli_main
+        return cli_main(args)
+    if "--headless" in args:
+        from src.headless import main as headless_main
+        return headless_main()
+    return gui_main()
+
+
+def create_application():
+    """Qtアプリケーションを作成"""
+    from PyQt6.QtWidgets import QApplication
+    from PyQt6.QtCore import Qt
+    
+    # ハイDPI対応（QApplicationの作成前に設定する）
+    QApplication.setHighDpiScaleFactorRoundingPolicy(
+        Qt.HighDpiScaleFactorRoundingPolicy.PassThrough
+    )
+    
+    app = QApplication(sys.argv)
+    app.setApplicationName("VRChat Discord Uploader")
+    app.setQuitOnLastWindowClosed(False)  # トレイアイコン用
+    return app
+
+
+def gui_main():
+    """GUIで起動"""
+    from src.core.config_manager import config_manager
+    from src.core.control_server import ControlServer, ControlError, send_command
+    
     # ログ初期化
     config = config_manager.config
     setup_logger(config.log_level)
@@ -39,10 +56,17 @@ def main():
     logger.info("=" * 50)
     logger.info("VRChat Discord Uploader を起動しています...")
     
-    # 二重起動チェック
-    if not check_single_instance():
+    # 二重起動チェック（制御用ポートを確保できるのは1プロセスだけ）
+    control_server = ControlServer()
+    if not control_server.start():
         logger.warning("既に起動中のインスタンスがあります")
-        from PyQt6.QtWidgets import QMessageBox
+        try:
+            # 起動中のウィンドウを前面に出す（ヘッドレスモードにはウィンドウがない）
+            if send_command("show").get("ok"):
+                return 0
+        except ControlError as e:
+            logger.warning(f"起動中のインスタンスに表示を要求できませんでした: {e}")
+        from PyQt6.QtWidgets import QApplication, QMessageBox
         app = QApplication(sys.argv)
         QMessageBox.warning(
             None, "起動エラー",
@@ -50,21 +74,12 @@ def main():
         )
         return 1
     
-    # DB初期化
-    init_database()
-    
     # Qt アプリケーション
-    app = QApplication(sys.argv)
-    app.setApplicationName("VRChat Discord Uploader")
-    app.setQuitOnLastWindowClosed(False)  # トレイアイコン用
-    
-    # ハイDPI対応
-    app.setHighDpiScaleFactorRoundingPolicy(
-        Qt.HighDpiScaleFactorRoundingPolicy.PassThrough
-    )
+    app = create_application()
     
     # メインウィンドウ
-    window = MainWindow()
+    from src.gui.main_window import MainWindow
+    window = MainWindow(control_server)
     
     # タスクトレイ最小化でなければ表示
     if not config.enable_minimize_to_tray:
@@ -74,6 +89,7 @@ def main():
     
     # イベントループ
     result = app.exec()
+    control_server.stop()
     
     logger.info("アプリケーションを終了しました")
     return result
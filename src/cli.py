@@ -0,0 +1,178 @@
+"""
+VRChat Discord Uploader - コマンドライン
+実行中のインスタンス（GUI・ヘッドレス）に制御用ソケット（src.core.control_server）でコマンドを送る。
+Qtも設定も読み込まないので、スクリプトやシェルの連携から大量のファイルを素早く渡せる
+
+使い方:
+    python main.py upload <ファイル...>    （"-" を指定すると標準入力から1行1パスで読む）
+    python main.py backfill <フォルダ>     （フォルダ以下の画像をすべて転送待ちに追加）
+    python main.py pause | resume
+    python main.py stats [--json]
+"""
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from src.constants import SUPPORTED_IMAGE_EXTENSIONS
+from src.core.control_server import ControlClient, ControlError
+
+UPLOAD_BATCH_SIZE = 500  # 1コマンドで送るパスの数
+UPLOAD_MAX_IN_FLIGHT = 4  # 応答を待たずに送るコマンドの数
+CLI_TIMEOUT = 60.0
+
+
+def iter_images(folder: Path) -> Iterator[Path]:
+    """フォルダ以下の画像を名前順に列挙（VRChatのファイル名は撮影日時順になる）"""
+    for dirpath, dirnames, filenames in os.walk(folder):
+        dirnames.sort()
+        for name in sorted(filenames):
+            if os.path.splitext(name)[1].lower() in SUPPORTED_IMAGE_EXTENSIONS:
+                yield Path(dirpath) / name
+
+
+def iter_arguments(paths: List[str]) -> Iterator[Path]:
+    """引数のパスを列挙（"-" は標準入力から1行1パスで読む）"""
+    for path in paths:
+        if path != "-":
+            yield Path(path)
+            continue
+        for line in sys.stdin:
+            line = line.strip()
+            if line:
+                yield Path(line)
+
+
+def _batches(paths: Iterable[Path], size: int) -> Iterator[List[str]]:
+    batch = []
+    for path in paths:
+        # 実行中のインスタンスとは作業フォルダが違うので絶対パスで送る
+        batch.append(os.path.abspath(os.path.expanduser(path)))
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def stream_upload(client: ControlClient, paths: Iterable[Path]) -> Tuple[int, int]:
+    """パスをまとめて送る。応答を待たずに次のまとまりを送り、列挙と転送待ちへの追加を重ねる
+    
+    Returns:
+        Tuple[転送待ちに追加した数, スキップした数]
+    """
+    queued = 0
+    skipped = 0
+    in_flight = 0
+    
+    def receive():
+        nonlocal queued, skipped, in_flight
+        response = client.receive()
+        in_flight -= 1
+        if not response.get("ok"):
+            raise ControlError(response.get("error", "不明なエラー"))
+        queued += response.get("queued", 0)
+        skipped += response.get("skipped", 0)
+    
+    for batch in _batches(paths, UPLOAD_BATCH_SIZE):
+        client.send("upload", paths=batch)
+        in_flight += 1
+        if in_flight >= UPLOAD_MAX_IN_FLIGHT:
+            receive()
+    while in_flight:
+        receive()
+    return queued, skipped
+
+
+def _print_upload_result(queued: int, skipped: int) -> int:
+    print(f"{queued}件を転送待ちに追加しました（スキップ: {skipped}件）")
+    return 0
+
+
+def cmd_upload(client: ControlClient, args: argparse.Namespace) -> int:
+    return _print_upload_result(*stream_upload(client, iter_arguments(args.paths)))
+
+
+def cmd_backfill(client: ControlClient, args: argparse.Namespace) -> int:
+    folder = Path(args.folder).expanduser()
+    if not folder.is_dir():
+        print(f"エラー: フォルダが見つかりません: {folder}", file=sys.stderr)
+        return 2
+    # 転送済みのファイルは実行中のインスタンスが重複として読み飛ばす
+    return _print_upload_result(*stream_upload(client, iter_images(folder)))
+
+
+def _simple_command(client: ControlClient, command: str, message: str) -> int:
+    response = client.request(command)
+    if not response.get("ok"):
+        raise ControlError(response.get("error", "不明なエラー"))
+    print(message)
+    return 0
+
+
+def cmd_pause(client: ControlClient, args: argparse.Namespace) -> int:
+    return _simple_command(client, "pause", "転送を一時停止しました")
+
+
+def cmd_resume(client: ControlClient, args: argparse.Namespace) -> int:
+    return _simple_command(client, "resume", "転送を再開しました")
+
+
+def cmd_stats(client: ControlClient, args: argparse.Namespace) -> int:
+    response = client.request("stats")
+    if not response.get("ok"):
+        raise ControlError(response.get("error", "不明なエラー"))
+    if args.json:
+        print(json.dumps(response, ensure_ascii=False, indent=2))
+        return 0
+    
+    counters = response.get("counters", {})
+    print(f"実行モード: {response.get('mode', '-')}")
+    print(f"監視状態: {'稼働中' if response.get('watching') else '停止中'}")
+    print(f"転送: {'一時停止中' if response.get('paused') else '実行中'}（待ち {response.get('pending', 0)}件）")
+    print(f"本日転送数: {response.get('today_count', 0)}枚")
+    print(f"累計転送数: {response.get('total_count', 0):,}枚")
+    print(f"最終転送: {response.get('last_transferred_at') or '-'}")
+    print(
+        f"起動後: 転送 {counters.get('transferred', 0)} / 失敗 {counters.get('failed', 0)}"
+        f" / 重複 {counters.get('duplicates', 0)}"
+    )
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="main.py", description="実行中の VRChat Discord Uploader を操作します"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    upload = subparsers.add_parser("upload", help="ファイルを転送待ちに追加")
+    upload.add_argument("paths", nargs="+", help='画像ファイル（"-" で標準入力から読む）')
+    upload.set_defaults(handler=cmd_upload)
+    
+    backfill = subparsers.add_parser("backfill", help="フォルダ以下の画像をすべて転送待ちに追加")
+    backfill.add_argument("folder")
+    backfill.set_defaults(handler=cmd_backfill)
+    
+    subparsers.add_parser("pause", help="転送を一時停止").set_defaults(handler=cmd_pause)
+    subparsers.add_parser("resume", help="転送を再開").set_defaults(handler=cmd_resume)
+    
+    stats = subparsers.add_parser("stats", help="状態と転送数を表示")
+    stats.add_argument("--json", action="store_true", help="JSONで出力")
+    stats.set_defaults(handler=cmd_stats)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """コマンドラインのエントリーポイント"""
+    args = build_parser().parse_args(argv)
+    try:
+        with ControlClient(timeout=CLI_TIMEOUT) as client:
+            return args.handler(client, args)
+    except ControlError as e:
+        print(f"エラー: {e}", file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        return 130
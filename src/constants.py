@@ -18,6 +18,10 @@ APPDATA_DIR = Path(os.environ.get("APPDATA", "")) / "VRChatDiscordUploader"
 CONFIG_FILE = APPDATA_DIR / "config.json"
 LOG_DIR = APPDATA_DIR / "logs"
 DB_FILE = APPDATA_DIR / "history.db"
+LOG_EVENTS_DB_FILE = APPDATA_DIR / "vrchat_events.db"
+HISTORY_ARCHIVE_DB_FILE = APPDATA_DIR / "history_archive.db"
+THUMBNAIL_CACHE_DIR = APPDATA_DIR / "thumbnails"
+CONTROL_TOKEN_FILE = APPDATA_DIR / "control.token"
 
 # VRChat デフォルト設定
 VRCHAT_DEFAULT_PICTURES_PATH = Path.home() / "Pictures" / "VRChat"
@@ -32,6 +36,12 @@ DISCORD_MAX_RETRIES = 3
 IMAGE_MAX_RESOLUTION_4K = (3840, 2160)
 IMAGE_MAX_RESOLUTION_1440P = (2560, 1440)
 SUPPORTED_IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg"}
+THUMBNAIL_SIZE = (256, 144)  # 履歴・通知用の縮小画像（16:9）
+THUMBNAIL_CACHE_MAX_BYTES = 128 * 1024 * 1024
+
+# 制御用ソケット（二重起動の防止を兼ねる）
+CONTROL_HOST = "127.0.0.1"
+CONTROL_PORT = 47891
 
 # 暗号化設定
 ENCRYPTION_KEY_FILE = APPDATA_DIR / ".key"
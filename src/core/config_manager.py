@@ -2,17 +2,65 @@
 VRChat Discord Uploader - 設定管理
 JSON形式での設定保存、Webhook URL暗号化
 """
+import copy
 import json
+import threading
 from pathlib import Path
-from typing import Optional
-from dataclasses import dataclass, field, asdict
+from typing import Callable, Dict, Iterable, Optional, List, Set, Tuple
+from dataclasses import dataclass, field, fields, asdict
 
-from src.constants import CONFIG_FILE, APPDATA_DIR, VRCHAT_DEFAULT_PICTURES_PATH
+from src.constants import (
+    CONFIG_FILE, APPDATA_DIR, VRCHAT_DEFAULT_PICTURES_PATH, SUPPORTED_IMAGE_EXTENSIONS
+)
 from src.utils.crypto import encrypt, decrypt, is_encrypted
 from src.utils.logger import get_logger
 
 logger = get_logger()
 
+# スレッドポリシー
+THREAD_POLICY_DEFAULT = "default"  # 全体設定（月別スレッド機能）に従う
+THREAD_POLICY_MONTHLY = "monthly"  # 常に月別スレッドに投稿
+THREAD_POLICY_NONE = "none"        # スレッドを使用しない
+
+CONFIG_POLL_SECONDS = 2.0  # config.json の外部編集を確認する間隔
+
+
+@dataclass
+class WatchRoot:
+    """監視ルート（フォルダごとの転送ルール）"""
+    path: str = ""
+    name: str = ""
+    # 対象とする拡張子（小文字、ドット付き）
+    extensions: List[str] = field(default_factory=lambda: sorted(SUPPORTED_IMAGE_EXTENSIONS))
+    # 転送先Webhook URL（空の場合は既定のWebhookを使用）
+    webhook_url: str = ""
+    thread_policy: str = THREAD_POLICY_DEFAULT
+    recursive: bool = True
+    enabled: bool = True
+    
+    @property
+    def key(self) -> str:
+        """ルートを識別するキー（正規化したパス）"""
+        return str(Path(self.path).expanduser().resolve()).lower()
+
+
+def unique_watch_roots(roots: Iterable[WatchRoot]) -> List[WatchRoot]:
+    """同じフォルダ（key）を指すルートを1つにまとめる
+    
+    後に指定したルートの設定を使い、並びは最初に現れた位置のままにする
+    （既定の監視フォルダと同じフォルダを追加した場合は、追加した側のルールで先頭に残る）。
+    """
+    unique: Dict[str, WatchRoot] = {}
+    for root in roots:
+        previous = unique.get(root.key)
+        if previous is not None:
+            logger.warning(
+                f"同じフォルダの監視ルートが重複しています。後の設定を使います: {root.path}"
+                f"（{previous.name or '-'} → {root.name or '-'}）"
+            )
+        unique[root.key] = root
+    return list(unique.values())
+
 
 @dataclass
 class Config:
@@ -23,6 +71,8 @@ class Config:
     
     # 監視設定
     watch_folder: str = str(VRCHAT_DEFAULT_PICTURES_PATH)
+    # 追加の監視ルート（VirtualLens2の出力先など）
+    watch_roots: List[WatchRoot] = field(default_factory=list)
     
     # 機能設定
     enable_monthly_thread: bool = True
@@ -39,36 +89,90 @@ class Config:
     # ログ設定
     log_level: str = "INFO"
     
+    # 転送履歴の保持期間（月）。古い記録はアーカイブへ移す（0は無期限）
+    history_retention_months: int = 0
+    
     # 統計
     total_transferred: int = 0
+    
+    def all_watch_roots(self) -> List[WatchRoot]:
+        """有効な全監視ルートを取得（先頭は既定の監視フォルダ）"""
+        roots = [WatchRoot(path=self.watch_folder, name="VRChat")]
+        roots.extend(root for root in self.watch_roots if root.enabled and root.path)
+        return roots
+
+
+ConfigListener = Callable[[Config, Set[str]], None]
+
+
+def diff_config(old: Config, new: Config) -> Set[str]:
+    """値が変わった設定項目の名前"""
+    return {f.name for f in fields(Config) if getattr(old, f.name) != getattr(new, f.name)}
 
 
 class ConfigManager:
-    """設定管理クラス"""
+    """設定管理クラス
+    
+    保存・外部編集で設定が変わると、変わった項目の名前とともにリスナーへ通知する。
+    """
     
     def __init__(self):
         self._config: Optional[Config] = None
+        # 最後に読み込んだ・保存した内容（その場で書き換えられても差分を取れるよう複製を持つ）
+        self._snapshot: Optional[Config] = None
+        # 最後に読み込んだ・書き込んだ設定ファイルの (更新時刻, サイズ)。自分の書き込みを無視するのに使う
+        self._file_state: Optional[Tuple[int, int]] = None
+        self._listeners: List[ConfigListener] = []
+        self._lock = threading.RLock()
+        self._watch_stop = threading.Event()
+        self._watch_thread: Optional[threading.Thread] = None
     
     @property
     def config(self) -> Config:
         """現在の設定を取得"""
         if self._config is None:
-            self._config = self.load()
+            with self._lock:
+                if self._config is None:
+                    config = self.load()
+                    self._snapshot = copy.deepcopy(config)
+                    self._config = config
         return self._config
     
+    def add_listener(self, listener: ConfigListener) -> None:
+        """設定の変更を通知する関数を登録
+        
+        (新しい設定, 変わった項目名の集合) で呼ばれる。保存した場合は保存したスレッド、
+        外部編集の場合は監視スレッドから呼ばれる。
+        """
+        self._listeners.append(listener)
+    
+    def remove_listener(self, listener: ConfigListener) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+    
+    def _notify(self, config: Config, changed: Set[str]) -> None:
+        if not changed:
+            return
+        logger.debug(f"設定が変更されました: {', '.join(sorted(changed))}")
+        for listener in list(self._listeners):
+            try:
+                listener(config, changed)
+            except Exception as e:
+                logger.error(f"設定変更の通知エラー: {e}")
+    
+    @staticmethod
+    def _stat_file() -> Optional[Tuple[int, int]]:
+        try:
+            stat = CONFIG_FILE.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+    
     def load(self) -> Config:
         """設定ファイルを読み込む"""
         try:
             if CONFIG_FILE.exists():
-                with open(CONFIG_FILE, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                
-                # Webhook URLを復号化
-                if "webhook_url" in data and data["webhook_url"]:
-                    if is_encrypted(data["webhook_url"]):
-                        data["webhook_url"] = decrypt(data["webhook_url"])
-                
-                config = Config(**data)
+                config = self._read_file()
                 logger.info("設定ファイルを読み込みました")
                 return config
             else:
@@ -78,45 +182,138 @@ class ConfigManager:
             logger.error(f"設定ファイルの読み込みに失敗しました: {e}")
             return Config()
     
+    def _read_file(self) -> Config:
+        """設定ファイルを読み込んで復号化（失敗したら例外）"""
+        state = self._stat_file()
+        with open(CONFIG_FILE, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        
+        # Webhook URLを復号化
+        if "webhook_url" in data and data["webhook_url"]:
+            if is_encrypted(data["webhook_url"]):
+                data["webhook_url"] = decrypt(data["webhook_url"])
+        
+        # 監視ルートを復元
+        roots = []
+        for root_data in data.get("watch_roots", []):
+            if root_data.get("webhook_url") and is_encrypted(root_data["webhook_url"]):
+                root_data["webhook_url"] = decrypt(root_data["webhook_url"])
+            roots.append(WatchRoot(**root_data))
+        data["watch_roots"] = roots
+        
+        config = Config(**data)
+        self._file_state = state
+        return config
+    
+    def reload_if_changed(self) -> Set[str]:
+        """設定ファイルが外部で編集されていれば読み直す
+        
+        自分で保存した直後の状態とファイルの更新時刻・サイズが同じなら何もしない。
+        書きかけなどで読み込めない場合は現在の設定を維持する。
+        
+        Returns:
+            変わった項目名の集合
+        """
+        with self._lock:
+            state = self._stat_file()
+            if state is None or state == self._file_state:
+                return set()
+            try:
+                new_config = self._read_file()
+            except Exception as e:
+                # 同じ内容のまま再試行しないよう、この状態は読んだことにする
+                self._file_state = state
+                logger.warning(f"編集された設定ファイルを読み込めません（現在の設定を維持します）: {e}")
+                return set()
+            changed = diff_config(self._snapshot, new_config) if self._snapshot else set()
+            self._config = new_config
+            self._snapshot = copy.deepcopy(new_config)
+        if changed:
+            logger.info(f"設定ファイルの外部編集を反映しました: {', '.join(sorted(changed))}")
+        self._notify(new_config, changed)
+        return changed
+    
+    def start_watching(self, interval: float = CONFIG_POLL_SECONDS) -> None:
+        """config.json の外部編集の監視を開始
+        
+        エディタの保存方法（上書き・置き換え）によらず検知できるよう、更新時刻を定期的に確認する。
+        """
+        if self._watch_thread is not None:
+            return
+        self.config  # 比較の基準になる状態を先に読んでおく
+        self._watch_stop.clear()
+        self._watch_thread = threading.Thread(
+            target=self._watch_loop, args=(interval,), name="ConfigWatcher", daemon=True
+        )
+        self._watch_thread.start()
+    
+    def stop_watching(self) -> None:
+        if self._watch_thread is None:
+            return
+        self._watch_stop.set()
+        self._watch_thread.join(timeout=5)
+        self._watch_thread = None
+    
+    def _watch_loop(self, interval: float) -> None:
+        while not self._watch_stop.wait(interval):
+            try:
+                self.reload_if_changed()
+            except Exception as e:
+                logger.error(f"設定ファイルの監視エラー: {e}")
+    
     def save(self, config: Optional[Config] = None) -> bool:
-        """設定をファイルに保存"""
+        """設定をファイルに保存し、前回の保存・読み込みから変わった項目を通知"""
         try:
-            if config is not None:
-                self._config = config
-            
-            if self._config is None:
-                return False
-            
-            # ディレクトリを作成
-            APPDATA_DIR.mkdir(parents=True, exist_ok=True)
-            
-            # 設定を辞書に変換
-            data = asdict(self._config)
-            
-            # Webhook URLを暗号化
-            if data["webhook_url"]:
-                data["webhook_url"] = encrypt(data["webhook_url"])
-            
-            with open(CONFIG_FILE, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            with self._lock:
+                if config is not None:
+                    self._config = config
+                
+                if self._config is None:
+                    return False
+                
+                # ディレクトリを作成
+                APPDATA_DIR.mkdir(parents=True, exist_ok=True)
+                
+                # 設定を辞書に変換
+                data = asdict(self._config)
+                
+                # Webhook URLを暗号化
+                if data["webhook_url"]:
+                    data["webhook_url"] = encrypt(data["webhook_url"])
+                for root_data in data["watch_roots"]:
+                    if root_data["webhook_url"]:
+                        root_data["webhook_url"] = encrypt(root_data["webhook_url"])
+                
+                with open(CONFIG_FILE, "w", encoding="utf-8") as f:
+                    json.dump(data, f, indent=2, ensure_ascii=False)
+                self._file_state = self._stat_file()
+                
+                changed = diff_config(self._snapshot, self._config) if self._snapshot else set()
+                self._snapshot = copy.deepcopy(self._config)
+                saved = self._config
             
             logger.info("設定ファイルを保存しました")
-            return True
         except Exception as e:
             logger.error(f"設定ファイルの保存に失敗しました: {e}")
             return False
+        self._notify(saved, changed)
+        return True
     
     def update(self, **kwargs) -> bool:
         """設定を更新して保存"""
-        config = self.config
-        for key, value in kwargs.items():
-            if hasattr(config, key):
-                setattr(config, key, value)
+        with self._lock:
+            config = self.config
+            for key, value in kwargs.items():
+                if hasattr(config, key):
+                    setattr(config, key, value)
         return self.save(config)
     
     def reset(self) -> bool:
         """設定をデフォルトにリセット"""
-        self._config = Config()
+        with self._lock:
+            if self._snapshot is None:
+                self.config  # 差分の基準として現在の設定を読み込む
+            self._config = Config()
         return self.save()
 
 
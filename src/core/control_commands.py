@@ -0,0 +1,127 @@
+"""
+VRChat Discord Uploader - 制御コマンド
+制御用ソケット（src.core.control_server）で受け取ったコマンドを転送待ちキューに対して実行する。
+GUI・ヘッドレスの両方から使うためQtに依存しない
+"""
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from src.constants import APP_NAME, APP_VERSION, SUPPORTED_IMAGE_EXTENSIONS
+from src.core.control_server import CommandHandler
+from src.core.pipeline_metrics import pipeline_metrics
+from src.core.transfer_pipeline import TransferPipeline, TransferQueue, resolve_log_contexts
+from src.db.repository import transfer_repository
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+
+class TransferCommands:
+    """転送待ちキューを操作する制御コマンド
+    
+    ping / pause / resume / stats / upload / shutdown を処理する。
+    GUIのウィンドウ表示などモード固有のコマンドは handlers に追加する。
+    接続ごとのスレッドから呼ばれるので、コールバックはスレッドセーフにする。
+    """
+    
+    def __init__(self, pipeline: TransferPipeline, queue: TransferQueue, mode: str,
+                 is_watching: Callable[[], bool],
+                 on_shutdown: Callable[[], None],
+                 on_change: Optional[Callable[[], None]] = None):
+        """
+        Args:
+            pipeline: 転送先の解決に使うパイプライン
+            queue: ファイルを追加する転送待ちキュー
+            mode: ping で返す実行モード（"gui" / "headless"）
+            is_watching: ファイル監視中かどうか
+            on_shutdown: shutdown を受け取ったときに呼ぶ
+            on_change: 一時停止・再開・追加で状態が変わったときに呼ぶ
+        """
+        self.pipeline = pipeline
+        self.queue = queue
+        self.mode = mode
+        self.is_watching = is_watching
+        self.on_shutdown = on_shutdown
+        self.on_change = on_change
+        self.handlers: Dict[str, CommandHandler] = {
+            "ping": self._ping,
+            "pause": self._pause,
+            "resume": self._resume,
+            "stats": self._stats,
+            "upload": self._upload,
+            "shutdown": self._shutdown,
+        }
+    
+    def __call__(self, request: dict) -> dict:
+        command = request.get("command")
+        handler = self.handlers.get(command)
+        if handler is None:
+            return {"ok": False, "error": f"不明なコマンドです: {command}"}
+        return handler(request)
+    
+    def _changed(self) -> None:
+        if self.on_change is not None:
+            self.on_change()
+    
+    def _ping(self, request: dict) -> dict:
+        return {"ok": True, "app": APP_NAME, "version": APP_VERSION, "mode": self.mode}
+    
+    def _pause(self, request: dict) -> dict:
+        self.queue.pause()
+        self._changed()
+        return {"ok": True}
+    
+    def _resume(self, request: dict) -> dict:
+        self.queue.resume()
+        self._changed()
+        return {"ok": True}
+    
+    def _shutdown(self, request: dict) -> dict:
+        self.on_shutdown()
+        return {"ok": True}
+    
+    def _upload(self, request: dict) -> dict:
+        """ファイルを転送待ちに追加（監視ルートは場所から判定する）
+        
+        ワールド・ユーザーはコマンド1件分をまとめてログから解決しておく。
+        """
+        paths = request.get("paths") or []
+        if not isinstance(paths, list):
+            return {"ok": False, "error": "paths はリストで指定してください"}
+        image_paths = []
+        skipped = 0
+        for path in paths:
+            image_path = Path(str(path))
+            if image_path.suffix.lower() not in SUPPORTED_IMAGE_EXTENSIONS or not image_path.is_file():
+                skipped += 1
+                continue
+            image_paths.append(image_path)
+        
+        queued = 0
+        for image_path, log_context in zip(image_paths, resolve_log_contexts(image_paths)):
+            root = self.pipeline.root_for(image_path)
+            if self.queue.put(image_path, root, bulk=True, log_context=log_context):
+                queued += 1
+            else:
+                skipped += 1
+        if queued:
+            logger.debug(f"制御コマンドで転送待ちに追加しました: {queued}件")
+            self._changed()
+        return {"ok": True, "queued": queued, "skipped": skipped}
+    
+    def _stats(self, request: dict) -> dict:
+        stats = transfer_repository.get_stats()
+        return {
+            "ok": True,
+            "mode": self.mode,
+            "paused": self.queue.is_paused,
+            "pending": self.queue.pending,
+            "watching": self.is_watching(),
+            "today_count": stats.today_count,
+            "total_count": stats.total_count,
+            "last_transferred_at": (
+                stats.last_transferred_at.isoformat(timespec="seconds")
+                if stats.last_transferred_at else None
+            ),
+            "counters": pipeline_metrics.snapshot()["counters"],
+        }
@@ -0,0 +1,224 @@
+"""
+VRChat Discord Uploader - 制御用ソケット
+127.0.0.1 上で1行1コマンドのJSON（JSON Lines）を受け付け、実行中のインスタンスを操作する。
+ポートを確保できるのは1プロセスだけなので、二重起動の防止も兼ねる
+"""
+import hmac
+import json
+import os
+import secrets
+import socket
+import threading
+from pathlib import Path
+from typing import Callable, Optional
+
+from src.constants import CONTROL_HOST, CONTROL_PORT, CONTROL_TOKEN_FILE
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+CONTROL_MAX_LINE_BYTES = 1024 * 1024
+CONTROL_CONNECT_TIMEOUT = 3.0
+
+CommandHandler = Callable[[dict], dict]
+
+
+class ControlError(Exception):
+    """制御コマンドの送信エラー"""
+
+
+def _bind_socket(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    if hasattr(socket, "SO_EXCLUSIVEADDRUSE"):
+        # Windowsでは同じポートへの重複バインドを禁止する
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_EXCLUSIVEADDRUSE, 1)
+    elif os.name != "nt":
+        # 終了直後の再起動で TIME_WAIT のポートを再利用する
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    try:
+        sock.bind((host, port))
+        sock.listen(8)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+class ControlServer:
+    """制御コマンドを受け付けるローカルソケット
+    
+    リクエストは {"token": ..., "command": ..., ...}、応答は {"ok": bool, ...}。
+    トークンは起動ごとに生成してユーザーのデータフォルダに書き出し、同じユーザーの
+    プロセスだけがコマンドを送れるようにする。コマンドの処理は接続ごとのスレッドで行う。
+    二重起動の確認のため handler なしで先に起動し、準備ができてから handler を設定してもよい。
+    """
+    
+    def __init__(self, handler: Optional[CommandHandler] = None, host: str = CONTROL_HOST,
+                 port: int = CONTROL_PORT, token_file: Path = CONTROL_TOKEN_FILE):
+        self.handler = handler
+        self.host = host
+        self.port = port
+        self.token_file = Path(token_file)
+        self._token = secrets.token_hex(16)
+        self._socket: Optional[socket.socket] = None
+        self._thread: Optional[threading.Thread] = None
+        self._running = threading.Event()
+    
+    def start(self) -> bool:
+        """待ち受けを開始（ポートが使用中ならFalse）"""
+        try:
+            self._socket = _bind_socket(self.host, self.port)
+        except OSError as e:
+            logger.debug(f"制御用ポートを確保できません: {e}")
+            return False
+        self.port = self._socket.getsockname()[1]
+        # stop() を待ち受けループが検知できるよう、accept を一定時間で打ち切る
+        self._socket.settimeout(0.5)
+        self._write_token()
+        
+        self._running.set()
+        self._thread = threading.Thread(target=self._serve, name="ControlServer", daemon=True)
+        self._thread.start()
+        logger.info(f"制御用ソケットで待ち受けています: {self.host}:{self.port}")
+        return True
+    
+    def stop(self) -> None:
+        if not self._running.is_set():
+            return
+        self._running.clear()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+        try:
+            self.token_file.unlink()
+        except OSError:
+            pass
+    
+    def _write_token(self) -> None:
+        self.token_file.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.token_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"port": self.port, "token": self._token}, f)
+    
+    def _serve(self) -> None:
+        while self._running.is_set():
+            try:
+                conn, _ = self._socket.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                break  # stop() でソケットを閉じた
+            conn.settimeout(None)
+            threading.Thread(target=self._handle_client, args=(conn,), daemon=True).start()
+    
+    def _handle_client(self, conn: socket.socket) -> None:
+        with conn, conn.makefile("rb") as reader, conn.makefile("wb") as writer:
+            while self._running.is_set():
+                line = reader.readline(CONTROL_MAX_LINE_BYTES)
+                if not line:
+                    return
+                if not line.strip():
+                    continue
+                response = self._dispatch(line)
+                try:
+                    writer.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+                    writer.flush()
+                except OSError:
+                    return
+    
+    def _dispatch(self, line: bytes) -> dict:
+        try:
+            request = json.loads(line)
+        except ValueError:
+            return {"ok": False, "error": "JSONとして解釈できません"}
+        if not isinstance(request, dict):
+            return {"ok": False, "error": "不正なリクエストです"}
+        if not hmac.compare_digest(str(request.get("token", "")), self._token):
+            return {"ok": False, "error": "トークンが一致しません"}
+        handler = self.handler
+        if handler is None:
+            return {"ok": False, "error": "起動処理中です"}
+        try:
+            return handler(request)
+        except Exception as e:
+            logger.error(f"制御コマンドの処理エラー ({request.get('command')}): {e}")
+            return {"ok": False, "error": str(e)}
+
+
+class ControlClient:
+    """実行中のインスタンスへ制御コマンドを送る
+    
+    1つの接続で複数のコマンドを順に送れる。with 文で使う。
+    """
+    
+    def __init__(self, host: str = CONTROL_HOST, token_file: Path = CONTROL_TOKEN_FILE,
+                 timeout: Optional[float] = None):
+        self.host = host
+        self.token_file = Path(token_file)
+        self.timeout = timeout
+        self._socket: Optional[socket.socket] = None
+        self._reader = None
+        self._token = ""
+    
+    def connect(self) -> "ControlClient":
+        try:
+            with open(self.token_file, encoding="utf-8") as f:
+                info = json.load(f)
+        except (OSError, ValueError):
+            raise ControlError("実行中のインスタンスが見つかりません")
+        self._token = info.get("token", "")
+        try:
+            self._socket = socket.create_connection(
+                (self.host, info.get("port", CONTROL_PORT)), timeout=CONTROL_CONNECT_TIMEOUT
+            )
+        except OSError as e:
+            raise ControlError(f"実行中のインスタンスに接続できません: {e}")
+        self._socket.settimeout(self.timeout)
+        self._reader = self._socket.makefile("rb")
+        return self
+    
+    def close(self) -> None:
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+    
+    def __enter__(self) -> "ControlClient":
+        return self.connect()
+    
+    def __exit__(self, *exc) -> None:
+        self.close()
+    
+    def request(self, command: str, **params) -> dict:
+        """コマンドを送って応答を待つ"""
+        self.send(command, **params)
+        return self.receive()
+    
+    def send(self, command: str, **params) -> None:
+        """応答を待たずにコマンドを送る（応答は送った順に receive() で読む）"""
+        payload = {"token": self._token, "command": command, **params}
+        try:
+            self._socket.sendall(json.dumps(payload, ensure_ascii=False).encode("utf-8") + b"\n")
+        except OSError as e:
+            raise ControlError(f"コマンドを送信できません: {e}")
+    
+    def receive(self) -> dict:
+        try:
+            line = self._reader.readline(CONTROL_MAX_LINE_BYTES)
+        except OSError as e:
+            raise ControlError(f"応答を受信できません: {e}")
+        if not line:
+            raise ControlError("接続が切断されました")
+        return json.loads(line)
+
+
+def send_command(command: str, **params) -> dict:
+    """実行中のインスタンスにコマンドを1つ送る"""
+    with ControlClient() as client:
+        return client.request(command, **params)
+
@@ -3,7 +3,6 @@ VRChat Discord Uploader - Discord Webhook連携
 Embed形式での画像転送、リトライ機構
 """
 import time
-import requests
 from pathlib import Path
 from typing import Optional, Tuple, List
 from datetime import datetime
@@ -14,6 +13,8 @@ from src.constants import (
     APP_NAME,
     APP_VERSION
 )
+from src.core.pipeline_metrics import pipeline_metrics
+from src.core.webhook_check import webhook_checker
 from src.utils.logger import get_logger
 from src.utils.helpers import format_file_size, get_file_modified_time
 
@@ -28,20 +29,9 @@ class DiscordWebhook:
         self.username = username
     
     def test_connection(self) -> Tuple[bool, str]:
-        """Webhook接続をテスト"""
-        try:
-            # GETリクエストでWebhookの有効性を確認
-            response = requests.get(self.webhook_url, timeout=10)
-            if response.status_code == 200:
-                data = response.json()
-                name = data.get("name", "Unknown")
-                return True, f"接続成功: {name}"
-            else:
-                return False, f"接続失敗: HTTPステータス {response.status_code}"
-        except requests.exceptions.Timeout:
-            return False, "接続タイムアウト"
-        except requests.exceptions.RequestException as e:
-            return False, f"接続エラー: {str(e)}"
+        """Webhook接続をテスト（ブロッキング。GUIからは WebhookCheckWorker を使う）"""
+        result = webhook_checker.check(self.webhook_url)
+        return result.success, result.summary()
     
     def send_image(
         self,
@@ -57,6 +47,8 @@ class DiscordWebhook:
         Returns:
             Tuple[成功フラグ, メッセージID, エラーメッセージ]
         """
+        import requests  # 起動を速くするため、初回の送信時に読み込む
+        
         if not image_path.exists():
             return False, None, "ファイルが存在しません"
         
@@ -170,6 +162,8 @@ class DiscordWebhook:
                     # レート制限
                     retry_after = response.json().get("retry_after", 60)
                     logger.warning(f"レート制限中、{retry_after}秒後にリトライ")
+                    pipeline_metrics.increment("rate_limited")
+                    pipeline_metrics.increment("retries")
                     time.sleep(retry_after)
                     continue
                 
@@ -185,6 +179,7 @@ class DiscordWebhook:
                     if attempt < DISCORD_MAX_RETRIES - 1:
                         wait_time = (2 ** attempt) * 5  # 指数バックオフ
                         logger.info(f"{wait_time}秒後にリトライ")
+                        pipeline_metrics.increment("retries")
                         time.sleep(wait_time)
                     else:
                         return False, None, error_msg
@@ -193,6 +188,7 @@ class DiscordWebhook:
                 error_msg = "送信タイムアウト"
                 logger.error(error_msg)
                 if attempt < DISCORD_MAX_RETRIES - 1:
+                    pipeline_metrics.increment("retries")
                     time.sleep(5)
                 else:
                     return False, None, error_msg
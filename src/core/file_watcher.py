@@ -1,28 +1,33 @@
 """
 VRChat Discord Uploader - ファイル監視
-VRChatスクリーンショットフォルダの監視
+VRChatスクリーンショットフォルダ等、複数の監視ルートを1つのObserverで監視
 """
 import time
 from pathlib import Path
-from typing import Callable, Optional
-from threading import Thread, Event
+from typing import Callable, Optional, Dict, List, Tuple
+from threading import Thread, Event, Lock
 
 from watchdog.observers import Observer
+from watchdog.observers.api import ObservedWatch
 from watchdog.events import FileSystemEventHandler, FileCreatedEvent
 
-from src.constants import SUPPORTED_IMAGE_EXTENSIONS
+from src.core.config_manager import WatchRoot, unique_watch_roots
+from src.core.pipeline_metrics import pipeline_metrics
 from src.utils.logger import get_logger
 
 logger = get_logger()
 
 
 class ImageFileHandler(FileSystemEventHandler):
-    """画像ファイル作成イベントハンドラ"""
+    """画像ファイル作成イベントハンドラ（監視ルートごと）"""
     
-    def __init__(self, callback: Callable[[Path], None]):
+    def __init__(self, root: WatchRoot, callback: Callable[[Path, WatchRoot], None],
+                 processing: set, processing_lock: Lock):
         super().__init__()
+        self.root = root
         self.callback = callback
-        self._processing = set()  # 処理中のファイルを追跡
+        self._processing = processing  # 処理中のファイルを追跡（全ルートで共有）
+        self._processing_lock = processing_lock
     
     def on_created(self, event):
         """ファイル作成時のイベント"""
@@ -32,7 +37,7 @@ class ImageFileHandler(FileSystemEventHandler):
         file_path = Path(event.src_path)
         
         # 拡張子チェック
-        if file_path.suffix.lower() not in SUPPORTED_IMAGE_EXTENSIONS:
+        if file_path.suffix.lower() not in self.root.extensions:
             return
         
         # 一時ファイルはスキップ
@@ -40,10 +45,10 @@ class ImageFileHandler(FileSystemEventHandler):
             return
         
         # 重複処理防止
-        if str(file_path) in self._processing:
-            return
-        
-        self._processing.add(str(file_path))
+        with self._processing_lock:
+            if str(file_path) in self._processing:
+                return
+            self._processing.add(str(file_path))
         
         # ファイル書き込み完了を待つ
         Thread(target=self._wait_and_process, args=(file_path,), daemon=True).start()
@@ -52,71 +57,90 @@ class ImageFileHandler(FileSystemEventHandler):
         """ファイル書き込み完了を待ってからコールバックを実行"""
         try:
             # ファイルサイズが安定するまで待機
-            last_size = -1
-            stable_count = 0
-            
-            for _ in range(30):  # 最大30秒待機
-                if not file_path.exists():
-                    return
+            with pipeline_metrics.span("stabilize"):
+                last_size = -1
+                stable_count = 0
                 
-                current_size = file_path.stat().st_size
-                if current_size == last_size and current_size > 0:
-                    stable_count += 1
-                    if stable_count >= 2:  # 2秒間サイズが安定
-                        break
-                else:
-                    stable_count = 0
-                    last_size = current_size
-                
-                time.sleep(1)
+                for _ in range(30):  # 最大30秒待機
+                    if not file_path.exists():
+                        return
+                    
+                    current_size = file_path.stat().st_size
+                    if current_size == last_size and current_size > 0:
+                        stable_count += 1
+                        if stable_count >= 2:  # 2秒間サイズが安定
+                            break
+                    else:
+                        stable_count = 0
+                        last_size = current_size
+                    
+                    time.sleep(1)
             
             logger.info(f"新しい画像を検出: {file_path.name}")
-            self.callback(file_path)
+            # ルール変更後のイベントにも追従できるよう、実行時点のルートを渡す
+            self.callback(file_path, self.root)
         
         except Exception as e:
             logger.error(f"ファイル処理エラー: {e}")
         
         finally:
-            self._processing.discard(str(file_path))
+            with self._processing_lock:
+                self._processing.discard(str(file_path))
 
 
 class FileWatcher:
-    """ファイル監視クラス"""
+    """ファイル監視クラス
+    
+    全ての監視ルートを1つのObserverで監視する。ルートの追加・削除は
+    該当ルートのwatchのみを更新し、他のルートや処理中のイベントには影響しない。
+    """
     
-    def __init__(self, watch_folder: Path, callback: Callable[[Path], None]):
-        self.watch_folder = Path(watch_folder)
+    def __init__(self, roots: List[WatchRoot], callback: Callable[[Path, WatchRoot], None]):
+        self.roots = unique_watch_roots(roots)
         self.callback = callback
         self._observer: Optional[Observer] = None
         self._running = Event()
+        self._lock = Lock()
+        self._watches: Dict[str, Tuple[ObservedWatch, ImageFileHandler]] = {}  # key -> (watch, handler)
+        self._processing = set()
+        self._processing_lock = Lock()
     
     @property
     def is_running(self) -> bool:
         """監視が実行中かどうか"""
         return self._running.is_set()
     
+    @property
+    def watched_roots(self) -> List[WatchRoot]:
+        """現在監視中のルート一覧"""
+        with self._lock:
+            return [handler.root for _, handler in self._watches.values()]
+    
     def start(self) -> bool:
         """監視を開始"""
         if self.is_running:
             logger.warning("監視は既に実行中です")
             return False
         
-        if not self.watch_folder.exists():
-            logger.error(f"監視フォルダが存在しません: {self.watch_folder}")
-            return False
-        
         try:
             self._observer = Observer()
-            handler = ImageFileHandler(self.callback)
-            self._observer.schedule(handler, str(self.watch_folder), recursive=True)
             self._observer.start()
             self._running.set()
-            
-            logger.info(f"ファイル監視を開始: {self.watch_folder}")
-            return True
         
         except Exception as e:
             logger.error(f"監視開始エラー: {e}")
             return False
+        
+        for root in self.roots:
+            self._schedule(root)
+        
+        if not self._watches:
+            logger.error("監視可能なフォルダがありません")
+            self.stop()
+            return False
+        
+        logger.info(f"ファイル監視を開始: {len(self._watches)}件のフォルダ")
+        return True
     
     def stop(self) -> None:
         """監視を停止"""
@@ -124,9 +148,94 @@ class FileWatcher:
             self._observer.stop()
             self._observer.join(timeout=5)
             self._running.clear()
+            with self._lock:
+                self._watches.clear()
             logger.info("ファイル監視を停止しました")
     
     def restart(self) -> bool:
         """監視を再起動"""
         self.stop()
         return self.start()
+    
+    def add_root(self, root: WatchRoot) -> bool:
+        """監視ルートを追加（実行中なら即座に監視を開始）"""
+        self.roots = [r for r in self.roots if r.key != root.key] + [root]
+        if not self.is_running:
+            return True
+        return self._schedule(root)
+    
+    def remove_root(self, root: WatchRoot) -> None:
+        """監視ルートを削除（このルートのwatchのみ解除）"""
+        self.roots = [r for r in self.roots if r.key != root.key]
+        if self.is_running:
+            self._unschedule(root.key)
+    
+    def update_roots(self, roots: List[WatchRoot]) -> None:
+        """監視ルートを差分更新
+        
+        追加・削除されたルートのみwatchを変更し、ルールのみ変わったルートは
+        ハンドラのルートを差し替える（watchは維持）。
+        """
+        new_roots = {root.key: root for root in unique_watch_roots(roots)}
+        old_keys = {root.key for root in self.roots}
+        self.roots = list(new_roots.values())
+        
+        if not self.is_running:
+            return
+        
+        for key in old_keys - new_roots.keys():
+            self._unschedule(key)
+        
+        for key, root in new_roots.items():
+            with self._lock:
+                entry = self._watches.get(key)
+            if entry is None:
+                self._schedule(root)
+                continue
+            
+            _, handler = entry
+            if handler.root.recursive != root.recursive:
+                # 再帰設定の変更はwatchの張り直しが必要
+                self._unschedule(key)
+                self._schedule(root)
+            elif handler.root != root:
+                handler.root = root
+                logger.info(f"監視ルールを更新: {root.path}")
+    
+    def _schedule(self, root: WatchRoot) -> bool:
+        """ルートをObserverに登録"""
+        path = Path(root.path)
+        if not path.exists():
+            logger.error(f"監視フォルダが存在しません: {path}")
+            return False
+        
+        with self._lock:
+            if root.key in self._watches:
+                return True
+            
+            try:
+                handler = ImageFileHandler(
+                    root, self.callback, self._processing, self._processing_lock
+                )
+                watch = self._observer.schedule(handler, str(path), recursive=root.recursive)
+                self._watches[root.key] = (watch, handler)
+            except Exception as e:
+                logger.error(f"監視開始エラー ({path}): {e}")
+                return False
+        
+        logger.info(f"監視フォルダを追加: {path}")
+        return True
+    
+    def _unschedule(self, key: str) -> None:
+        """ルートのwatchを解除"""
+        with self._lock:
+            entry = self._watches.pop(key, None)
+        if entry is None:
+            return
+        
+        watch, handler = entry
+        try:
+            self._observer.unschedule(watch)
+            logger.info(f"監視フォルダを解除: {handler.root.path}")
+        except Exception as e:
+            logger.warning(f"監視解除エラー ({handler.root.path}): {e}")
@@ -4,16 +4,19 @@ VRChat Discord Uploader - 画像処理
 """
 import io
 from pathlib import Path
-from typing import Tuple, Optional
-from PIL import Image
+from typing import Tuple, Optional, TYPE_CHECKING
 
 from src.constants import (
     DISCORD_MAX_FILE_SIZE,
     IMAGE_MAX_RESOLUTION_4K,
     IMAGE_MAX_RESOLUTION_1440P
 )
+from src.core.thumbnail_cache import thumbnail_cache
 from src.utils.logger import get_logger
 
+if TYPE_CHECKING:
+    from PIL import Image
+
 logger = get_logger()
 
 
@@ -27,9 +30,13 @@ class ImageProcessor:
         """圧縮が必要かどうかを判定"""
         return image_path.stat().st_size > self.threshold_bytes
     
-    def process_image(self, image_path: Path) -> Tuple[Path, int, int, bool]:
+    def process_image(self, image_path: Path, file_hash: Optional[str] = None) -> Tuple[Path, int, int, bool]:
         """画像を処理し、必要に応じて圧縮
         
+        Args:
+            image_path: 画像のパス
+            file_hash: 指定時は、圧縮のために読み込んだ画像からサムネイルも作成する
+        
         Returns:
             Tuple[処理後のパス, 元サイズ, 処理後サイズ, 圧縮したかどうか]
         """
@@ -41,6 +48,9 @@ class ImageProcessor:
         
         logger.info(f"圧縮を開始: {image_path.name} ({original_size} bytes)")
         
+        # Pillowは読み込みに時間がかかるため、圧縮が必要になったときに読み込む
+        from PIL import Image
+        
         try:
             # 画像を読み込み
             with Image.open(image_path) as img:
@@ -53,6 +63,9 @@ class ImageProcessor:
                 elif img.mode != "RGB":
                     img = img.convert("RGB")
                 
+                if file_hash:
+                    thumbnail_cache.put_image(file_hash, img)
+                
                 # 最初に4Kにリサイズを試みる
                 compressed_img, compressed_bytes = self._compress_with_resize(
                     img, IMAGE_MAX_RESOLUTION_4K
@@ -84,10 +97,12 @@ class ImageProcessor:
     
     def _compress_with_resize(
         self, 
-        img: Image.Image, 
+        img: "Image.Image", 
         max_resolution: Tuple[int, int]
-    ) -> Tuple[Image.Image, int]:
+    ) -> Tuple["Image.Image", int]:
         """指定解像度にリサイズして圧縮サイズを返す"""
+        from PIL import Image
+        
         # アスペクト比を維持してリサイズ
         img_copy = img.copy()
         img_copy.thumbnail(max_resolution, Image.Resampling.LANCZOS)
@@ -0,0 +1,148 @@
+"""
+VRChat Discord Uploader - 転送パイプラインの計測
+段階（書き込み待ち・ハッシュ計算・圧縮・ログ参照・スレッド作成・送信・記録）ごとの
+所要時間と処理中の件数、送信速度、レート制限・リトライ回数を直近の一定時間分集計する
+"""
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Deque, Dict, Iterator, Tuple
+
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+# 段階名と表示名（パイプラインの順）
+STAGES: Tuple[Tuple[str, str], ...] = (
+    ("stabilize", "書き込み待ち"),
+    ("hash", "重複確認・ハッシュ計算"),
+    ("compress", "圧縮"),
+    ("log_lookup", "ログ参照"),
+    ("thread", "スレッド作成"),
+    ("upload", "送信"),
+    ("record", "履歴の記録"),
+)
+
+# カウンター名と表示名
+COUNTERS: Tuple[Tuple[str, str], ...] = (
+    ("transferred", "転送成功"),
+    ("failed", "転送失敗"),
+    ("duplicates", "転送済みのためスキップ"),
+    ("rate_limited", "レート制限 (429)"),
+    ("retries", "リトライ"),
+)
+
+METRICS_WINDOW_SECONDS = 15 * 60  # 集計する期間
+METRICS_MAX_SAMPLES = 2000  # 段階ごとに保持する計測値の上限
+
+
+def _percentile(sorted_values, ratio: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * ratio))
+    return sorted_values[index]
+
+
+class PipelineMetrics:
+    """転送パイプラインの計測値（スレッドセーフ）
+    
+    計測値は (終了時刻, 秒) を段階ごとに保持し、集計時に
+    METRICS_WINDOW_SECONDS より古いものを捨てる。
+    """
+    
+    def __init__(self, window_seconds: float = METRICS_WINDOW_SECONDS,
+                 max_samples: int = METRICS_MAX_SAMPLES):
+        self.window_seconds = window_seconds
+        self._lock = threading.Lock()
+        self._samples: Dict[str, Deque[Tuple[float, float]]] = {
+            stage: deque(maxlen=max_samples) for stage, _ in STAGES
+        }
+        self._in_flight: Dict[str, int] = {stage: 0 for stage, _ in STAGES}
+        self._counters: Dict[str, int] = {name: 0 for name, _ in COUNTERS}
+        self._uploads: Deque[Tuple[float, int, float]] = deque(maxlen=max_samples)  # (終了時刻, バイト数, 秒)
+        self._started_at = datetime.now()
+    
+    @contextmanager
+    def span(self, stage: str) -> Iterator[None]:
+        """段階の所要時間を計測する（例外で抜けた場合も記録する）"""
+        with self._lock:
+            self._in_flight[stage] = self._in_flight.get(stage, 0) + 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._in_flight[stage] -= 1
+                self._samples.setdefault(stage, deque(maxlen=METRICS_MAX_SAMPLES)).append(
+                    (time.monotonic(), elapsed)
+                )
+    
+    def increment(self, counter: str, count: int = 1) -> None:
+        with self._lock:
+            self._counters[counter] = self._counters.get(counter, 0) + count
+    
+    def record_upload(self, size_bytes: int, seconds: float) -> None:
+        """送信したバイト数と所要時間を記録"""
+        with self._lock:
+            self._uploads.append((time.monotonic(), size_bytes, seconds))
+    
+    def snapshot(self) -> dict:
+        """現在の集計値（JSONに変換できる辞書）"""
+        cutoff = time.monotonic() - self.window_seconds
+        with self._lock:
+            samples = {
+                stage: [seconds for ended, seconds in values if ended >= cutoff]
+                for stage, values in self._samples.items()
+            }
+            in_flight = dict(self._in_flight)
+            counters = dict(self._counters)
+            uploads = [(size, seconds) for ended, size, seconds in self._uploads if ended >= cutoff]
+        
+        stages = {}
+        for stage, values in samples.items():
+            values.sort()
+            stages[stage] = {
+                "in_flight": in_flight.get(stage, 0),
+                "count": len(values),
+                "p50_ms": round(_percentile(values, 0.50) * 1000, 1),
+                "p95_ms": round(_percentile(values, 0.95) * 1000, 1),
+                "max_ms": round(values[-1] * 1000, 1) if values else 0.0,
+            }
+        
+        upload_bytes = sum(size for size, _ in uploads)
+        upload_seconds = sum(seconds for _, seconds in uploads)
+        return {
+            "generated_at": datetime.now().isoformat(timespec="seconds"),
+            "started_at": self._started_at.isoformat(timespec="seconds"),
+            "window_seconds": self.window_seconds,
+            "stages": stages,
+            "upload": {
+                "count": len(uploads),
+                "bytes": upload_bytes,
+                "mb_per_s": round(upload_bytes / 1024 / 1024 / upload_seconds, 2) if upload_seconds else 0.0,
+            },
+            "counters": counters,
+        }
+    
+    def export_json(self, path: Path) -> None:
+        """集計値をJSONファイルに書き出す"""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, ensure_ascii=False, indent=2)
+        logger.info(f"パイプラインの計測値を書き出しました: {path}")
+    
+    def reset(self) -> None:
+        with self._lock:
+            for values in self._samples.values():
+                values.clear()
+            self._uploads.clear()
+            self._counters = {name: 0 for name, _ in COUNTERS}
+            self._started_at = datetime.now()
+
+
+# シングルトンインスタンス
+pipeline_metrics = PipelineMetrics()
@@ -2,10 +2,11 @@
 VRChat Discord Uploader - 月別スレッド管理
 """
 import threading
-import requests
 from typing import Optional, Tuple
 from datetime import datetime
 
+from src.core.pipeline_metrics import pipeline_metrics
+from src.core.webhook_check import webhook_checker
 from src.utils.logger import get_logger
 from src.utils.helpers import get_month_thread_name
 from src.db.repository import transfer_repository
@@ -16,8 +17,14 @@ logger = get_logger()
 class ThreadManager:
     """Discord月別スレッド管理クラス"""
     
-    def __init__(self, webhook_url: str):
+    def __init__(self, webhook_url: str, scope: Optional[str] = None):
+        """
+        Args:
+            webhook_url: 投稿先のWebhook URL
+            scope: 既定以外のWebhookでスレッドを区別するためのキー（Webhook ID等）
+        """
         self.webhook_url = webhook_url
+        self.scope = scope
         self._thread_cache: dict[str, str] = {}  # month -> thread_id
         self._lock = threading.Lock()  # 並行アクセス時のレースコンディション防止
     
@@ -30,20 +37,28 @@ class ThreadManager:
         Returns:
             Tuple[スレッドID, エラーメッセージ]
         """
+        import requests
+        
         thread_name = get_month_thread_name(image_date)
+        # DB・キャッシュのキー（既定のWebhookは従来通り月名のみ）
+        thread_key = f"{thread_name}@{self.scope}" if self.scope else thread_name
         
         # ロックを取得して、並行アクセス時の重複スレッド作成を防止
         with self._lock:
             # 1. キャッシュを確認
-            if thread_name in self._thread_cache:
-                return self._thread_cache[thread_name], None
+            if thread_key in self._thread_cache:
+                return self._thread_cache[thread_key], None
             
             # 2. DBを確認
-            db_thread_id = transfer_repository.get_thread_id_by_month(thread_name)
+            db_thread_id = transfer_repository.get_thread_id_by_month(thread_key)
             if db_thread_id:
-                self._thread_cache[thread_name] = db_thread_id
+                self._thread_cache[thread_key] = db_thread_id
                 return db_thread_id, None
             
+            # フォーラムでないと分かっていれば、拒否される作成要求を送らない
+            if webhook_checker.forum_hint(self.webhook_url) is False:
+                return None, "TEXT_CHANNEL_LIMIT"
+            
             try:
                 # 3. Webhookでスレッドを作成
                 # NOTE: Webhookでの thread_name パラメータによる自動スレッド作成は、
@@ -75,8 +90,9 @@ class ThreadManager:
                         thread_id = data.get("channel_id")
                     
                     if thread_id:
-                        self._thread_cache[thread_name] = thread_id
-                        transfer_repository.save_thread_id(thread_name, thread_id)
+                        webhook_checker.set_forum_hint(self.webhook_url, True)
+                        self._thread_cache[thread_key] = thread_id
+                        transfer_repository.save_thread_id(thread_key, thread_id)
                         logger.info(f"月別スレッドを作成しました: {thread_name} (ID: {thread_id})")
                         return thread_id, None
                     else:
@@ -87,10 +103,13 @@ class ThreadManager:
                     error_msg = response.json().get("message", "")
                     if "forum channels" in error_msg.lower():
                         logger.warning("現在のWebhookチャンネルはフォーラムではないため、スレッドを自動作成できません")
+                        webhook_checker.set_forum_hint(self.webhook_url, False)
                         return None, "TEXT_CHANNEL_LIMIT"  # 特殊なエラーコードとして返す
                     return None, f"スレッド作成失敗: {error_msg}"
                 
                 else:
+                    if response.status_code == 429:
+                        pipeline_metrics.increment("rate_limited")
                     return None, f"スレッド作成失敗: HTTP {response.status_code}"
             
             except requests.exceptions.Timeout:
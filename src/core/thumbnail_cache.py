@@ -0,0 +1,206 @@
+"""
+VRChat Discord Uploader - サムネイルキャッシュ
+スクリーンショットの縮小画像をファイルハッシュをキーにしてディスクに保存する。
+合計サイズが上限を超えたら、最近使われていないものから削除する
+"""
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional, Tuple, TYPE_CHECKING
+
+from src.constants import THUMBNAIL_CACHE_DIR, THUMBNAIL_CACHE_MAX_BYTES, THUMBNAIL_SIZE
+from src.utils.logger import get_logger
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+logger = get_logger()
+
+THUMBNAIL_QUALITY = 80
+THUMBNAIL_WORKERS = 2
+EVICT_TARGET_RATIO = 0.8  # 上限を超えたらこの割合まで減らす
+TOUCH_INTERVAL_SECONDS = 60 * 60  # 使用時刻（mtime）の更新間隔
+
+
+class ThumbnailCache:
+    """ファイルハッシュをキーにしたサムネイルのディスクキャッシュ
+    
+    サムネイルは <キャッシュ>/<ハッシュの先頭2文字>/<ハッシュ>.jpg に置く。
+    使用時刻はファイルの更新時刻で表し、追い出しは更新時刻の古い順に行う。
+    """
+    
+    def __init__(self, cache_dir: Path = THUMBNAIL_CACHE_DIR,
+                 max_bytes: int = THUMBNAIL_CACHE_MAX_BYTES,
+                 size: Tuple[int, int] = THUMBNAIL_SIZE):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.size = size
+        self._lock = threading.Lock()
+        self._total_bytes: Optional[int] = None  # 初回の書き込み時に集計
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._in_flight: Dict[str, Future] = {}
+    
+    def path_for(self, file_hash: str) -> Path:
+        return self.cache_dir / file_hash[:2] / f"{file_hash}.jpg"
+    
+    def get(self, file_hash: str) -> Optional[Path]:
+        """キャッシュ済みのサムネイルのパス（なければNone）"""
+        path = self.path_for(file_hash)
+        try:
+            mtime = path.stat().st_mtime
+        except OSError:
+            return None
+        return path if self._touch(path, mtime) else None
+    
+    def _touch(self, path: Path, mtime: float) -> bool:
+        """使用時刻を更新（頻繁な書き込みを避けるため一定間隔ごと）"""
+        now = time.time()
+        if now - mtime >= TOUCH_INTERVAL_SECONDS:
+            try:
+                os.utime(path, (now, now))
+            except OSError:
+                return False
+        return True
+    
+    def put_image(self, file_hash: str, image: "Image.Image") -> Optional[Path]:
+        """デコード済みの画像からサムネイルを作成して保存
+        
+        ImageProcessor の圧縮処理など、画像を既に読み込んでいる場合に使う。
+        """
+        from PIL import Image
+        
+        try:
+            width, height = image.size
+            scale = min(self.size[0] / width, self.size[1] / height, 1.0)
+            target = (max(1, round(width * scale)), max(1, round(height * scale)))
+            # reducing_gap で整数倍の縮小を先に行い、4K/8Kでも元画像を複製せずに縮小する
+            thumbnail = image.resize(target, Image.Resampling.BICUBIC, reducing_gap=2.0)
+            if thumbnail.mode != "RGB":
+                thumbnail = thumbnail.convert("RGB")
+            return self._store(file_hash, thumbnail)
+        except Exception as e:
+            logger.warning(f"サムネイルの作成に失敗しました: {e}")
+            return None
+    
+    def get_or_create(self, file_hash: str, source_path: Path) -> Optional[Path]:
+        """サムネイルを取得し、なければ元画像から作成（呼び出し元のスレッドで実行）"""
+        path = self.get(file_hash)
+        if path is not None:
+            return path
+        from PIL import Image
+        
+        try:
+            with Image.open(source_path) as image:
+                # JPEGはデコード時に縮小できる
+                image.draft("RGB", self.size)
+                return self.put_image(file_hash, image)
+        except Exception as e:
+            logger.debug(f"サムネイルを作成できません: {source_path} ({e})")
+            return None
+    
+    def request(self, file_hash: str, source_path: Path) -> "Future[Optional[Path]]":
+        """サムネイルの取得・作成をバックグラウンドで行う（同じハッシュの要求はまとめる）"""
+        with self._lock:
+            future = self._in_flight.get(file_hash)
+            if future is not None:
+                return future
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=THUMBNAIL_WORKERS, thread_name_prefix="Thumbnail"
+                )
+            future = self._executor.submit(self.get_or_create, file_hash, source_path)
+            self._in_flight[file_hash] = future
+        
+        def on_done(_):
+            with self._lock:
+                self._in_flight.pop(file_hash, None)
+        
+        future.add_done_callback(on_done)
+        return future
+    
+    def _store(self, file_hash: str, thumbnail: "Image.Image") -> Path:
+        path = self.path_for(file_hash)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # 読み取り中のスレッドに書きかけのファイルを見せないよう、一時ファイルから置き換える
+        temp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        try:
+            thumbnail.save(temp_path, "JPEG", quality=THUMBNAIL_QUALITY, optimize=True)
+            size = temp_path.stat().st_size
+            old_size = path.stat().st_size if path.exists() else 0
+            os.replace(temp_path, path)
+        finally:
+            # 保存・置き換えに失敗したときに一時ファイルを残さない（成功時は既に無い）
+            if temp_path.exists():
+                try:
+                    temp_path.unlink()
+                except OSError:
+                    pass
+        
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = self._scan_total()
+            else:
+                self._total_bytes += size - old_size
+            over = self._total_bytes > self.max_bytes
+        if over:
+            self.evict()
+        return path
+    
+    def _scan_total(self) -> int:
+        total = 0
+        for entry in self.cache_dir.glob("*/*.jpg"):
+            try:
+                total += entry.stat().st_size
+            except OSError:
+                pass
+        return total
+    
+    def evict(self) -> int:
+        """使用時刻の古いものから、合計が上限の EVICT_TARGET_RATIO 以下になるまで削除
+        
+        Returns:
+            削除した数
+        """
+        entries = []
+        for entry in self.cache_dir.glob("*/*.jpg"):
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry))
+        entries.sort()
+        
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * EVICT_TARGET_RATIO)
+        removed = 0
+        for _, size, entry in entries:
+            if total <= target:
+                break
+            try:
+                entry.unlink()
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        
+        with self._lock:
+            self._total_bytes = total
+        if removed:
+            logger.debug(f"サムネイルを{removed}件削除しました（{total / 1024 / 1024:.1f}MB）")
+        return removed
+    
+    def clear(self) -> None:
+        """全てのサムネイルを削除"""
+        for entry in self.cache_dir.glob("*/*.jpg"):
+            try:
+                entry.unlink()
+            except OSError:
+                pass
+        with self._lock:
+            self._total_bytes = 0
+
+
+# シングルトンインスタンス
+thumbnail_cache = ThumbnailCache()
@@ -0,0 +1,432 @@
+"""
+VRChat Discord Uploader - 転送パイプライン
+重複確認・圧縮・スレッド解決・送信・記録までの1ファイルの転送処理と、
+転送待ちキュー。GUI・ヘッドレスの両方から使うためQtに依存しない
+"""
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from src.core.config_manager import (
+    config_manager, Config, WatchRoot, THREAD_POLICY_MONTHLY, THREAD_POLICY_NONE
+)
+from src.core.discord_webhook import DiscordWebhook
+from src.core.thread_manager import ThreadManager
+from src.core.image_processor import ImageProcessor
+from src.core.thumbnail_cache import thumbnail_cache
+from src.core.pipeline_metrics import pipeline_metrics
+from src.core.vrchat_log_parser import vrchat_log_parser
+from src.db.repository import transfer_repository
+from src.db.models import TransferRecord
+from src.utils.helpers import (
+    calculate_file_hash, get_webhook_id, parse_vrchat_filename, get_file_modified_time
+)
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+TRANSFER_WORKERS = 2  # 同時に転送する数
+
+# 撮影時刻のワールド名とユーザーのリスト
+LogContext = Tuple[Optional[str], List[str]]
+
+
+@dataclass
+class TransferResult:
+    """1ファイルの転送結果"""
+    success: bool
+    filename: str
+    message: str
+    thumbnail_path: Optional[Path] = None  # 転送後の通知用
+    duplicate: bool = False  # 転送済みのため送らなかった（失敗ではない）
+
+
+@dataclass
+class TransferItem:
+    """転送待ちの1ファイル"""
+    path: Path
+    root: WatchRoot
+    bulk: bool = False  # 制御コマンドでまとめて追加された（通知は1件ずつ出さない）
+    log_context: Optional[LogContext] = None  # まとめて解決済みのワールド・ユーザー
+
+
+def get_capture_time(image_path: Path) -> datetime:
+    """撮影日時（ファイル名から、失敗した場合は更新日時）"""
+    return parse_vrchat_filename(image_path.name) or get_file_modified_time(image_path)
+
+
+def resolve_log_contexts(image_paths: Sequence[Path]) -> List[Optional[LogContext]]:
+    """複数の画像のワールド・ユーザーをログファイルごとに1回の走査でまとめて解決
+    
+    転送済みと分かっているファイルは解決しない。ログファイルから解決できなかった
+    ものは None を返し、転送時に1件ずつ（ログイベントストアも含めて）調べる。
+    
+    Returns:
+        image_paths と同じ順序の LogContext（解決しなかったものは None）
+    """
+    contexts: List[Optional[LogContext]] = [None] * len(image_paths)
+    indexes = []
+    times = []
+    for index, image_path in enumerate(image_paths):
+        try:
+            stat = image_path.stat()
+            if transfer_repository.exists_by_fingerprint(str(image_path), stat.st_size, stat.st_mtime_ns):
+                continue
+            times.append(get_capture_time(image_path))
+        except Exception as e:
+            logger.debug(f"撮影日時を取得できませんでした ({image_path.name}): {e}")
+            continue
+        indexes.append(index)
+    if not times:
+        return contexts
+    
+    try:
+        with pipeline_metrics.span("log_lookup"):
+            results = vrchat_log_parser.get_world_and_users_at_times(times)
+    except Exception as e:
+        logger.warning(f"ワールド/ユーザー情報の一括取得に失敗しました: {e}")
+        return contexts
+    for index, (world_name, users) in zip(indexes, results):
+        if world_name:
+            contexts[index] = (world_name, users)
+    return contexts
+
+
+def transfer_image(image_path: Path, webhook: DiscordWebhook, processor: ImageProcessor,
+                   thread_manager: Optional[ThreadManager] = None,
+                   enable_monthly_thread: bool = False,
+                   enable_instance_users: bool = False,
+                   log_context: Optional[LogContext] = None) -> TransferResult:
+    """画像を1枚転送する（ブロッキング。ワーカースレッドから呼ぶ）
+    
+    Args:
+        log_context: 解決済みのワールド・ユーザー（Noneならログから調べる）
+    """
+    filename = image_path.name
+    try:
+        # 重複チェック（パス・サイズ・更新時刻が一致すればファイルを読まずに判定）
+        with pipeline_metrics.span("hash"):
+            stat = image_path.stat()
+            duplicate = transfer_repository.exists_by_fingerprint(
+                str(image_path), stat.st_size, stat.st_mtime_ns)
+            if not duplicate:
+                file_hash = calculate_file_hash(image_path)
+                duplicate = transfer_repository.exists_by_hash(file_hash)
+                if duplicate:
+                    transfer_repository.save_fingerprint(
+                        str(image_path), stat.st_size, stat.st_mtime_ns, file_hash
+                    )
+        if duplicate:
+            pipeline_metrics.increment("duplicates")
+            return TransferResult(False, filename, "既に転送済みです", duplicate=True)
+        
+        # 画像処理
+        with pipeline_metrics.span("compress"):
+            processed_path, original_size, final_size, was_compressed = \
+                processor.process_image(image_path, file_hash)
+        
+        # 日付を解析 (ファイル名から、失敗した場合は更新日時)
+        image_date = get_capture_time(image_path)
+        
+        # スレッドIDを取得
+        thread_id = None
+        if enable_monthly_thread and thread_manager:
+            with pipeline_metrics.span("thread"):
+                thread_id, error = thread_manager.get_or_create_monthly_thread(image_date)
+            if error:
+                if error == "TEXT_CHANNEL_LIMIT":
+                    logger.warning("テキストチャンネルのためスレッドを作成できませんでした。通常の投稿を行います。")
+                else:
+                    logger.warning(f"スレッド作成エラー (日付: {image_date}): {error}")
+        
+        # ワールド名とユーザー情報を取得
+        world_name = None
+        users = None
+        instance_users = None
+        try:
+            if log_context is None:
+                with pipeline_metrics.span("log_lookup"):
+                    log_context = vrchat_log_parser.get_world_and_users_at_time(image_date)
+            world_name, users = log_context
+            if enable_instance_users and users:
+                instance_users = users
+        except Exception as e:
+            logger.warning(f"ワールド/ユーザー情報の取得に失敗しました: {e}")
+        
+        # 送信
+        with pipeline_metrics.span("upload"):
+            upload_start = time.perf_counter()
+            success, message_id, error = webhook.send_image(
+                processed_path,
+                original_size=original_size,
+                compressed_size=final_size if was_compressed else None,
+                thread_id=thread_id,
+                world_name=world_name,
+                instance_users=instance_users
+            )
+        if success:
+            pipeline_metrics.record_upload(final_size, time.perf_counter() - upload_start)
+        
+        # 一時ファイルを削除
+        if was_compressed:
+            processor.cleanup_temp_file(processed_path)
+        
+        if not success:
+            pipeline_metrics.increment("failed")
+            return TransferResult(False, filename, error or "転送失敗")
+        
+        # 履歴に記録
+        record = TransferRecord(
+            filename=filename,
+            file_path=str(image_path),
+            file_hash=file_hash,
+            file_size_original=original_size,
+            file_size_compressed=final_size if was_compressed else None,
+            discord_message_id=message_id,
+            discord_thread_id=thread_id,
+            was_compressed=was_compressed,
+            compression_ratio=final_size / original_size if was_compressed else None,
+            file_mtime_ns=stat.st_mtime_ns,
+            world_name=world_name,
+            instance_users=instance_users or None
+        )
+        with pipeline_metrics.span("record"):
+            transfer_repository.add_record(record)
+        
+        # 圧縮した場合は作成済み。履歴・通知用にここで用意しておく
+        thumbnail_path = thumbnail_cache.get_or_create(file_hash, image_path)
+        
+        pipeline_metrics.increment("transferred")
+        msg = "転送成功"
+        if was_compressed:
+            msg += f" (圧縮: {original_size/1024/1024:.1f}MB → {final_size/1024/1024:.1f}MB)"
+        return TransferResult(True, filename, msg, thumbnail_path)
+    
+    except Exception as e:
+        pipeline_metrics.increment("failed")
+        logger.error(f"転送エラー: {e}")
+        return TransferResult(False, filename, str(e))
+
+
+def _threshold_bytes(config: Config) -> int:
+    return int(config.compression_threshold_mb * 1024 * 1024)
+
+
+class TransferPipeline:
+    """設定から転送先を組み立て、監視ルートごとに解決する
+    
+    監視ルート別のWebhookは初回の転送時に作成して再利用する。
+    """
+    
+    def __init__(self):
+        self.webhook: Optional[DiscordWebhook] = None
+        self.thread_manager: Optional[ThreadManager] = None
+        # 監視ルート別Webhookの送信先キャッシュ (url -> (webhook, thread_manager))
+        self._routes: Dict[str, Tuple[DiscordWebhook, ThreadManager]] = {}
+        self._routes_lock = threading.Lock()
+        self.image_processor = ImageProcessor()
+    
+    def load_config(self, config: Optional[Config] = None) -> None:
+        """設定から転送先と圧縮設定を作り直す"""
+        config = config or config_manager.config
+        self._build_default_route(config)
+        with self._routes_lock:
+            self._routes.clear()
+        
+        # 圧縮閾値を設定
+        self.image_processor = ImageProcessor(_threshold_bytes(config))
+    
+    def apply_config(self, config: Config, changed: Set[str]) -> None:
+        """変わった設定項目だけを反映
+        
+        Webhook URLが変わらない限り送信先は作り直さないので、月別スレッドの
+        キャッシュは維持される。転送中のファイルは変更前の送信先で最後まで送る。
+        """
+        if "webhook_url" in changed:
+            self._build_default_route(config)
+        elif "webhook_username" in changed and self.webhook:
+            self.webhook.username = config.webhook_username
+        
+        with self._routes_lock:
+            if "webhook_username" in changed:
+                for webhook, _ in self._routes.values():
+                    webhook.username = config.webhook_username
+            if changed & {"webhook_url", "watch_roots"}:
+                # どのルートからも使われなくなった送信先を破棄
+                urls = {root.webhook_url for root in config.watch_roots} - {config.webhook_url}
+                for url in list(self._routes):
+                    if url not in urls:
+                        del self._routes[url]
+        
+        if "compression_threshold_mb" in changed:
+            self.image_processor.threshold_bytes = _threshold_bytes(config)
+    
+    def _build_default_route(self, config: Config) -> None:
+        if config.webhook_url:
+            self.webhook = DiscordWebhook(config.webhook_url, config.webhook_username)
+            self.thread_manager = ThreadManager(config.webhook_url)
+        else:
+            self.webhook = None
+            self.thread_manager = None
+    
+    def resolve_route(self, root: WatchRoot) -> Tuple[Optional[DiscordWebhook], Optional[ThreadManager], bool]:
+        """監視ルートの転送先を解決
+        
+        Returns:
+            Tuple[Webhook, スレッドマネージャー, 月別スレッドを使うか]
+        """
+        config = config_manager.config
+        
+        if root.thread_policy == THREAD_POLICY_MONTHLY:
+            enable_monthly_thread = True
+        elif root.thread_policy == THREAD_POLICY_NONE:
+            enable_monthly_thread = False
+        else:
+            enable_monthly_thread = config.enable_monthly_thread
+        
+        if not root.webhook_url or root.webhook_url == config.webhook_url:
+            return self.webhook, self.thread_manager, enable_monthly_thread
+        
+        with self._routes_lock:
+            route = self._routes.get(root.webhook_url)
+            if route is None:
+                route = (
+                    DiscordWebhook(root.webhook_url, config.webhook_username),
+                    ThreadManager(root.webhook_url, scope=get_webhook_id(root.webhook_url))
+                )
+                self._routes[root.webhook_url] = route
+        return route[0], route[1], enable_monthly_thread
+    
+    def root_for(self, image_path: Path) -> WatchRoot:
+        """ファイルを含む監視ルート（最も深いもの。どれにも含まれなければ既定の監視フォルダ）"""
+        roots = config_manager.config.all_watch_roots()
+        path = str(Path(image_path).expanduser().resolve()).lower()
+        matches = [root for root in roots if path.startswith(root.key.rstrip("\\/") + os.sep)]
+        if not matches:
+            return roots[0]
+        # 同じフォルダが重複していれば後のもの（unique_watch_roots と同じ規則）
+        return max(reversed(matches), key=lambda root: len(root.key))
+    
+    def transfer(self, image_path: Path, root: WatchRoot,
+                 log_context: Optional[LogContext] = None) -> TransferResult:
+        """監視ルートの設定に従って画像を転送（ブロッキング）"""
+        webhook, thread_manager, enable_monthly_thread = self.resolve_route(root)
+        if not webhook:
+            return TransferResult(False, image_path.name, "Webhook URLが設定されていません")
+        return transfer_image(
+            image_path,
+            webhook,
+            self.image_processor,
+            thread_manager,
+            enable_monthly_thread,
+            config_manager.config.enable_instance_users,
+            log_context
+        )
+
+
+class TransferQueue:
+    """転送待ちのキューとワーカースレッド
+    
+    同じファイルが待ち行列に重複して入らないようにする。一時停止中は
+    待ち行列に溜めるだけで、再開すると順に転送する。
+    """
+    
+    def __init__(self, pipeline: TransferPipeline,
+                 on_result: Optional[Callable[[TransferItem, TransferResult], None]] = None,
+                 workers: int = TRANSFER_WORKERS):
+        self.pipeline = pipeline
+        self.on_result = on_result
+        self._queue: "queue.Queue[Optional[TransferItem]]" = queue.Queue()
+        self._queued = set()
+        self._queued_lock = threading.Lock()
+        self._active = 0
+        self._resumed = threading.Event()
+        self._resumed.set()
+        self._stopping = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._worker_count = workers
+    
+    def start(self) -> None:
+        for i in range(self._worker_count):
+            thread = threading.Thread(target=self._run, name=f"Transfer-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+    
+    def stop(self, timeout: float = 30.0) -> None:
+        """ワーカーを停止（転送中のファイルは最後まで処理し、待ち行列は破棄する）"""
+        self._stopping.set()
+        self._resumed.set()
+        for _ in self._threads:
+            self._queue.put(None)
+        deadline = time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
+        self._threads.clear()
+    
+    def put(self, image_path: Path, root: WatchRoot, bulk: bool = False,
+            log_context: Optional[LogContext] = None) -> bool:
+        """転送待ちに追加（既に待ち行列にあればFalse）
+        
+        Args:
+            bulk: 制御コマンドなどでまとめて追加したファイル
+            log_context: まとめて解決済みのワールド・ユーザー
+        """
+        key = str(image_path)
+        with self._queued_lock:
+            if key in self._queued:
+                return False
+            self._queued.add(key)
+        self._queue.put(TransferItem(image_path, root, bulk, log_context))
+        return True
+    
+    def pause(self) -> None:
+        self._resumed.clear()
+        logger.info("転送を一時停止しました")
+    
+    def resume(self) -> None:
+        self._resumed.set()
+        logger.info("転送を再開しました")
+    
+    @property
+    def is_paused(self) -> bool:
+        return not self._resumed.is_set()
+    
+    @property
+    def pending(self) -> int:
+        """待ち行列の件数（転送中を除く）"""
+        with self._queued_lock:
+            return len(self._queued) - self._active
+    
+    @property
+    def is_idle(self) -> bool:
+        with self._queued_lock:
+            return not self._queued
+    
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            self._resumed.wait()
+            with self._queued_lock:
+                if self._stopping.is_set():
+                    self._queued.discard(str(item.path))
+                    continue
+                self._active += 1
+            try:
+                result = self.pipeline.transfer(item.path, item.root, item.log_context)
+            finally:
+                with self._queued_lock:
+                    self._active -= 1
+                    self._queued.discard(str(item.path))
+            logger.info(f"{result.filename}: {result.message}")
+            if self.on_result is not None:
+                try:
+                    self.on_result(item, result)
+                except Exception as e:
+                    logger.error(f"転送結果の通知エラー: {e}")
@@ -5,7 +5,6 @@ GitHub Releases から最新バージョンを確認し、インストーラー
 import os
 import sys
 import tempfile
-import requests
 import subprocess
 from pathlib import Path
 from typing import Optional, Tuple, Dict, Any
@@ -25,6 +24,8 @@ class UpdateCheckWorker(QThread):
     
     def run(self):
         try:
+            import requests  # 起動を速くするため、ワーカースレッドで読み込む
+            
             logger.info("アップデートの確認を開始します...")
             response = requests.get(GITHUB_API_URL, timeout=10)
             
@@ -83,6 +84,8 @@ class UpdateDownloadWorker(QThread):
         
     def run(self):
         try:
+            import requests
+            
             temp_dir = tempfile.gettempdir()
             installer_path = os.path.join(temp_dir, "VRCUploader_Setup.exe")
             
@@ -4,10 +4,16 @@ VRChatログからワールド情報を取得
 """
 import re
 import os
+import mmap
+import bisect
+import threading
+from collections import deque, OrderedDict
 from pathlib import Path
 from datetime import datetime
-from typing import Optional, List, Tuple
+from typing import Optional, List, Tuple, NamedTuple, Iterable, Iterator, Deque, Set, Dict
 
+from src.db.log_events import LogEventStore
+from src.utils.lazy import LazySingleton
 from src.utils.logger import get_logger
 
 logger = get_logger()
@@ -15,6 +21,53 @@ logger = get_logger()
 # VRChatログディレクトリ
 VRCHAT_LOG_DIR = Path(os.environ.get("LOCALAPPDATA", "")) / ".." / "LocalLow" / "VRChat" / "VRChat"
 
+# ログイベント種別
+EVENT_ENTERING_ROOM = "enter"
+EVENT_PLAYER_JOINED = "join"
+EVENT_PLAYER_LEFT = "leave"
+
+# ログ読み込み単位
+LOG_READ_CHUNK_SIZE = 4 * 1024 * 1024
+
+# 状態チェックポイントを記録する間隔（バイト）と保持するファイル数
+LOG_CHECKPOINT_INTERVAL = 4 * 1024 * 1024
+LOG_CHECKPOINT_MAX_FILES = 8
+
+
+class LogEvent(NamedTuple):
+    """ワールド・ユーザー状態に関係するログイベント"""
+    time: datetime
+    kind: str
+    value: str
+
+
+class SessionState:
+    """ある時点のワールドと参加ユーザーの状態"""
+    
+    def __init__(self, world_name: Optional[str] = None, users: Iterable[str] = ()):
+        self.world_name = world_name
+        self.users: Set[str] = set(users)
+    
+    def apply(self, event: LogEvent) -> None:
+        """イベントを適用して状態を進める"""
+        if event.kind == EVENT_ENTERING_ROOM:
+            self.world_name = event.value
+            self.users.clear()  # ワールド移動時にリストをクリア
+        elif event.kind == EVENT_PLAYER_JOINED:
+            self.users.add(event.value)
+        elif event.kind == EVENT_PLAYER_LEFT:
+            self.users.discard(event.value)
+    
+    def copy(self) -> "SessionState":
+        """状態を複製"""
+        return SessionState(self.world_name, self.users)
+    
+    def snapshot(self) -> Tuple[Optional[str], List[str]]:
+        """(ワールド名, ユーザー名のリスト) に変換"""
+        if not self.world_name:
+            return None, []
+        return self.world_name, sorted(self.users)
+
 
 class VRChatLogParser:
     """VRChatログを解析してワールド情報を取得するクラス"""
@@ -22,25 +75,44 @@ class VRChatLogParser:
     # ログファイル名のパターン: output_log_YYYY-MM-DD_HH-MM-SS.txt
     LOG_FILE_PATTERN = re.compile(r"output_log_(\d{4}-\d{2}-\d{2}_\d{2}-\d{2}-\d{2})\.txt")
     
-    # ワールド参加ログのパターン
-    ENTERING_ROOM_PATTERN = re.compile(
-        r"(\d{4}\.\d{2}\.\d{2} \d{2}:\d{2}:\d{2}) Debug\s+-\s+\[Behaviour\] Entering Room: (.+)"
+    # ワールド参加・ユーザー参加・退出ログを1つにまとめたパターン（バイト列）
+    # group(1): 時刻, group(2): ワールド名, group(3): 参加ユーザー, group(4): 退出ユーザー
+    EVENT_PATTERN = re.compile(
+        rb"[ \t]*(\d{4}\.\d{2}\.\d{2} \d{2}:\d{2}:\d{2}) Debug\s+-\s+\[Behaviour\] (?:"
+        rb"Entering Room: (.+)"
+        rb"|OnPlayerJoined (.+) \(usr_[a-zA-Z0-9-]+\)"
+        rb"|OnPlayerLeft (.+) \(usr_[a-zA-Z0-9-]+\))"
     )
+    EVENT_KINDS = {2: EVENT_ENTERING_ROOM, 3: EVENT_PLAYER_JOINED, 4: EVENT_PLAYER_LEFT}
     
-    # ユーザー参加・退出ログのパターン
-    PLAYER_JOINED_PATTERN = re.compile(
-        r"(\d{4}\.\d{2}\.\d{2} \d{2}:\d{2}:\d{2}) Debug\s+-\s+\[Behaviour\] OnPlayerJoined (.+) \(usr_[a-zA-Z0-9-]+\)"
-    )
-    PLAYER_LEFT_PATTERN = re.compile(
-        r"(\d{4}\.\d{2}\.\d{2} \d{2}:\d{2}:\d{2}) Debug\s+-\s+\[Behaviour\] OnPlayerLeft (.+) \(usr_[a-zA-Z0-9-]+\)"
-    )
+    # 候補行を探すためのパターン（"[Behaviour] " をリテラル接頭辞とする部分文字列検索）
+    CANDIDATE_PATTERN = re.compile(rb"\[Behaviour\] (?:Entering Room: |OnPlayerJoined |OnPlayerLeft )")
+    ENTERING_ROOM_MARKER = b"[Behaviour] Entering Room: "
+    
+    # 二分探索で行頭の時刻を読むためのパターン（バイト列）
+    LINE_TIME_PATTERN = re.compile(rb"\d{4}\.\d{2}\.\d{2} \d{2}:\d{2}:\d{2}")
     
-    def __init__(self, log_dir: Optional[Path] = None):
+    def __init__(self, log_dir: Optional[Path] = None,
+                 event_store: Optional[LogEventStore] = None):
         """
         Args:
             log_dir: VRChatログディレクトリ（指定がない場合はデフォルト）
+            event_store: ログイベントの永続ストア（指定がない場合はデフォルト）
         """
         self.log_dir = Path(log_dir) if log_dir else VRCHAT_LOG_DIR.resolve()
+        self.event_store = event_store if event_store is not None else LogEventStore()
+        self.tailer = LogTailer(self)
+        self._ingest_lock = threading.Lock()
+        # 取り込み済みのログファイルの (サイズ, 更新日時)。変わっていなければストアを見ない
+        self._ingested_stats: Dict[Path, Tuple[int, int]] = {}
+        # ログファイル一覧のキャッシュ（古い順）とディレクトリの更新日時
+        self._log_index: List[Tuple[Path, datetime]] = []
+        self._log_index_starts: List[datetime] = []
+        self._log_index_mtime: Optional[int] = None
+        self._log_index_lock = threading.Lock()
+        # ログファイルごとの状態チェックポイント: path -> (記録時のサイズ, [(オフセット, 状態)])
+        self._checkpoints: "OrderedDict[Path, Tuple[int, List[Tuple[int, SessionState]]]]" = OrderedDict()
+        self._checkpoint_lock = threading.Lock()
     
     def get_log_files(self) -> List[Tuple[Path, datetime]]:
         """ログファイル一覧を取得（日時でソート）
@@ -48,42 +120,63 @@ class VRChatLogParser:
         Returns:
             (ファイルパス, ログ開始日時) のリスト（新しい順）
         """
-        log_files = []
+        return list(reversed(self._get_log_index()[0]))
+    
+    def _get_log_index(self) -> Tuple[List[Tuple[Path, datetime]], List[datetime]]:
+        """ログファイル一覧のキャッシュを取得
         
-        if not self.log_dir.exists():
-            logger.warning(f"VRChatログディレクトリが存在しません: {self.log_dir}")
-            return log_files
+        ディレクトリの更新日時が変わった場合のみ再スキャンする。VRChatが新しいログを
+        作るとディレクトリの更新日時が変わるので、追従（LogTailer）も含めて明示的な
+        破棄は不要。
         
-        for file_path in self.log_dir.glob("output_log_*.txt"):
-            match = self.LOG_FILE_PATTERN.match(file_path.name)
-            if match:
-                try:
-                    # ファイル名から日時をパース
-                    datetime_str = match.group(1)
-                    log_datetime = datetime.strptime(datetime_str, "%Y-%m-%d_%H-%M-%S")
-                    log_files.append((file_path, log_datetime))
-                except ValueError:
-                    continue
+        Returns:
+            ((ファイルパス, ログ開始日時) のリスト（古い順）, ログ開始日時のリスト)
+        """
+        try:
+            mtime = self.log_dir.stat().st_mtime_ns
+        except OSError:
+            logger.warning(f"VRChatログディレクトリが存在しません: {self.log_dir}")
+            return [], []
         
-        # 新しい順にソート
-        log_files.sort(key=lambda x: x[1], reverse=True)
-        return log_files
+        with self._log_index_lock:
+            if mtime == self._log_index_mtime:
+                return self._log_index, self._log_index_starts
+            
+            log_files = []
+            for file_path in self.log_dir.glob("output_log_*.txt"):
+                match = self.LOG_FILE_PATTERN.match(file_path.name)
+                if match:
+                    try:
+                        # ファイル名から日時をパース
+                        datetime_str = match.group(1)
+                        log_datetime = datetime.strptime(datetime_str, "%Y-%m-%d_%H-%M-%S")
+                        log_files.append((file_path, log_datetime))
+                    except ValueError:
+                        continue
+            
+            # 古い順にソート（二分探索用）
+            log_files.sort(key=lambda x: x[1])
+            self._log_index = log_files
+            self._log_index_starts = [log_start_time for _, log_start_time in log_files]
+            self._log_index_mtime = mtime
+            logger.debug(f"ログファイル一覧を更新しました: {len(log_files)}件")
+            return self._log_index, self._log_index_starts
     
     def find_log_file_for_time(self, target_time: datetime) -> Optional[Path]:
         """指定した時刻に対応するログファイルを見つける
         
         Args:
             target_time: 対象の日時
-            
+        
         Returns:
             対応するログファイルのパス（見つからない場合はNone）
         """
-        log_files = self.get_log_files()
+        log_files, start_times = self._get_log_index()
         
         # target_time以前で最も近いログファイルを探す
-        for file_path, log_start_time in log_files:
-            if log_start_time <= target_time:
-                return file_path
+        index = bisect.bisect_right(start_times, target_time) - 1
+        if index >= 0:
+            return log_files[index][0]
         
         return None
     
@@ -92,7 +185,7 @@ class VRChatLogParser:
         
         Args:
             time_str: "YYYY.MM.DD HH:MM:SS" 形式の文字列
-            
+        
         Returns:
             datetimeオブジェクト
         """
@@ -101,126 +194,484 @@ class VRChatLogParser:
         except ValueError:
             return None
     
+    @staticmethod
+    def parse_log_time_bytes(raw: bytes) -> Optional[datetime]:
+        """"YYYY.MM.DD HH:MM:SS" 形式のバイト列を固定位置で切り出してパース
+        
+        strptime より大幅に高速。
+        """
+        try:
+            return datetime(
+                int(raw[0:4]), int(raw[5:7]), int(raw[8:10]),
+                int(raw[11:13]), int(raw[14:16]), int(raw[17:19])
+            )
+        except ValueError:
+            return None
+    
+    def scan_events(self, data, start: int = 0, end: Optional[int] = None) -> List[LogEvent]:
+        """バイト列（bytes / mmap）の [start, end) からイベントを抽出
+        
+        デコードや行分割は行わず、"[Behaviour] Entering Room / OnPlayerJoined /
+        OnPlayerLeft" を含む候補行のみを1つの正規表現で分類する。
+        """
+        if end is None:
+            end = len(data)
+        
+        events = []
+        find = data.find
+        rfind = data.rfind
+        match = self.EVENT_PATTERN.match
+        line_end = start
+        
+        for candidate in self.CANDIDATE_PATTERN.finditer(data, start, end):
+            pos = candidate.start()
+            if pos < line_end:
+                # 同じ行の2つ目以降の候補
+                continue
+            newline = rfind(b"\n", start, pos)
+            line_start = newline + 1 if newline >= 0 else start
+            line_end = find(b"\n", pos, end)
+            if line_end < 0:
+                line_end = end
+            
+            m = match(data, line_start, line_end)
+            if m:
+                log_time = self.parse_log_time_bytes(m.group(1))
+                if log_time is not None:
+                    kind_group = m.lastindex
+                    value = m.group(kind_group)
+                    if kind_group == 2:
+                        value = value.rstrip()
+                    events.append(LogEvent(
+                        log_time,
+                        self.EVENT_KINDS[kind_group],
+                        value.decode("utf-8", errors="ignore")
+                    ))
+        
+        return events
+    
+    def iter_log_events(self, log_file: Path, offset: int = 0) -> Iterator[Tuple[List[LogEvent], int]]:
+        """ログファイルを指定オフセットから読み込み、チャンク単位でイベントを返す
+        
+        書き込み途中の最終行は読み込まない。
+        
+        Yields:
+            (チャンク内のイベント, 読み込み済みオフセット)
+        """
+        with open(log_file, "rb") as f:
+            f.seek(offset)
+            pending = b""
+            while True:
+                chunk = f.read(LOG_READ_CHUNK_SIZE)
+                if not chunk:
+                    break
+                data = pending + chunk if pending else chunk
+                end = data.rfind(b"\n")
+                if end < 0:
+                    pending = data
+                    continue
+                pending = data[end + 1:]
+                offset += end + 1
+                yield self.scan_events(data, 0, end), offset
+    
+    def ingest_logs(self) -> None:
+        """全ログファイルの追記分をイベントストアに取り込む（古い順）
+        
+        前回から変わっていないファイルは stat だけで読み飛ばすので、過去の時刻を
+        検索するたびに呼んでもストアへの書き込みは追記があったときだけになる。
+        """
+        with self._ingest_lock:
+            log_files = self._get_log_index()[0]
+            # 消えたログファイルの記録を捨てる
+            current = {log_file for log_file, _ in log_files}
+            for log_file in list(self._ingested_stats):
+                if log_file not in current:
+                    del self._ingested_stats[log_file]
+            
+            for log_file, log_start_time in log_files:
+                try:
+                    self._ingest_file(log_file, log_start_time)
+                except Exception as e:
+                    self._ingested_stats.pop(log_file, None)
+                    logger.error(f"ログの取り込みに失敗しました ({log_file.name}): {e}")
+    
+    def _ingest_file(self, log_file: Path, log_start_time: datetime) -> None:
+        """ログファイル1つを前回のオフセットから取り込む"""
+        stat = log_file.stat()
+        file_stat = (stat.st_size, stat.st_mtime_ns)
+        if self._ingested_stats.get(log_file) == file_stat:
+            return
+        
+        log_id, offset = self.event_store.get_ingest_offset(log_file.name, log_start_time)
+        size = stat.st_size
+        
+        if size < offset:
+            logger.debug(f"ログファイルが書き換えられたため再取り込みします: {log_file.name}")
+            self.event_store.reset_log(log_id)
+            offset = 0
+        
+        if size != offset:
+            for events, new_offset in self.iter_log_events(log_file, offset):
+                self.event_store.append_events(log_id, events, new_offset)
+        # 書き込み途中の最終行は次に追記されたときに読む
+        self._ingested_stats[log_file] = file_stat
+    
     def get_world_name_at_time(self, target_time: datetime) -> Optional[str]:
         """指定した時刻に居たワールド名を取得
         
         Args:
             target_time: 対象の日時（写真撮影時刻）
-            
+        
         Returns:
             ワールド名（見つからない場合はNone）
         """
+        world_name, _ = self.get_world_and_users_at_time(target_time)
+        return world_name
+    
+    def get_world_and_users_at_time(self, target_time: datetime) -> Tuple[Optional[str], List[str]]:
+        """指定した時刻に居たワールド名とユーザーのリストを取得
+        
+        現在のセッション（最新ログの追従状態）で解決できる時刻はメモリ上の状態から返し、
+        それ以前の時刻のみログファイルを解析する。
+        
+        Args:
+            target_time: 対象の日時（写真撮影時刻）
+        
+        Returns:
+            (ワールド名, ユーザー名のリスト)のタプル
+        """
+        try:
+            live_result = self.tailer.lookup(target_time)
+        except Exception as e:
+            logger.warning(f"ログの追従に失敗しました: {e}")
+            live_result = None
+        
+        if live_result is not None:
+            logger.debug(f"取得結果(追従): ワールド={live_result[0]}, ユーザー数={len(live_result[1])}")
+            return live_result
+        
+        # 永続ストアから取得（追記分を取り込んでから1回の範囲クエリ）
+        try:
+            self.ingest_logs()
+            stored_events = self.event_store.get_session_events(target_time, EVENT_ENTERING_ROOM)
+        except Exception as e:
+            logger.warning(f"ログイベントストアの参照に失敗しました: {e}")
+            stored_events = None
+        
+        if stored_events is not None:
+            state = SessionState()
+            for event in stored_events:
+                state.apply(LogEvent(*event))
+            world_name, users = state.snapshot()
+            logger.debug(f"取得結果(ストア): ワールド={world_name}, ユーザー数={len(users)}")
+            return world_name, users
+        
         log_file = self.find_log_file_for_time(target_time)
         if not log_file:
             logger.debug(f"対応するログファイルが見つかりません: {target_time}")
-            return None
+            return None, []
         
         logger.debug(f"ログファイルを解析中: {log_file.name}")
         
-        last_world_name = None
-        last_world_time = None
-        
         try:
-            with open(log_file, "r", encoding="utf-8", errors="ignore") as f:
-                for line in f:
-                    match = self.ENTERING_ROOM_PATTERN.match(line.strip())
-                    if match:
-                        time_str = match.group(1)
-                        world_name = match.group(2)
-                        
-                        log_time = self.parse_log_line_time(time_str)
-                        if log_time and log_time <= target_time:
-                            # target_time以前で最新のワールド参加を記録
-                            if last_world_time is None or log_time > last_world_time:
-                                last_world_name = world_name
-                                last_world_time = log_time
-                        elif log_time and log_time > target_time:
-                            # target_time を超えたら終了（ファイルは時刻順なので）
-                            break
+            state = self._read_state_at(log_file, target_time)
         except Exception as e:
             logger.error(f"ログファイルの解析に失敗しました: {e}")
-            return None
+            return None, []
         
-        if last_world_name:
-            logger.debug(f"ワールド名を取得: {last_world_name} ({last_world_time})")
+        world_name, users = state.snapshot()
+        if world_name:
+            logger.debug(f"取得結果: ワールド={world_name}, ユーザー数={len(users)}")
         else:
             logger.debug(f"ワールド名が見つかりませんでした: {target_time}")
         
-        return last_world_name
-
-
-    def get_world_and_users_at_time(self, target_time: datetime) -> Tuple[Optional[str], List[str]]:
-        """指定した時刻に居たワールド名とユーザーのリストを取得
+        return world_name, users
+    
+    def get_world_and_users_at_times(
+        self, target_times: Iterable[datetime]
+    ) -> List[Tuple[Optional[str], List[str]]]:
+        """複数の時刻のワールド名とユーザーのリストをまとめて取得（一括処理用）
+        
+        時刻をソートしてログファイルごとにまとめ、各ファイルを先頭から1回だけ
+        読みながら全ての時刻を解決する。
         
         Args:
-            target_time: 対象の日時（写真撮影時刻）
+            target_times: 対象の日時のリスト（写真撮影時刻）
+        
+        Returns:
+            target_times と同じ順序の (ワールド名, ユーザー名のリスト) のリスト
+        """
+        target_times = list(target_times)
+        results: List[Tuple[Optional[str], List[str]]] = [(None, [])] * len(target_times)
+        
+        log_files, start_times = self._get_log_index()  # 古い順
+        
+        # ログファイルごとに (時刻, 元のインデックス) をまとめる
+        groups: Dict[int, List[Tuple[datetime, int]]] = {}
+        for index, target_time in enumerate(target_times):
+            file_index = bisect.bisect_right(start_times, target_time) - 1
+            if file_index >= 0:
+                groups.setdefault(file_index, []).append((target_time, index))
+        
+        for file_index, group in groups.items():
+            log_file = log_files[file_index][0]
+            group.sort()
+            logger.debug(f"ログファイルを一括解析中: {log_file.name} ({len(group)}件)")
+            try:
+                self._resolve_group(log_file, group, results)
+            except Exception as e:
+                logger.error(f"ログファイルの解析に失敗しました ({log_file.name}): {e}")
+        
+        return results
+    
+    def _resolve_group(self, log_file: Path, group: List[Tuple[datetime, int]],
+                       results: List[Tuple[Optional[str], List[str]]]) -> None:
+        """1つのログファイルを1回の前方走査で読み、ソート済みの時刻を順に解決"""
+        state = SessionState()
+        position = 0
+        
+        for events, _ in self.iter_log_events(log_file):
+            for event in events:
+                # イベントより前の時刻はこの時点の状態で確定
+                while position < len(group) and group[position][0] < event.time:
+                    results[group[position][1]] = state.snapshot()
+                    position += 1
+                if position == len(group):
+                    return
+                state.apply(event)
+        
+        # 最後のイベント以降の時刻
+        while position < len(group):
+            results[group[position][1]] = state.snapshot()
+            position += 1
+    
+    def _read_state_at(self, log_file: Path, target_time: datetime) -> SessionState:
+        """ログファイルをmmapし、指定時刻の状態を必要な範囲だけ読んで再構築
+        
+        1. 行頭の時刻で二分探索し、target_time を超える最初の行のオフセットを求める
+        2. そこから後方に最後のワールド参加を探す
+        3. ワールド参加（または途中のチェックポイント）から終端までを再生する
+        """
+        size = log_file.stat().st_size
+        if size == 0:
+            return SessionState()
+        
+        with open(log_file, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            end = self._find_offset_after(mm, target_time)
             
+            start = self._find_last_world_entry(mm, end)
+            if start is None:
+                return SessionState()
+            
+            # ワールド参加以降で最も近いチェックポイントから再開
+            state = SessionState()
+            checkpoints = self._get_checkpoints(log_file, size)
+            index = bisect.bisect_right(checkpoints, end, key=lambda checkpoint: checkpoint[0]) - 1
+            if index >= 0 and checkpoints[index][0] >= start:
+                start, saved_state = checkpoints[index]
+                state = saved_state.copy()
+            
+            self._replay(mm, start, end, state, log_file, size)
+            return state
+    
+    def _line_time_at(self, mm: mmap.mmap, pos: int) -> Optional[datetime]:
+        """指定オフセットの行頭の時刻を取得（時刻で始まらない行はNone）"""
+        match = self.LINE_TIME_PATTERN.match(mm, pos)
+        if not match:
+            return None
+        return self.parse_log_time_bytes(match.group())
+    
+    def _next_timed_line(self, mm: mmap.mmap, pos: int) -> Tuple[int, Optional[datetime]]:
+        """pos 以降で最初の時刻付きの行を探す（行の途中なら次の行に再同期）
+        
         Returns:
-            (ワールド名, ユーザー名のリスト)のタプル
+            (行頭のオフセット, 時刻)。見つからない場合は (ファイルサイズ, None)
         """
-        log_file = self.find_log_file_for_time(target_time)
-        if not log_file:
-            logger.debug(f"対応するログファイルが見つかりません: {target_time}")
-            return None, []
+        size = len(mm)
+        if pos > 0 and mm[pos - 1:pos] != b"\n":
+            newline = mm.find(b"\n", pos)
+            if newline < 0:
+                return size, None
+            pos = newline + 1
         
-        logger.debug(f"ログファイルを解析中: {log_file.name}")
+        while pos < size:
+            line_time = self._line_time_at(mm, pos)
+            if line_time is not None:
+                return pos, line_time
+            newline = mm.find(b"\n", pos)
+            if newline < 0:
+                break
+            pos = newline + 1
+        return size, None
+    
+    def _find_offset_after(self, mm: mmap.mmap, target_time: datetime) -> int:
+        """target_time より後の時刻を持つ最初の行のオフセットを二分探索"""
+        low, high = 0, len(mm)
+        while low < high:
+            mid = (low + high) // 2
+            _, line_time = self._next_timed_line(mm, mid)
+            if line_time is None or line_time > target_time:
+                high = mid
+            else:
+                low = mid + 1
+        return self._next_timed_line(mm, low)[0]
+    
+    def _find_last_world_entry(self, mm: mmap.mmap, end: int) -> Optional[int]:
+        """end より前で最後のワールド参加行の行頭オフセットを後方検索"""
+        pos = end
+        while True:
+            pos = mm.rfind(self.ENTERING_ROOM_MARKER, 0, pos)
+            if pos < 0:
+                return None
+            line_start = mm.rfind(b"\n", 0, pos) + 1
+            line_end = mm.find(b"\n", pos, end)
+            if line_end < 0:
+                line_end = end
+            events = self.scan_events(mm, line_start, line_end)
+            if events and events[0].kind == EVENT_ENTERING_ROOM:
+                return line_start
+            pos = line_start
+    
+    def _replay(self, mm: mmap.mmap, start: int, end: int, state: SessionState,
+                log_file: Path, size: int) -> None:
+        """[start, end) のイベントを状態に適用し、途中のチェックポイントを記録"""
+        pos = start
+        next_checkpoint = (start // LOG_CHECKPOINT_INTERVAL + 1) * LOG_CHECKPOINT_INTERVAL
+        while pos < end:
+            chunk_end = min(pos + LOG_READ_CHUNK_SIZE, end)
+            if chunk_end < end:
+                newline = mm.rfind(b"\n", pos, chunk_end)
+                if newline >= 0:
+                    chunk_end = newline + 1
+            
+            for event in self.scan_events(mm, pos, chunk_end):
+                state.apply(event)
+            pos = chunk_end
+            
+            if pos >= next_checkpoint and pos < end:
+                self._add_checkpoint(log_file, size, pos, state)
+                next_checkpoint = (pos // LOG_CHECKPOINT_INTERVAL + 1) * LOG_CHECKPOINT_INTERVAL
+    
+    def _get_checkpoints(self, log_file: Path, size: int) -> List[Tuple[int, SessionState]]:
+        """ログファイルのチェックポイント一覧を取得（ファイルが縮んだ場合は破棄）"""
+        with self._checkpoint_lock:
+            entry = self._checkpoints.get(log_file)
+            if entry is None or entry[0] > size:
+                return []
+            self._checkpoints.move_to_end(log_file)
+            return list(entry[1])
+    
+    def _add_checkpoint(self, log_file: Path, size: int, offset: int, state: SessionState) -> None:
+        """状態チェックポイントを記録"""
+        with self._checkpoint_lock:
+            entry = self._checkpoints.get(log_file)
+            if entry is None or entry[0] > size:
+                entry = (size, [])
+            checkpoints = entry[1]
+            index = bisect.bisect_left(checkpoints, offset, key=lambda checkpoint: checkpoint[0])
+            if index == len(checkpoints) or checkpoints[index][0] != offset:
+                checkpoints.insert(index, (offset, state.copy()))
+            self._checkpoints[log_file] = (max(entry[0], size), checkpoints)
+            self._checkpoints.move_to_end(log_file)
+            while len(self._checkpoints) > LOG_CHECKPOINT_MAX_FILES:
+                self._checkpoints.popitem(last=False)
+
+
+class LogTailer:
+    """最新のVRChatログを追従し、現在のワールドと参加ユーザーをメモリ上に保持するクラス
+    
+    読み込み済みのバイトオフセットから差分のみを読み込む。直近のイベントは
+    リングバッファに保持し、少し前の時刻（撮影から処理までの間にユーザーが
+    出入りした場合など）もファイルを読まずに解決できるようにする。
+    """
+    
+    # 保持する直近イベント数
+    RECENT_EVENT_LIMIT = 4096
+    
+    def __init__(self, parser: VRChatLogParser):
+        self._parser = parser
+        self._lock = threading.Lock()
+        self._reset(None, None)
+    
+    def _reset(self, log_file: Optional[Path], log_start_time: Optional[datetime]) -> None:
+        """追従対象のログファイルを切り替える"""
+        self.log_file = log_file
+        self.log_start_time = log_start_time
+        self.offset = 0
+        self.state = SessionState()
+        # recent より前の全イベントを適用した状態と、その最後のイベント時刻
+        self._base_state = SessionState()
+        self._base_time = log_start_time
+        self._recent: Deque[LogEvent] = deque()
+    
+    def poll(self) -> None:
+        """最新ログの追記分を読み込む（ローテーションにも追従）"""
+        with self._lock:
+            self._poll_locked()
+    
+    def _poll_locked(self) -> None:
+        log_files = self._parser.get_log_files()
+        if not log_files:
+            return
         
-        last_world_name = None
-        current_users = set()
+        latest_file, latest_start_time = log_files[0]
+        if latest_file != self.log_file:
+            # 新しいログファイル（VRChatの再起動）
+            logger.debug(f"ログの追従を開始: {latest_file.name}")
+            self._reset(latest_file, latest_start_time)
         
         try:
-            with open(log_file, "r", encoding="utf-8", errors="ignore") as f:
-                for line in f:
-                    stripped_line = line.strip()
-                    # 先に日付によるスキップ確認を行うための簡単なチェック（最適化）
-                    if not stripped_line.startswith("20") or "Debug" not in stripped_line:
-                        continue
-                    
-                    # 1. ワールド参加チェック
-                    match = self.ENTERING_ROOM_PATTERN.match(stripped_line)
-                    if match:
-                        time_str = match.group(1)
-                        log_time = self.parse_log_line_time(time_str)
-                        if log_time and log_time <= target_time:
-                            last_world_name = match.group(2)
-                            current_users.clear()  # ワールド移動時にリストをクリア
-                        elif log_time and log_time > target_time:
-                            break
-                        continue
-                    
-                    # 2. プレイヤー参加チェック
-                    match = self.PLAYER_JOINED_PATTERN.match(stripped_line)
-                    if match:
-                        time_str = match.group(1)
-                        log_time = self.parse_log_line_time(time_str)
-                        if log_time and log_time <= target_time:
-                            current_users.add(match.group(2))
-                        elif log_time and log_time > target_time:
-                            break
-                        continue
-                        
-                    # 3. プレイヤー退出チェック
-                    match = self.PLAYER_LEFT_PATTERN.match(stripped_line)
-                    if match:
-                        time_str = match.group(1)
-                        log_time = self.parse_log_line_time(time_str)
-                        if log_time and log_time <= target_time:
-                            current_users.discard(match.group(2))
-                        elif log_time and log_time > target_time:
-                            break
-                        continue
-                        
-        except Exception as e:
-            logger.error(f"ログファイルの解析に失敗しました: {e}")
-            return None, []
+            size = latest_file.stat().st_size
+        except OSError:
+            return
         
-        if last_world_name:
-            logger.debug(f"取得結果: ワールド={last_world_name}, ユーザー数={len(current_users)}")
-        else:
-            logger.debug(f"ワールド名が見つかりませんでした: {target_time}")
-            current_users.clear()
+        if size < self.offset:
+            # ファイルが切り詰められた場合は先頭から読み直す
+            logger.debug(f"ログファイルが切り詰められました: {latest_file.name}")
+            self._reset(latest_file, latest_start_time)
+        
+        if size == self.offset:
+            return
         
-        return last_world_name, sorted(list(current_users))
+        for events, new_offset in self._parser.iter_log_events(latest_file, self.offset):
+            self.offset = new_offset
+            for event in events:
+                self._push(event)
+    
+    def _push(self, event: LogEvent) -> None:
+        """イベントを現在の状態とリングバッファに反映"""
+        self.state.apply(event)
+        self._recent.append(event)
+        if len(self._recent) > self.RECENT_EVENT_LIMIT:
+            oldest = self._recent.popleft()
+            self._base_state.apply(oldest)
+            self._base_time = oldest.time
+    
+    def lookup(self, target_time: datetime) -> Optional[Tuple[Optional[str], List[str]]]:
+        """追従中のセッションから指定時刻の状態を取得
+        
+        Returns:
+            (ワールド名, ユーザー名のリスト)。追従範囲外の時刻の場合はNone
+        """
+        with self._lock:
+            self._poll_locked()
+            
+            if self.log_file is None or self._base_time is None:
+                return None
+            if target_time < self._base_time:
+                return None
+            
+            # 最後のイベント以降なら現在の状態をそのまま返す
+            if not self._recent or target_time >= self._recent[-1].time:
+                return self.state.snapshot()
+            
+            state = self._base_state.copy()
+            for event in self._recent:
+                if event.time > target_time:
+                    break
+                state.apply(event)
+            return state.snapshot()
+
 
-# シングルトンインスタンス
-vrchat_log_parser = VRChatLogParser()
+# シングルトンインスタンス（イベントストアは初めて使うときに開く）
+vrchat_log_parser: VRChatLogParser = LazySingleton(VRChatLogParser)
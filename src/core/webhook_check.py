@@ -0,0 +1,185 @@
+"""
+VRChat Discord Uploader - Webhookの接続確認
+Webhookの有効性・応答時間・投稿先チャンネルを確認し、結果を短時間キャッシュする
+"""
+import threading
+import time
+from dataclasses import dataclass, replace
+from typing import Dict, Optional
+
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+WEBHOOK_CHECK_TTL_SECONDS = 60  # 確認結果を再利用する期間
+WEBHOOK_CHECK_TIMEOUT = 10
+
+# フォーラム判定用のDiscordエラーコード
+DISCORD_ERROR_EMPTY_MESSAGE = 50006  # スレッド名は受け付けられ、本文の検証で失敗した
+DISCORD_ERROR_FORUM_ONLY = 220003  # Webhookでスレッドを作成できるのはフォーラムのみ
+
+
+@dataclass
+class WebhookCheckResult:
+    """Webhookの確認結果"""
+    success: bool
+    message: str
+    latency_ms: Optional[float] = None
+    webhook_name: Optional[str] = None
+    channel_id: Optional[str] = None
+    guild_id: Optional[str] = None
+    is_forum: Optional[bool] = None  # 判定できなければNone
+    checked_at: float = 0.0  # time.monotonic()
+    cached: bool = False
+    
+    def summary(self) -> str:
+        """ダイアログ表示用の文字列"""
+        if not self.success:
+            return self.message
+        lines = [f"接続成功: {self.webhook_name or 'Unknown'}"]
+        if self.latency_ms is not None:
+            lines.append(f"応答時間: {self.latency_ms:.0f} ms")
+        if self.guild_id:
+            lines.append(f"サーバーID: {self.guild_id}")
+        if self.channel_id:
+            lines.append(f"チャンネルID: {self.channel_id}")
+        if self.is_forum is True:
+            lines.append("チャンネル種別: フォーラム（月別スレッドを作成できます）")
+        elif self.is_forum is False:
+            lines.append("チャンネル種別: テキストチャンネル（月別スレッドは作成されません）")
+        else:
+            lines.append("チャンネル種別: 不明")
+        if self.cached:
+            lines.append("（直前の確認結果）")
+        return "\n".join(lines)
+
+
+class WebhookChecker:
+    """Webhookの接続確認（スレッドセーフ）
+    
+    確認結果はURLごとに WEBHOOK_CHECK_TTL_SECONDS の間キャッシュする。
+    フォーラムかどうかの判定結果は ThreadManager が参照するため期限なしで保持する。
+    """
+    
+    def __init__(self, ttl_seconds: float = WEBHOOK_CHECK_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._results: Dict[str, WebhookCheckResult] = {}
+        self._forum_hints: Dict[str, bool] = {}
+    
+    def get_cached(self, webhook_url: str) -> Optional[WebhookCheckResult]:
+        """期限内の確認結果（なければNone）"""
+        with self._lock:
+            result = self._results.get(webhook_url)
+        if result is None or time.monotonic() - result.checked_at > self.ttl_seconds:
+            return None
+        return replace(result, cached=True)
+    
+    def check(self, webhook_url: str, cancel_event: Optional[threading.Event] = None,
+              use_cache: bool = True) -> Optional[WebhookCheckResult]:
+        """Webhookを確認（ブロッキング。GUIからはワーカースレッドで呼ぶ）
+        
+        Args:
+            webhook_url: 確認するWebhook URL
+            cancel_event: セットされていれば次の通信を行わずに中断する
+            use_cache: 期限内の確認結果があれば通信せずに返す
+        
+        Returns:
+            確認結果（中断された場合はNone）
+        """
+        if use_cache:
+            cached = self.get_cached(webhook_url)
+            if cached is not None:
+                return cached
+        
+        result = self._fetch_webhook(webhook_url)
+        if cancel_event is not None and cancel_event.is_set():
+            return None
+        if result.success:
+            result.is_forum = self._probe_forum(webhook_url)
+            if cancel_event is not None and cancel_event.is_set():
+                return None
+            if result.is_forum is not None:
+                self.set_forum_hint(webhook_url, result.is_forum)
+        
+        result.checked_at = time.monotonic()
+        with self._lock:
+            self._results[webhook_url] = result
+        return result
+    
+    def _fetch_webhook(self, webhook_url: str) -> WebhookCheckResult:
+        """GETでWebhookの有効性と投稿先を取得"""
+        import requests
+        
+        try:
+            start = time.perf_counter()
+            response = requests.get(webhook_url, timeout=WEBHOOK_CHECK_TIMEOUT)
+            latency_ms = (time.perf_counter() - start) * 1000
+            if response.status_code != 200:
+                return WebhookCheckResult(
+                    False, f"接続失敗: HTTPステータス {response.status_code}", latency_ms=latency_ms
+                )
+            data = response.json()
+            return WebhookCheckResult(
+                True,
+                f"接続成功: {data.get('name', 'Unknown')}",
+                latency_ms=latency_ms,
+                webhook_name=data.get("name"),
+                channel_id=data.get("channel_id"),
+                guild_id=data.get("guild_id"),
+            )
+        except requests.exceptions.Timeout:
+            return WebhookCheckResult(False, "接続タイムアウト")
+        except requests.exceptions.RequestException as e:
+            return WebhookCheckResult(False, f"接続エラー: {str(e)}")
+        except ValueError:
+            return WebhookCheckResult(False, "接続エラー: 不正な応答です")
+    
+    def _probe_forum(self, webhook_url: str) -> Optional[bool]:
+        """投稿先がフォーラムかどうかを判定
+        
+        本文のないスレッド作成要求を送り、返ってくるエラーで判定する。
+        本文が空のため、どちらのチャンネルでも投稿は行われない。
+        """
+        import requests
+        
+        try:
+            response = requests.post(
+                webhook_url, json={"thread_name": "connection check"}, timeout=WEBHOOK_CHECK_TIMEOUT
+            )
+            if response.status_code != 400:
+                return None
+            data = response.json()
+        except (requests.exceptions.RequestException, ValueError) as e:
+            logger.debug(f"チャンネル種別を判定できませんでした: {e}")
+            return None
+        
+        code = data.get("code")
+        if code == DISCORD_ERROR_FORUM_ONLY or "forum channels" in str(data.get("message", "")).lower():
+            return False
+        if code == DISCORD_ERROR_EMPTY_MESSAGE:
+            return True
+        return None
+    
+    def forum_hint(self, webhook_url: str) -> Optional[bool]:
+        """投稿先がフォーラムかどうか（未判定ならNone）"""
+        with self._lock:
+            return self._forum_hints.get(webhook_url)
+    
+    def set_forum_hint(self, webhook_url: str, is_forum: bool) -> None:
+        with self._lock:
+            self._forum_hints[webhook_url] = is_forum
+    
+    def invalidate(self, webhook_url: Optional[str] = None) -> None:
+        """確認結果とフォーラム判定を破棄（URL未指定なら全て）"""
+        with self._lock:
+            if webhook_url is None:
+                self._results.clear()
+                self._forum_hints.clear()
+            else:
+                self._results.pop(webhook_url, None)
+                self._forum_hints.pop(webhook_url, None)
+
+
+# シングルトンインスタンス
+webhook_checker = WebhookChecker()
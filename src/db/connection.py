@@ -0,0 +1,122 @@
+"""
+VRChat Discord Uploader - DB接続管理
+書き込み用の単一接続とスレッドごとの読み取り接続を保持し、
+WALモードで読み取りが書き込みのコミットを待たないようにする
+"""
+import sqlite3
+import threading
+import weakref
+from pathlib import Path
+from contextlib import contextmanager
+from typing import Iterator
+
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+# 接続ごとに適用するPRAGMA
+CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous = NORMAL",  # WALではコミットごとのfsyncを省略しても破損しない
+    "PRAGMA cache_size = -8000",  # 約8MiB
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA mmap_size = 67108864",  # 64MiB
+)
+BUSY_TIMEOUT_SECONDS = 5.0
+CACHED_STATEMENTS = 256
+
+
+class _ReaderHandle:
+    """スレッドローカルに保持する読み取り接続（スレッド終了で破棄されると閉じる）"""
+    __slots__ = ("conn", "__weakref__")
+    
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+    
+    def close(self) -> None:
+        try:
+            self.conn.close()
+        except sqlite3.Error:
+            pass
+    
+    def __del__(self):
+        self.close()
+
+
+class ConnectionManager:
+    """SQLite接続マネージャ
+    
+    - 書き込みは1本の接続をロックで直列化し、write() の範囲を1トランザクションとする
+    - 読み取りはスレッドごとの接続を使い回す（スレッド終了時に破棄される）
+    """
+    
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self._write_lock = threading.RLock()
+        self._writer = None
+        self._local = threading.local()
+        self._readers = weakref.WeakSet()
+        self._readers_lock = threading.Lock()
+    
+    def _connect(self) -> sqlite3.Connection:
+        """チューニング済みの接続を作成"""
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=BUSY_TIMEOUT_SECONDS,
+            check_same_thread=False,
+            cached_statements=CACHED_STATEMENTS,
+        )
+        conn.row_factory = sqlite3.Row
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+    
+    def _get_writer(self) -> sqlite3.Connection:
+        if self._writer is None:
+            conn = self._connect()
+            # 新規のDBのみ有効（既存のDBはVACUUMするまで変わらない）
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            mode = conn.execute("PRAGMA journal_mode = WAL").fetchone()[0]
+            if mode.lower() != "wal":
+                logger.warning(f"WALモードを有効化できませんでした: {self.db_path} ({mode})")
+            self._writer = conn
+        return self._writer
+    
+    @contextmanager
+    def write(self) -> Iterator[sqlite3.Connection]:
+        """書き込み用接続を取得（ブロックを抜けるとコミット、例外時はロールバック）"""
+        with self._write_lock:
+            conn = self._get_writer()
+            try:
+                yield conn
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+    
+    def reader(self) -> sqlite3.Connection:
+        """現在のスレッドの読み取り用接続を取得"""
+        handle = getattr(self._local, "handle", None)
+        if handle is None:
+            # WALへの切り替えを読み取り接続より先に済ませる
+            with self._write_lock:
+                self._get_writer()
+            handle = _ReaderHandle(self._connect())
+            self._local.handle = handle
+            with self._readers_lock:
+                self._readers.add(handle)
+        return handle.conn
+    
+    def close(self) -> None:
+        """全接続を閉じる"""
+        with self._readers_lock:
+            readers = list(self._readers)
+            self._readers = weakref.WeakSet()
+        for handle in readers:
+            handle.close()
+        self._local = threading.local()
+        
+        with self._write_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
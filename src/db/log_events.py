@@ -0,0 +1,141 @@
+"""
+VRChat Discord Uploader - VRChatログイベントストア
+ワールド参加・ユーザー参加/退出イベントを時刻インデックス付きで永続化
+（VRChatが古いログを削除しても過去の撮影時の情報を引けるようにする）
+"""
+from pathlib import Path
+from typing import Optional, List, Tuple, Iterable
+from datetime import datetime, timedelta
+
+from src.constants import LOG_EVENTS_DB_FILE
+from src.db.connection import ConnectionManager
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def to_log_ts(dt: datetime) -> int:
+    """ログ時刻（ローカル時刻のnaive datetime）を整数秒に変換"""
+    return int((dt - _EPOCH).total_seconds())
+
+
+def from_log_ts(ts: int) -> datetime:
+    """整数秒をログ時刻に戻す"""
+    return _EPOCH + timedelta(seconds=ts)
+
+
+class LogEventStore:
+    """VRChatログイベントの永続ストア"""
+    
+    def __init__(self, db_path: Path = LOG_EVENTS_DB_FILE):
+        self.db_path = Path(db_path)
+        self.db = ConnectionManager(self.db_path)
+        self._init_database()
+    
+    def _init_database(self) -> None:
+        """スキーマを作成"""
+        with self.db.write() as conn:
+            cursor = conn.cursor()
+            
+            # 取り込み済みのログファイルと読み込み済みオフセット
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS log_files (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT UNIQUE NOT NULL,
+                    start_time INTEGER NOT NULL,
+                    offset INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_log_files_start_time
+                ON log_files(start_time)
+            """)
+            
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS log_events (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    log_id INTEGER NOT NULL,
+                    ts INTEGER NOT NULL,
+                    kind TEXT NOT NULL,
+                    name TEXT NOT NULL
+                )
+            """)
+            
+            # 「時刻T以前の最後のワールド参加」を引くためのインデックス
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_log_events_log_kind_ts
+                ON log_events(log_id, kind, ts)
+            """)
+            
+            # 同一ログ内の時刻範囲を引くためのインデックス
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_log_events_log_ts
+                ON log_events(log_id, ts)
+            """)
+    
+    def get_ingest_offset(self, name: str, start_time: datetime) -> Tuple[int, int]:
+        """ログファイルの取り込み状態を取得（未登録なら登録する）
+        
+        Returns:
+            Tuple[ログID, 読み込み済みオフセット]
+        """
+        with self.db.write() as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO log_files (name, start_time) VALUES (?, ?)",
+                (name, to_log_ts(start_time))
+            )
+            log_id, offset = conn.execute(
+                "SELECT id, offset FROM log_files WHERE name = ?", (name,)
+            ).fetchone()
+        return log_id, offset
+    
+    def append_events(self, log_id: int, events: Iterable[Tuple[datetime, str, str]],
+                      new_offset: int) -> None:
+        """イベントを追加し、読み込み済みオフセットを更新（1トランザクション）"""
+        with self.db.write() as conn:
+            conn.executemany(
+                "INSERT INTO log_events (log_id, ts, kind, name) VALUES (?, ?, ?, ?)",
+                ((log_id, to_log_ts(time), kind, name) for time, kind, name in events)
+            )
+            conn.execute(
+                "UPDATE log_files SET offset = ? WHERE id = ?",
+                (new_offset, log_id)
+            )
+    
+    def reset_log(self, log_id: int) -> None:
+        """ログファイルの取り込み結果を破棄（ファイルが書き換えられた場合）"""
+        with self.db.write() as conn:
+            conn.execute("DELETE FROM log_events WHERE log_id = ?", (log_id,))
+            conn.execute("UPDATE log_files SET offset = 0 WHERE id = ?", (log_id,))
+    
+    def get_session_events(self, target_time: datetime,
+                           enter_kind: str) -> Optional[List[Tuple[datetime, str, str]]]:
+        """指定時刻の状態を再構築するためのイベントを取得
+        
+        target_time を含むログファイルの、target_time 以前で最後のワールド参加から
+        target_time までのイベントを1回の範囲クエリで取得する。
+        
+        Returns:
+            (時刻, 種別, 値) のリスト（先頭はワールド参加）。該当なしの場合はNone
+        """
+        ts = to_log_ts(target_time)
+        rows = self.db.reader().execute("""
+            WITH last_enter AS (
+                SELECT id, log_id, ts FROM log_events
+                WHERE kind = ? AND ts <= ? AND log_id = (
+                    SELECT id FROM log_files WHERE start_time <= ?
+                    ORDER BY start_time DESC LIMIT 1
+                )
+                ORDER BY ts DESC, id DESC LIMIT 1
+            )
+            SELECT e.ts, e.kind, e.name FROM log_events e, last_enter l
+            WHERE e.log_id = l.log_id AND e.ts BETWEEN l.ts AND ? AND e.id >= l.id
+            ORDER BY e.ts, e.id
+        """, (enter_kind, ts, ts, ts)).fetchall()
+        
+        if not rows:
+            return None
+        return [(from_log_ts(row_ts), kind, name) for row_ts, kind, name in rows]
@@ -0,0 +1,192 @@
+"""
+VRChat Discord Uploader - スキーママイグレーション
+PRAGMA user_version をスキーマのバージョンとし、未適用のマイグレーションを
+1つずつトランザクション内で適用する
+"""
+import sqlite3
+import time
+from typing import Callable, List, Tuple
+
+from src.db.connection import ConnectionManager
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+SEARCH_TABLE = "transferred_images_fts"
+
+
+def _migrate_epoch_timestamps(cursor: sqlite3.Cursor) -> None:
+    """転送日時を整数のUNIX時刻で持つ
+    
+    transferred_at（UTCの文字列）を残したまま transferred_at_epoch を追加し、
+    期間検索・最近の履歴用のカバリングインデックスを作成する。
+    """
+    cursor.execute("ALTER TABLE transferred_images ADD COLUMN transferred_at_epoch INTEGER")
+    cursor.execute("""
+        UPDATE transferred_images
+        SET transferred_at_epoch = CAST(strftime('%s', transferred_at) AS INTEGER)
+        WHERE transferred_at IS NOT NULL
+    """)
+    
+    # 文字列比較用のインデックスは不要になる
+    cursor.execute("DROP INDEX IF EXISTS idx_transferred_at")
+    
+    # 期間内の件数、および履歴一覧の表示に必要な列をインデックスだけで返す
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_transferred_at_epoch
+        ON transferred_images(
+            transferred_at_epoch, id, filename,
+            file_size_original, file_size_compressed, was_compressed
+        )
+    """)
+    
+    cursor.execute("ALTER TABLE transfer_stats_total ADD COLUMN last_transferred_at_epoch INTEGER")
+    cursor.execute("""
+        UPDATE transfer_stats_total
+        SET last_transferred_at_epoch = CAST(strftime('%s', last_transferred_at) AS INTEGER)
+        WHERE last_transferred_at IS NOT NULL
+    """)
+
+
+def _migrate_world_and_search(cursor: sqlite3.Cursor) -> None:
+    """ワールド名・インスタンスのユーザーを記録し、全文検索とワールド別集計を追加"""
+    cursor.execute("ALTER TABLE transferred_images ADD COLUMN world_name TEXT")
+    cursor.execute("ALTER TABLE transferred_images ADD COLUMN instance_users TEXT")  # 改行区切り
+    
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_world_name_epoch
+        ON transferred_images(world_name, transferred_at_epoch, id)
+    """)
+    
+    # ワールド別の転送数
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS transfer_stats_world (
+            world_name TEXT PRIMARY KEY,
+            count INTEGER NOT NULL DEFAULT 0,
+            last_transferred_at_epoch INTEGER
+        )
+    """)
+    
+    create_search_index(cursor)
+
+
+def create_search_index(cursor: sqlite3.Cursor) -> bool:
+    """ファイル名・ワールド名・ユーザー名の全文検索インデックスを作成
+    
+    部分一致（日本語を含む）のため trigram トークナイザを使い、未対応の
+    SQLiteでは unicode61 を使う。FTS5自体が使えない場合は作成せずFalseを返す
+    （検索はLIKEで行われる）。
+    """
+    for tokenizer in ("trigram", "unicode61"):
+        try:
+            cursor.execute(f"""
+                CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(
+                    filename, world_name, instance_users,
+                    content='transferred_images', content_rowid='id',
+                    tokenize='{tokenizer}'
+                )
+            """)
+            break
+        except sqlite3.OperationalError as e:
+            logger.warning(f"全文検索インデックスを作成できません ({tokenizer}): {e}")
+    else:
+        return False
+    
+    # 外部コンテンツテーブルをトリガーで同期する
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS transferred_images_ai AFTER INSERT ON transferred_images BEGIN
+            INSERT INTO {SEARCH_TABLE}(rowid, filename, world_name, instance_users)
+            VALUES (new.id, new.filename, new.world_name, new.instance_users);
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS transferred_images_ad AFTER DELETE ON transferred_images BEGIN
+            INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, filename, world_name, instance_users)
+            VALUES ('delete', old.id, old.filename, old.world_name, old.instance_users);
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS transferred_images_au
+        AFTER UPDATE OF filename, world_name, instance_users ON transferred_images BEGIN
+            INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, filename, world_name, instance_users)
+            VALUES ('delete', old.id, old.filename, old.world_name, old.instance_users);
+            INSERT INTO {SEARCH_TABLE}(rowid, filename, world_name, instance_users)
+            VALUES (new.id, new.filename, new.world_name, new.instance_users);
+        END
+    """)
+    cursor.execute(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('rebuild')")
+    return True
+
+
+def _migrate_archived_hashes(cursor: sqlite3.Cursor) -> None:
+    """アーカイブへ移した記録のハッシュ（重複検出用）"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS archived_hashes (
+            file_hash TEXT PRIMARY KEY
+        ) WITHOUT ROWID
+    """)
+
+
+def _drop_stale_transferred_at_index(cursor: sqlite3.Cursor) -> None:
+    """マイグレーション1で削除した文字列の転送日時インデックスを削除
+    
+    以前は基本スキーマが起動のたびに作り直していたため、既存のDBには残っている。
+    """
+    cursor.execute("DROP INDEX IF EXISTS idx_transferred_at")
+
+
+# (バージョン, 説明, 適用関数)。バージョンは1から連番で追加する
+MIGRATIONS: List[Tuple[int, str, Callable[[sqlite3.Cursor], None]]] = [
+    (1, "転送日時を整数のUNIX時刻で保持", _migrate_epoch_timestamps),
+    (2, "ワールド名・ユーザーの記録と全文検索", _migrate_world_and_search),
+    (3, "アーカイブ済みハッシュ", _migrate_archived_hashes),
+    (4, "不要になった転送日時インデックスの削除", _drop_stale_transferred_at_index),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def run_migrations(db: ConnectionManager) -> int:
+    """未適用のマイグレーションを適用
+    
+    マイグレーションごとに1トランザクションで適用し、user_version も同じ
+    トランザクション内で更新する。失敗した場合はそのマイグレーションを
+    ロールバックして例外を送出する。
+    
+    Returns:
+        適用したマイグレーションの数
+    """
+    with db.write() as conn:
+        current = get_schema_version(conn)
+    
+    if current > SCHEMA_VERSION:
+        logger.warning(
+            f"データベースのスキーマが新しいバージョンです (DB: {current}, アプリ: {SCHEMA_VERSION})"
+        )
+        return 0
+    
+    applied = 0
+    for version, description, migrate in MIGRATIONS:
+        if version <= current:
+            continue
+        
+        start = time.perf_counter()
+        try:
+            with db.write() as conn:
+                conn.execute("BEGIN")
+                migrate(conn.cursor())
+                conn.execute(f"PRAGMA user_version = {version}")
+        except Exception as e:
+            logger.error(f"マイグレーション {version} ({description}) に失敗しました: {e}")
+            raise
+        
+        applied += 1
+        logger.info(
+            f"マイグレーション {version} を適用しました: {description} "
+            f"({time.perf_counter() - start:.2f}秒)"
+        )
+    return applied
@@ -2,13 +2,13 @@
 VRChat Discord Uploader - DBモデル
 SQLiteスキーマ定義
 """
-import sqlite3
 from pathlib import Path
-from typing import Optional
+from typing import Optional, List, Tuple
 from datetime import datetime
 from dataclasses import dataclass
 
-from src.constants import DB_FILE, APPDATA_DIR
+from src.db.connection import ConnectionManager
+from src.db.migrations import run_migrations
 from src.utils.logger import get_logger
 
 logger = get_logger()
@@ -30,15 +30,43 @@ class TransferRecord:
     was_compressed: bool = False
     compression_ratio: Optional[float] = None
     notes: Optional[str] = None
+    file_mtime_ns: Optional[int] = None  # 指定時はファイル指紋も記録する
+    world_name: Optional[str] = None
+    instance_users: Optional[List[str]] = None
 
 
-def init_database() -> None:
+@dataclass
+class TransferStats:
+    """転送統計（集計テーブルから取得）"""
+    today_count: int = 0
+    total_count: int = 0
+    total_bytes_original: int = 0
+    total_bytes_sent: int = 0
+    last_transferred_at: Optional[datetime] = None
+
+
+@dataclass
+class HistoryPage:
+    """転送履歴の検索結果（1ページ分）"""
+    records: List[TransferRecord]
+    next_cursor: Optional[Tuple[int, int]] = None  # 次ページの (transferred_at_epoch, id)。最終ページはNone
+
+
+def init_database(db: ConnectionManager) -> None:
     """データベースを初期化"""
-    APPDATA_DIR.mkdir(parents=True, exist_ok=True)
+    with db.write() as conn:
+        _create_schema(conn.cursor())
+    
+    run_migrations(db)
     
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
+    with db.write() as conn:
+        _ensure_stats(conn.cursor())
     
+    logger.info("データベースを初期化しました")
+
+
+def _create_schema(cursor) -> None:
+    """テーブルとインデックスを作成（バージョン0のスキーマ。以降の変更は migrations で行う）"""
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS transferred_images (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -62,10 +90,7 @@ def init_database() -> None:
         ON transferred_images(filename)
     """)
     
-    cursor.execute("""
-        CREATE INDEX IF NOT EXISTS idx_transferred_at 
-        ON transferred_images(transferred_at)
-    """)
+    # 転送日時のインデックスはマイグレーション1（transferred_at_epoch）で作成する
     
     cursor.execute("""
         CREATE INDEX IF NOT EXISTS idx_file_hash 
@@ -80,7 +105,74 @@ def init_database() -> None:
         )
     """)
     
-    conn.commit()
-    conn.close()
+    # ファイル指紋（パス・サイズ・更新時刻）。一致すればハッシュ計算なしで転送済みと判定する
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS file_fingerprints (
+            file_path TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            file_hash TEXT NOT NULL
+        ) WITHOUT ROWID
+    """)
     
-    logger.info("データベースを初期化しました")
+    # 日別の転送数（ローカル日付）。転送記録の追加と同じトランザクションで更新する
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS transfer_stats_daily (
+            day TEXT PRIMARY KEY,
+            count INTEGER NOT NULL DEFAULT 0,
+            bytes_original INTEGER NOT NULL DEFAULT 0,
+            bytes_sent INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    
+    # 累計（1行のみ）
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS transfer_stats_total (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            count INTEGER NOT NULL DEFAULT 0,
+            bytes_original INTEGER NOT NULL DEFAULT 0,
+            bytes_sent INTEGER NOT NULL DEFAULT 0,
+            last_transferred_at TIMESTAMP
+        )
+    """)
+
+
+def _ensure_stats(cursor) -> None:
+    """集計テーブルが未作成だった場合は既存の転送記録から作成"""
+    cursor.execute("SELECT 1 FROM transfer_stats_total WHERE id = 1")
+    if cursor.fetchone() is not None:
+        return
+    rebuild_stats(cursor)
+    logger.info("転送統計を再集計しました")
+
+
+def rebuild_stats(cursor) -> None:
+    """転送記録から集計テーブルを作り直す"""
+    cursor.execute("DELETE FROM transfer_stats_daily")
+    cursor.execute("DELETE FROM transfer_stats_total")
+    cursor.execute("DELETE FROM transfer_stats_world")
+    cursor.execute("""
+        INSERT INTO transfer_stats_daily (day, count, bytes_original, bytes_sent)
+        SELECT date(transferred_at_epoch, 'unixepoch', 'localtime'), COUNT(*),
+               COALESCE(SUM(file_size_original), 0),
+               COALESCE(SUM(COALESCE(file_size_compressed, file_size_original)), 0)
+        FROM transferred_images
+        GROUP BY 1
+    """)
+    cursor.execute("""
+        INSERT INTO transfer_stats_total (
+            id, count, bytes_original, bytes_sent, last_transferred_at, last_transferred_at_epoch
+        )
+        SELECT 1, COUNT(*),
+               COALESCE(SUM(file_size_original), 0),
+               COALESCE(SUM(COALESCE(file_size_compressed, file_size_original)), 0),
+               MAX(transferred_at), MAX(transferred_at_epoch)
+        FROM transferred_images
+    """)
+    cursor.execute("""
+        INSERT INTO transfer_stats_world (world_name, count, last_transferred_at_epoch)
+        SELECT world_name, COUNT(*), MAX(transferred_at_epoch)
+        FROM transferred_images
+        WHERE world_name IS NOT NULL
+        GROUP BY world_name
+    """)
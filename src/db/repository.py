@@ -3,202 +3,473 @@ VRChat Discord Uploader - DBリポジトリ
 転送履歴の記録・検索・重複検出
 """
 import sqlite3
+import time
 from pathlib import Path
-from typing import Optional, List
-from datetime import datetime, timedelta
+from concurrent.futures import Future
+from typing import Callable, Optional, List, Dict, Tuple
+from datetime import datetime, date
 
 from src.constants import DB_FILE
-from src.db.models import TransferRecord, init_database
+from src.db.models import TransferRecord, TransferStats, HistoryPage, init_database, rebuild_stats
+from src.db.migrations import SEARCH_TABLE
+from src.db.connection import ConnectionManager
+from src.db.writer import DBWriter
+from src.utils.hash_prefix_set import HashPrefixSet
+from src.utils.lazy import LazySingleton
 from src.utils.logger import get_logger
 
 logger = get_logger()
 
+HISTORY_PAGE_SIZE = 50
+
 
 class TransferRepository:
     """転送履歴リポジトリ"""
     
-    def __init__(self):
-        init_database()
-    
-    def _get_connection(self) -> sqlite3.Connection:
-        """DB接続を取得"""
-        conn = sqlite3.connect(DB_FILE)
-        conn.row_factory = sqlite3.Row
-        return conn
+    def __init__(self, db_path: Path = DB_FILE):
+        self.db = ConnectionManager(db_path)
+        init_database(self.db)
+        # 書き込みはすべて単一の書き込みスレッドを経由する
+        self.writer = DBWriter(self.db)
+        
+        # 構築が終わるまではDBで確認する。書き込みスレッドで構築するため、
+        # 構築中の追加が漏れることはない
+        self._hash_filter: Optional[HashPrefixSet] = None
+        self.writer.submit(self._build_hash_filter)
+        
+        # 全文検索インデックスのトークナイザ（FTS5が使えない場合はNone）
+        row = self.db.reader().execute(
+            "SELECT sql FROM sqlite_master WHERE name = ?", (SEARCH_TABLE,)
+        ).fetchone()
+        self._search_tokenizer = None
+        if row:
+            self._search_tokenizer = "trigram" if "trigram" in row["sql"] else "unicode61"
+        
+        self._listeners: List[Callable[[Optional[TransferRecord]], None]] = []
     
-    def add_record(self, record: TransferRecord) -> bool:
-        """転送記録を追加"""
-        try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                INSERT INTO transferred_images (
-                    filename, file_path, file_hash, file_size_original,
-                    file_size_compressed, discord_message_id, discord_channel_id,
-                    discord_thread_id, was_compressed, compression_ratio, notes
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                record.filename,
-                record.file_path,
-                record.file_hash,
-                record.file_size_original,
-                record.file_size_compressed,
-                record.discord_message_id,
-                record.discord_channel_id,
-                record.discord_thread_id,
-                record.was_compressed,
-                record.compression_ratio,
-                record.notes
-            ))
-            
-            conn.commit()
-            conn.close()
-            logger.debug(f"転送記録を追加: {record.filename}")
-            return True
+    def add_listener(self, listener: Callable[[Optional[TransferRecord]], None]) -> None:
+        """転送記録の変更を通知する関数を登録
         
-        except sqlite3.IntegrityError:
-            logger.warning(f"重複レコード: {record.filename}")
-            return False
-        except Exception as e:
-            logger.error(f"レコード追加エラー: {e}")
-            return False
+        記録の追加時はその記録、削除・再集計などまとめて変わった場合はNoneを渡す。
+        コミット後に書き込みスレッド（または呼び出し元のスレッド）から呼ばれる。
+        """
+        self._listeners.append(listener)
     
-    def exists_by_hash(self, file_hash: str) -> bool:
-        """ハッシュで存在確認"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
+    def remove_listener(self, listener: Callable[[Optional[TransferRecord]], None]) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+    
+    def _notify(self, record: Optional[TransferRecord]) -> None:
+        for listener in list(self._listeners):
+            try:
+                listener(record)
+            except Exception as e:
+                logger.error(f"変更通知エラー: {e}")
+    
+    def _build_hash_filter(self, conn: sqlite3.Connection) -> None:
+        """転送済みハッシュのフィルタを構築（書き込みスレッドで実行）
         
-        cursor.execute(
-            "SELECT 1 FROM transferred_images WHERE file_hash = ?",
-            (file_hash,)
+        1件あたり4バイト（100万件で約4MB）
+        """
+        cursor = conn.execute("""
+            SELECT file_hash FROM transferred_images
+            UNION ALL
+            SELECT file_hash FROM archived_hashes
+        """)
+        hash_filter = HashPrefixSet(file_hash for (file_hash,) in cursor)
+        self._hash_filter = hash_filter
+        logger.debug(
+            f"ハッシュフィルタを構築: {len(hash_filter)}件, {hash_filter.size_bytes / 1024:.0f}KB"
         )
-        result = cursor.fetchone() is not None
-        conn.close()
+    
+    def _insert_record(self, conn: sqlite3.Connection, record: TransferRecord) -> None:
+        # 挿入が取り消されてもフィルタの偽陽性が増えるだけなので先に追加する
+        hash_filter = self._hash_filter
+        if hash_filter is not None:
+            hash_filter.add(record.file_hash)
+        
+        transferred_at_epoch = int(time.time())
+        cursor = conn.execute("""
+            INSERT INTO transferred_images (
+                filename, file_path, file_hash, file_size_original,
+                file_size_compressed, discord_message_id, discord_channel_id,
+                discord_thread_id, was_compressed, compression_ratio, notes,
+                world_name, instance_users, transferred_at_epoch
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            record.filename,
+            record.file_path,
+            record.file_hash,
+            record.file_size_original,
+            record.file_size_compressed,
+            record.discord_message_id,
+            record.discord_channel_id,
+            record.discord_thread_id,
+            record.was_compressed,
+            record.compression_ratio,
+            record.notes,
+            record.world_name,
+            "\n".join(record.instance_users) if record.instance_users else None,
+            transferred_at_epoch
+        ))
+        # 変更通知を受けた側（履歴ページなど）が読み直さずに表示できるようにする
+        record.id = cursor.lastrowid
+        record.transferred_at = datetime.fromtimestamp(transferred_at_epoch)
+        if record.file_mtime_ns is not None:
+            self._upsert_fingerprint(
+                conn, record.file_path, record.file_size_original,
+                record.file_mtime_ns, record.file_hash
+            )
+        self._update_stats(conn, record)
+    
+    def _upsert_fingerprint(self, conn: sqlite3.Connection, file_path: str, size: int,
+                            mtime_ns: int, file_hash: str) -> None:
+        conn.execute("""
+            INSERT OR REPLACE INTO file_fingerprints (file_path, size, mtime_ns, file_hash)
+            VALUES (?, ?, ?, ?)
+        """, (file_path, size, mtime_ns, file_hash))
+    
+    def _update_stats(self, conn: sqlite3.Connection, record: TransferRecord) -> None:
+        """集計テーブルを更新（転送記録の追加と同じトランザクション内で呼ぶ）"""
+        size_original = record.file_size_original or 0
+        size_sent = record.file_size_compressed if record.file_size_compressed is not None else size_original
+        conn.execute("""
+            INSERT INTO transfer_stats_daily (day, count, bytes_original, bytes_sent)
+            VALUES (date('now', 'localtime'), 1, ?, ?)
+            ON CONFLICT(day) DO UPDATE SET
+                count = count + 1,
+                bytes_original = bytes_original + excluded.bytes_original,
+                bytes_sent = bytes_sent + excluded.bytes_sent
+        """, (size_original, size_sent))
+        conn.execute("""
+            UPDATE transfer_stats_total SET
+                count = count + 1,
+                bytes_original = bytes_original + ?,
+                bytes_sent = bytes_sent + ?,
+                last_transferred_at = CURRENT_TIMESTAMP,
+                last_transferred_at_epoch = CAST(strftime('%s', 'now') AS INTEGER)
+            WHERE id = 1
+        """, (size_original, size_sent))
+        if record.world_name:
+            conn.execute("""
+                INSERT INTO transfer_stats_world (world_name, count, last_transferred_at_epoch)
+                VALUES (?, 1, CAST(strftime('%s', 'now') AS INTEGER))
+                ON CONFLICT(world_name) DO UPDATE SET
+                    count = count + 1,
+                    last_transferred_at_epoch = excluded.last_transferred_at_epoch
+            """, (record.world_name,))
+    
+    def add_record_async(self, record: TransferRecord) -> "Future[bool]":
+        """転送記録の追加を書き込みスレッドに登録
+        
+        Returns:
+            コミット後に追加できたか（重複・エラー時はFalse）が設定されるFuture
+        """
+        result: Future = Future()
+        
+        def on_done(future: Future) -> None:
+            error = future.exception()
+            if error is None:
+                logger.debug(f"転送記録を追加: {record.filename}")
+                result.set_result(True)
+                self._notify(record)
+            elif isinstance(error, sqlite3.IntegrityError):
+                logger.warning(f"重複レコード: {record.filename}")
+                result.set_result(False)
+            else:
+                logger.error(f"レコード追加エラー: {error}")
+                result.set_result(False)
+        
+        self.writer.submit(lambda conn: self._insert_record(conn, record)).add_done_callback(on_done)
         return result
     
+    def add_record(self, record: TransferRecord) -> bool:
+        """転送記録を追加（コミットまで待つ）"""
+        return self.add_record_async(record).result()
+    
+    def exists_by_hash(self, file_hash: str) -> bool:
+        """ハッシュで存在確認（フィルタで未登録と判定できればDBを参照しない）"""
+        hash_filter = self._hash_filter
+        if hash_filter is not None and file_hash not in hash_filter:
+            return False
+        
+        cursor = self.db.reader().execute("""
+            SELECT 1 FROM transferred_images WHERE file_hash = ?
+            UNION ALL
+            SELECT 1 FROM archived_hashes WHERE file_hash = ?
+        """, (file_hash, file_hash))
+        return cursor.fetchone() is not None
+    
     def exists_by_path(self, file_path: str) -> bool:
         """パスで存在確認"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute(
+        cursor = self.db.reader().execute(
             "SELECT 1 FROM transferred_images WHERE file_path = ?",
             (file_path,)
         )
-        result = cursor.fetchone() is not None
-        conn.close()
-        return result
+        return cursor.fetchone() is not None
+    
+    def exists_by_fingerprint(self, file_path: str, size: int, mtime_ns: int) -> bool:
+        """パス・サイズ・更新時刻で転送済みか確認（ファイルを読まずに判定）"""
+        cursor = self.db.reader().execute(
+            "SELECT 1 FROM file_fingerprints WHERE file_path = ? AND size = ? AND mtime_ns = ?",
+            (file_path, size, mtime_ns)
+        )
+        return cursor.fetchone() is not None
+    
+    def save_fingerprint(self, file_path: str, size: int, mtime_ns: int,
+                         file_hash: str) -> "Future[None]":
+        """ファイル指紋を記録（ハッシュで転送済みと判明したファイル用）"""
+        return self.writer.submit(
+            lambda conn: self._upsert_fingerprint(conn, file_path, size, mtime_ns, file_hash)
+        )
     
     def get_recent_records(self, limit: int = 10) -> List[TransferRecord]:
         """最近の転送記録を取得"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
+        return self.query_records(limit=limit).records
+    
+    @staticmethod
+    def _row_to_record(row: sqlite3.Row) -> TransferRecord:
+        return TransferRecord(
+            id=row["id"],
+            filename=row["filename"],
+            file_path=row["file_path"],
+            file_hash=row["file_hash"],
+            file_size_original=row["file_size_original"],
+            file_size_compressed=row["file_size_compressed"],
+            transferred_at=datetime.fromtimestamp(row["transferred_at_epoch"]) if row["transferred_at_epoch"] else None,
+            discord_message_id=row["discord_message_id"],
+            discord_channel_id=row["discord_channel_id"],
+            discord_thread_id=row["discord_thread_id"],
+            was_compressed=bool(row["was_compressed"]),
+            compression_ratio=row["compression_ratio"],
+            notes=row["notes"],
+            world_name=row["world_name"],
+            instance_users=row["instance_users"].split("\n") if row["instance_users"] else None
+        )
+    
+    def _parse_search_text(self, text: str) -> Tuple[Optional[str], List[str], list]:
+        """検索文字列（空白区切りのAND検索）を変換
+        
+        Returns:
+            Tuple[FTS5のMATCH式（なければNone）, LIKE条件のリスト, LIKE条件のパラメータ]
+        """
+        match_terms, conditions, params = [], [], []
+        for term in text.split():
+            # trigram は3文字未満の語を検索できないためLIKEで補う
+            if self._search_tokenizer == "trigram" and len(term) >= 3:
+                match_terms.append('"' + term.replace('"', '""') + '"')
+            elif self._search_tokenizer == "unicode61":
+                match_terms.append('"' + term.replace('"', '""') + '"*')
+            else:
+                pattern = "%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+                conditions.append(
+                    "(t.filename LIKE ? ESCAPE '\\' OR t.world_name LIKE ? ESCAPE '\\'"
+                    " OR t.instance_users LIKE ? ESCAPE '\\')"
+                )
+                params.extend([pattern] * 3)
+        return (" AND ".join(match_terms) or None), conditions, params
+    
+    def _id_at_epoch(self, epoch: int, before: bool) -> Optional[int]:
+        """指定時刻より前の最後 / 以降の最初の記録のID"""
+        if before:
+            sql = """SELECT id FROM transferred_images WHERE transferred_at_epoch < ?
+                     ORDER BY transferred_at_epoch DESC, id DESC LIMIT 1"""
+        else:
+            sql = """SELECT id FROM transferred_images WHERE transferred_at_epoch >= ?
+                     ORDER BY transferred_at_epoch, id LIMIT 1"""
+        row = self.db.reader().execute(sql, (epoch,)).fetchone()
+        return row["id"] if row else None
+    
+    def query_records(self, text: Optional[str] = None,
+                      start: Optional[datetime] = None, end: Optional[datetime] = None,
+                      compressed: Optional[bool] = None, world_name: Optional[str] = None,
+                      cursor: Optional[Tuple[int, int]] = None,
+                      limit: int = HISTORY_PAGE_SIZE) -> HistoryPage:
+        """転送履歴を新しい順に検索（キーセットページネーション）
+        
+        全文検索を含む場合は、全文検索インデックスをID降順にたどって条件に合う
+        記録を探す（IDは転送順に振られるため、転送日時の降順と同じ並びになる）。
+        
+        Args:
+            text: ファイル名・ワールド名・ユーザー名の検索文字列（空白区切りでAND）
+            start: この日時以降（含む）
+            end: この日時より前（含まない）
+            compressed: 圧縮したもののみ(True) / 圧縮していないもののみ(False)
+            world_name: ワールド名（完全一致）
+            cursor: 前ページの HistoryPage.next_cursor
+            limit: 1ページの件数
+        """
+        match, conditions, params = None, [], []
+        if text and text.strip():
+            match, conditions, params = self._parse_search_text(text)
+        
+        start_epoch = int(start.timestamp()) if start is not None else None
+        end_epoch = int(end.timestamp()) if end is not None else None
+        if start_epoch is not None:
+            conditions.append("t.transferred_at_epoch >= ?")
+            params.append(start_epoch)
+        if end_epoch is not None:
+            conditions.append("t.transferred_at_epoch < ?")
+            params.append(end_epoch)
+        if compressed is not None:
+            conditions.append("t.was_compressed = ?")
+            params.append(1 if compressed else 0)
+        if world_name is not None:
+            conditions.append("t.world_name = ?")
+            params.append(world_name)
         
-        cursor.execute("""
-            SELECT * FROM transferred_images 
-            ORDER BY transferred_at DESC 
+        if match is None:
+            if cursor is not None:
+                conditions.append("(t.transferred_at_epoch, t.id) < (?, ?)")
+                params.extend(cursor)
+            source = "transferred_images t"
+            order = "t.transferred_at_epoch DESC, t.id DESC"
+        else:
+            # 期間をIDの範囲に置き換え、全文検索インデックス側で絞り込む
+            fts_conditions = [f"{SEARCH_TABLE} MATCH ?"]
+            fts_params: list = [match]
+            if cursor is not None:
+                fts_conditions.append("f.rowid < ?")
+                fts_params.append(cursor[1])
+            if end_epoch is not None:
+                fts_conditions.append("f.rowid <= ?")
+                fts_params.append(self._id_at_epoch(end_epoch, before=True) or 0)
+            if start_epoch is not None:
+                first_id = self._id_at_epoch(start_epoch, before=False)
+                if first_id is None:
+                    return HistoryPage([])
+                fts_conditions.append("f.rowid >= ?")
+                fts_params.append(first_id)
+            conditions = fts_conditions + conditions
+            params = fts_params + params
+            source = f"{SEARCH_TABLE} f JOIN transferred_images t ON t.id = f.rowid"
+            order = "f.rowid DESC"
+        
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        rows = self.db.reader().execute(f"""
+            SELECT t.* FROM {source}
+            {where}
+            ORDER BY {order}
             LIMIT ?
-        """, (limit,))
-        
-        records = []
-        for row in cursor.fetchall():
-            records.append(TransferRecord(
-                id=row["id"],
-                filename=row["filename"],
-                file_path=row["file_path"],
-                file_hash=row["file_hash"],
-                file_size_original=row["file_size_original"],
-                file_size_compressed=row["file_size_compressed"],
-                transferred_at=datetime.fromisoformat(row["transferred_at"]) if row["transferred_at"] else None,
-                discord_message_id=row["discord_message_id"],
-                was_compressed=bool(row["was_compressed"]),
-                compression_ratio=row["compression_ratio"]
-            ))
-        
-        conn.close()
-        return records
+        """, (*params, limit)).fetchall()
+        
+        next_cursor = None
+        if len(rows) == limit:
+            next_cursor = (rows[-1]["transferred_at_epoch"], rows[-1]["id"])
+        return HistoryPage([self._row_to_record(row) for row in rows], next_cursor)
+    
+    def get_world_counts(self, limit: int = 50) -> List[Tuple[str, int]]:
+        """ワールド別の転送数（多い順）"""
+        rows = self.db.reader().execute("""
+            SELECT world_name, count FROM transfer_stats_world
+            ORDER BY count DESC LIMIT ?
+        """, (limit,)).fetchall()
+        return [(row["world_name"], row["count"]) for row in rows]
+    
+    def get_stats(self) -> TransferStats:
+        """本日・累計の転送統計を取得"""
+        conn = self.db.reader()
+        today = conn.execute(
+            "SELECT count FROM transfer_stats_daily WHERE day = ?",
+            (date.today().isoformat(),)
+        ).fetchone()
+        total = conn.execute("SELECT * FROM transfer_stats_total WHERE id = 1").fetchone()
+        
+        stats = TransferStats(today_count=today["count"] if today else 0)
+        if total:
+            stats.total_count = total["count"]
+            stats.total_bytes_original = total["bytes_original"]
+            stats.total_bytes_sent = total["bytes_sent"]
+            if total["last_transferred_at_epoch"]:
+                stats.last_transferred_at = datetime.fromtimestamp(total["last_transferred_at_epoch"])
+        return stats
     
     def get_today_count(self) -> int:
         """本日の転送数を取得"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        
-        # ローカルタイムゾーンでの本日の開始時刻と終了時刻を計算
-        today_start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-        today_end = today_start + timedelta(days=1)
-        
-        # ローカル時刻をUTCに変換（JSTはUTC+9）
-        # DBはCURRENT_TIMESTAMPでUTCとして保存されているため
-        import time
-        utc_offset = timedelta(seconds=time.timezone if time.daylight == 0 else time.altzone)
-        today_start_utc = today_start + utc_offset
-        today_end_utc = today_end + utc_offset
-        
-        cursor.execute("""
-            SELECT COUNT(*) FROM transferred_images 
-            WHERE transferred_at >= ? AND transferred_at < ?
-        """, (today_start_utc.strftime("%Y-%m-%d %H:%M:%S"), 
-              today_end_utc.strftime("%Y-%m-%d %H:%M:%S")))
-        
-        count = cursor.fetchone()[0]
-        conn.close()
-        return count
+        return self.get_range_count(date.today(), date.today())
     
     def get_total_count(self) -> int:
         """総転送数を取得"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
+        row = self.db.reader().execute("SELECT count FROM transfer_stats_total WHERE id = 1").fetchone()
+        return row["count"] if row else 0
+    
+    def get_daily_counts(self, start: date, end: date) -> Dict[str, int]:
+        """日別の転送数を取得（start〜endを含む、転送のない日は含まない）"""
+        cursor = self.db.reader().execute("""
+            SELECT day, count FROM transfer_stats_daily
+            WHERE day BETWEEN ? AND ?
+            ORDER BY day
+        """, (start.isoformat(), end.isoformat()))
+        return {row["day"]: row["count"] for row in cursor.fetchall()}
+    
+    def get_range_count(self, start: date, end: date) -> int:
+        """期間内（start〜endを含む）の転送数を取得"""
+        row = self.db.reader().execute("""
+            SELECT COALESCE(SUM(count), 0) FROM transfer_stats_daily
+            WHERE day BETWEEN ? AND ?
+        """, (start.isoformat(), end.isoformat())).fetchone()
+        return row[0]
+    
+    def get_month_count(self, month: str) -> int:
+        """月別の転送数を取得
         
-        cursor.execute("SELECT COUNT(*) FROM transferred_images")
-        count = cursor.fetchone()[0]
-        conn.close()
-        return count
+        Args:
+            month: "YYYY-MM"
+        """
+        row = self.db.reader().execute("""
+            SELECT COALESCE(SUM(count), 0) FROM transfer_stats_daily
+            WHERE day BETWEEN ? AND ?
+        """, (f"{month}-01", f"{month}-31")).fetchone()
+        return row[0]
+    
+    def rebuild_stats(self) -> None:
+        """転送記録から集計テーブルを作り直す（アーカイブ済みの記録は含まれない）"""
+        self.writer.submit(lambda conn: rebuild_stats(conn.cursor())).result()
+        self._notify(None)
     
     def clear_all(self) -> bool:
         """全レコードを削除"""
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM transferred_images")
-            cursor.execute("DELETE FROM monthly_threads")
-            conn.commit()
-            conn.close()
+            def clear(conn: sqlite3.Connection) -> None:
+                conn.execute("DELETE FROM transferred_images")
+                conn.execute("DELETE FROM monthly_threads")
+                conn.execute("DELETE FROM file_fingerprints")
+                conn.execute("DELETE FROM archived_hashes")
+                rebuild_stats(conn.cursor())
+            
+            self.writer.submit(clear).result()
+            self.writer.submit(self._build_hash_filter).result()
             logger.info("全転送履歴を削除しました")
+            self._notify(None)
             return True
         except Exception as e:
             logger.error(f"履歴削除エラー: {e}")
             return False
-
+    
     def get_thread_id_by_month(self, month: str) -> Optional[str]:
         """月別スレッドIDを取得"""
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            cursor.execute("SELECT thread_id FROM monthly_threads WHERE month = ?", (month,))
+            cursor = self.db.reader().execute(
+                "SELECT thread_id FROM monthly_threads WHERE month = ?", (month,)
+            )
             row = cursor.fetchone()
-            conn.close()
             return row["thread_id"] if row else None
         except Exception as e:
             logger.error(f"スレッドID取得エラー: {e}")
             return None
-
+    
     def save_thread_id(self, month: str, thread_id: str) -> bool:
         """スレッドIDを保存"""
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            cursor.execute("""
+            self.writer.submit(lambda conn: conn.execute("""
                 INSERT OR REPLACE INTO monthly_threads (month, thread_id)
                 VALUES (?, ?)
-            """, (month, thread_id))
-            conn.commit()
-            conn.close()
+            """, (month, thread_id))).result()
             return True
         except Exception as e:
             logger.error(f"スレッドID保存エラー: {e}")
             return False
 
 
-# シングルトンインスタンス
-transfer_repository = TransferRepository()
+# シングルトンインスタンス（DBは初めて使うときに開く）
+transfer_repository: TransferRepository = LazySingleton(TransferRepository)
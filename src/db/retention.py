@@ -0,0 +1,211 @@
+"""
+VRChat Discord Uploader - 転送履歴の保持期間とDBの最適化
+保持期間より古い転送記録をアーカイブDBへ移し、ホットDBには重複判定用の
+ハッシュだけを残す。アイドル時に空きページの解放と統計情報の更新を行う
+"""
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from src.constants import HISTORY_ARCHIVE_DB_FILE
+from src.db.connection import ConnectionManager
+from src.db.migrations import SEARCH_TABLE
+from src.db.repository import TransferRepository, transfer_repository
+from src.utils.lazy import LazySingleton
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+ARCHIVE_BATCH_ROWS = 2000
+MAINTENANCE_IDLE_SECONDS = 300  # 最後の書き込みからこの秒数が経てばアイドルとみなす
+MAINTENANCE_INTERVAL_SECONDS = 6 * 60 * 60
+INCREMENTAL_VACUUM_PAGES = 4096  # 書き込みロックを保持したまま解放するページ数（4KiBページで16MiB）
+
+# アーカイブする列（transferred_at は transferred_at_epoch と重複するため持たない）
+ARCHIVE_COLUMNS = (
+    "id", "filename", "file_path", "file_hash", "file_size_original",
+    "file_size_compressed", "transferred_at_epoch", "discord_message_id",
+    "discord_channel_id", "discord_thread_id", "was_compressed",
+    "compression_ratio", "notes", "world_name", "instance_users",
+)
+
+
+def retention_cutoff(months: int, now: datetime = None) -> datetime:
+    """保持期間の開始日時（Nか月前の月初、ローカル時刻）"""
+    now = now or datetime.now()
+    month_index = now.year * 12 + now.month - 1 - months
+    return datetime(month_index // 12, month_index % 12 + 1, 1)
+
+
+class HistoryRetention:
+    """転送履歴のアーカイブとホットDBのメンテナンス"""
+    
+    def __init__(self, repository: TransferRepository,
+                 archive_path: Path = HISTORY_ARCHIVE_DB_FILE):
+        self.repository = repository
+        self.archive = ConnectionManager(archive_path)
+        self._archive_ready = False
+        self._run_lock = threading.Lock()
+        self._last_maintenance: Optional[float] = None  # 未実行（起動後の最初の機会に実行する）
+    
+    def _ensure_archive(self) -> None:
+        if self._archive_ready:
+            return
+        with self.archive.write() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS archived_images (
+                    id INTEGER PRIMARY KEY,
+                    filename TEXT NOT NULL,
+                    file_path TEXT NOT NULL,
+                    file_hash TEXT NOT NULL,
+                    file_size_original INTEGER,
+                    file_size_compressed INTEGER,
+                    transferred_at_epoch INTEGER,
+                    discord_message_id TEXT,
+                    discord_channel_id TEXT,
+                    discord_thread_id TEXT,
+                    was_compressed BOOLEAN,
+                    compression_ratio REAL,
+                    notes TEXT,
+                    world_name TEXT,
+                    instance_users TEXT
+                )
+            """)
+        self._archive_ready = True
+    
+    def is_due(self) -> bool:
+        """メンテナンスを実行してよいか（書き込みがしばらくなく、前回から一定時間経過）"""
+        now = time.monotonic()
+        if now - self.repository.writer.last_commit_time < MAINTENANCE_IDLE_SECONDS:
+            return False
+        if self._last_maintenance is None:
+            return True
+        return now - self._last_maintenance >= MAINTENANCE_INTERVAL_SECONDS
+    
+    def run_maintenance(self, retention_months: int) -> None:
+        """アーカイブと最適化を実行（バックグラウンドスレッドから呼ぶ）"""
+        if not self._run_lock.acquire(blocking=False):
+            return
+        try:
+            archived = 0
+            if retention_months > 0:
+                archived = self.archive_older_than(retention_months)
+            self.compact(optimize_search=archived > 0)
+        except Exception as e:
+            logger.error(f"履歴のメンテナンスエラー: {e}")
+        finally:
+            self._last_maintenance = time.monotonic()
+            self._run_lock.release()
+    
+    def archive_older_than(self, months: int) -> int:
+        """保持期間より古い転送記録をアーカイブDBへ移す
+        
+        バッチごとにアーカイブへのコピーをコミットしてからホットDBから削除する。
+        途中で中断しても、次回は同じ記録を INSERT OR IGNORE で再コピーして
+        続きから削除するため、記録が失われることはない。集計テーブルは
+        アーカイブ後も変更しない（累計・日別の転送数はそのまま）。
+        
+        Returns:
+            アーカイブした件数
+        """
+        cutoff = int(retention_cutoff(months).timestamp())
+        self._ensure_archive()
+        
+        columns = ", ".join(ARCHIVE_COLUMNS)
+        placeholders = ", ".join("?" for _ in ARCHIVE_COLUMNS)
+        total = 0
+        while True:
+            rows = self.repository.db.reader().execute(f"""
+                SELECT {columns} FROM transferred_images
+                WHERE transferred_at_epoch < ?
+                ORDER BY transferred_at_epoch, id
+                LIMIT ?
+            """, (cutoff, ARCHIVE_BATCH_ROWS)).fetchall()
+            if not rows:
+                break
+            
+            with self.archive.write() as conn:
+                conn.executemany(
+                    f"INSERT OR IGNORE INTO archived_images ({columns}) VALUES ({placeholders})",
+                    [tuple(row) for row in rows]
+                )
+            
+            ids = [(row["id"],) for row in rows]
+            hashes = [(row["file_hash"],) for row in rows]
+            
+            def remove(conn: sqlite3.Connection) -> None:
+                # 全文検索インデックスはトリガーで削除される
+                conn.executemany(
+                    "INSERT OR IGNORE INTO archived_hashes (file_hash) VALUES (?)", hashes
+                )
+                conn.executemany("DELETE FROM transferred_images WHERE id = ?", ids)
+            
+            self.repository.writer.submit(remove).result()
+            total += len(rows)
+        
+        if total:
+            logger.info(
+                f"{total}件の転送履歴をアーカイブしました ({datetime.fromtimestamp(cutoff):%Y-%m-%d} より前)"
+            )
+        return total
+    
+    def compact(self, optimize_search: bool = False) -> None:
+        """ホットDBの空きページを解放し、統計情報を更新
+        
+        自動VACUUMが無効な既存のDBは、初回のみ INCREMENTAL に切り替えて
+        VACUUM する。以降は空きページを一定数ずつ解放し、その間だけ書き込みを待たせる。
+        """
+        db = self.repository.db
+        start = time.perf_counter()
+        with db.write() as conn:
+            if optimize_search and self.repository._search_tokenizer:
+                # 削除で増えたセグメントを統合する（解放されたページは以下で回収される）
+                conn.execute(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('optimize')")
+        
+        with db.write() as conn:
+            if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+                conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                conn.execute("VACUUM")
+                logger.info(f"履歴DBを増分VACUUMに切り替えました ({time.perf_counter() - start:.1f}秒)")
+        
+        while True:
+            with db.write() as conn:
+                if conn.execute("PRAGMA freelist_count").fetchone()[0] == 0:
+                    break
+                # incremental_vacuum は1ステップで1ページ解放するため executescript で最後まで実行する
+                conn.executescript(f"PRAGMA incremental_vacuum({INCREMENTAL_VACUUM_PAGES})")
+        
+        with db.write() as conn:
+            analyzed = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'"
+            ).fetchone()
+            conn.execute("PRAGMA optimize" if analyzed else "ANALYZE")
+        with db.write() as conn:
+            # トランザクションの外で実行しないとWALを切り詰められない
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        logger.debug(f"履歴DBを最適化しました ({time.perf_counter() - start:.2f}秒)")
+    
+    def get_archived_count(self) -> int:
+        """アーカイブ済みの件数"""
+        if not self.archive.db_path.exists():
+            return 0
+        self._ensure_archive()
+        return self.archive.reader().execute("SELECT COUNT(*) FROM archived_images").fetchone()[0]
+    
+    def clear_archive(self) -> None:
+        """アーカイブを削除"""
+        if not self.archive.db_path.exists():
+            return
+        self._ensure_archive()
+        with self.archive.write() as conn:
+            conn.execute("DELETE FROM archived_images")
+        with self.archive.write() as conn:
+            conn.execute("VACUUM")
+        logger.info("アーカイブを削除しました")
+
+
+# シングルトンインスタンス
+history_retention: HistoryRetention = LazySingleton(lambda: HistoryRetention(transfer_repository))
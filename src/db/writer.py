@@ -0,0 +1,153 @@
+"""
+VRChat Discord Uploader - DB書き込みスレッド
+書き込み操作を1本のスレッドに集約し、数ミリ秒ごと（または一定件数ごと）に
+まとめて1トランザクションでコミットする
+"""
+import queue
+import sqlite3
+import atexit
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Optional, TypeVar
+
+from src.db.connection import ConnectionManager
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+T = TypeVar("T")
+
+WRITE_BATCH_INTERVAL = 0.005  # 書き込みが続いている場合にまとめるため待つ最大秒数
+WRITE_BATCH_MAX_OPS = 256
+
+_STOP = object()
+
+
+class DBWriter:
+    """単一の書き込みスレッド
+    
+    submit() した操作は書き込みスレッドで順に実行される。操作ごとにSAVEPOINTを
+    切るため、ある操作が例外を送出してもその操作だけが取り消され、
+    同じバッチの他の操作はコミットされる。
+    """
+    
+    def __init__(self, db: ConnectionManager,
+                 batch_interval: float = WRITE_BATCH_INTERVAL,
+                 batch_max_ops: int = WRITE_BATCH_MAX_OPS):
+        self.db = db
+        self.batch_interval = batch_interval
+        self.batch_max_ops = batch_max_ops
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self.last_commit_time = time.monotonic()
+    
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="DBWriter", daemon=True)
+                self._thread.start()
+                atexit.register(self.stop)
+    
+    def submit(self, func: Callable[[sqlite3.Connection], T]) -> "Future[T]":
+        """書き込み操作を登録
+        
+        Args:
+            func: 書き込み用接続を受け取る関数（戻り値がFutureの結果になる）
+        
+        Returns:
+            バッチのコミット後に結果（または例外）が設定されるFuture
+        """
+        future: Future = Future()
+        if self._thread is not None and threading.current_thread() is self._thread:
+            # 書き込みスレッド内で結果を待つとデッドロックするため受け付けない
+            future.set_exception(RuntimeError("DBWriter内からのsubmitはできません"))
+            return future
+        self._ensure_started()
+        self._queue.put((func, future))
+        return future
+    
+    def stop(self, timeout: Optional[float] = 5.0) -> None:
+        """キューに残った操作を書き込んでからスレッドを停止"""
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            return
+        self._queue.put(_STOP)
+        thread.join(timeout)
+    
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            
+            batch = [item]
+            stopping = self._collect(batch, None)
+            if not stopping and len(batch) > 1:
+                # 他の書き込みが続いている間だけ、少し待ってまとめる
+                stopping = self._collect(batch, time.monotonic() + self.batch_interval)
+            
+            self._commit_batch(batch)
+            if stopping:
+                return
+    
+    def _collect(self, batch: list, deadline: Optional[float]) -> bool:
+        """キューから操作を取り出してbatchに追加
+        
+        deadline がNoneの場合は待たずに取り出せる分だけ取り出す。
+        
+        Returns:
+            停止要求を受け取ったか
+        """
+        while len(batch) < self.batch_max_ops:
+            try:
+                if deadline is None:
+                    item = self._queue.get_nowait()
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return True
+            batch.append(item)
+        return False
+    
+    def _commit_batch(self, batch) -> None:
+        """バッチを1トランザクションで実行"""
+        outcomes = []
+        try:
+            with self.db.write() as conn:
+                # 外側のトランザクションがないとRELEASEのたびにコミットされる
+                conn.execute("BEGIN")
+                for func, future in batch:
+                    if not future.set_running_or_notify_cancel():
+                        continue
+                    conn.execute("SAVEPOINT op")
+                    try:
+                        result = func(conn)
+                    except Exception as e:
+                        conn.execute("ROLLBACK TO op")
+                        conn.execute("RELEASE op")
+                        outcomes.append((future, None, e))
+                    else:
+                        conn.execute("RELEASE op")
+                        outcomes.append((future, result, None))
+        except Exception as e:
+            logger.error(f"DB書き込みエラー: {e}")
+            for func, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        self.last_commit_time = time.monotonic()
+        for future, result, error in outcomes:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
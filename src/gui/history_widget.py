@@ -0,0 +1,359 @@
+"""
+VRChat Discord Uploader - 転送履歴ブラウザ
+全件の転送履歴をキーセットページネーションで必要な分だけ読み込んで表示する
+"""
+from array import array
+from collections import OrderedDict
+from typing import List, Optional
+
+from PyQt6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit,
+    QPushButton, QCheckBox, QTableView, QHeaderView, QAbstractItemView
+)
+from PyQt6.QtCore import (
+    Qt, QAbstractListModel, QModelIndex, QObject, QRunnable,
+    QThreadPool, QTimer, pyqtSignal
+)
+from PyQt6.QtGui import QPixmap
+
+from src.db.models import TransferRecord
+from src.db.repository import transfer_repository
+from src.gui.thumbnail_loader import ThumbnailLoader, THUMBNAIL_SIZE, THUMBNAIL_QUEUE_MAX
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+HISTORY_FETCH_ROWS = 200  # 1回に読み込む件数（1ページ）
+HISTORY_CACHED_PAGES = 25  # 保持するページ数。これより古いページは表示時に読み直す
+SEARCH_DELAY_MS = 300
+
+
+class _PageSignals(QObject):
+    loaded = pyqtSignal(int, int, object, object)  # generation, page, records, next_cursor
+
+
+class _PageTask(QRunnable):
+    """1ページ分の転送履歴を読み込む"""
+    
+    def __init__(self, signals: _PageSignals, generation: int, page: int,
+                 filters: dict, cursor):
+        super().__init__()
+        self.signals = signals
+        self.generation = generation
+        self.page = page
+        self.filters = filters
+        self.cursor = cursor
+    
+    def run(self):
+        try:
+            result = transfer_repository.query_records(
+                cursor=self.cursor, limit=HISTORY_FETCH_ROWS, **self.filters
+            )
+            records, next_cursor = result.records, result.next_cursor
+        except Exception as e:
+            logger.error(f"履歴の読み込みエラー: {e}")
+            records, next_cursor = [], None
+        self.signals.loaded.emit(self.generation, self.page, records, next_cursor)
+
+
+class HistoryModel(QAbstractListModel):
+    """転送履歴のモデル
+    
+    行の並び（転送日時とIDのキー）だけを全件分保持し、記録本体はページ単位で
+    最大 HISTORY_CACHED_PAGES ページだけ保持する。追い出したページは表示された
+    ときに直前の行のキーをカーソルにして読み直す。キーは1行16バイト。
+    表示中に転送された記録はページとは別に先頭へ積む（ページの行位置は変えない）。
+    """
+    
+    def __init__(self, thumbnails: Optional[ThumbnailLoader] = None, parent=None):
+        super().__init__(parent)
+        self.thumbnails = thumbnails
+        self._filters: dict = {}
+        self._epochs = array("q")
+        self._ids = array("q")
+        self._head: List[TransferRecord] = []  # 読み込み後に追加された記録（新しい順）
+        self._pages: "OrderedDict[int, List[TransferRecord]]" = OrderedDict()
+        self._loading_pages = set()
+        self._exhausted = False
+        self._generation = 0
+        # サムネイル待ちの行（読み込み要求と同じく古いものから捨てる）
+        self._thumbnail_rows: "OrderedDict[str, int]" = OrderedDict()
+        
+        self._signals = _PageSignals()
+        self._signals.loaded.connect(self._on_page_loaded)
+        # 順に読み込めばよいため1スレッド
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+        if thumbnails is not None:
+            thumbnails.thumbnail_ready.connect(self._on_thumbnail_ready)
+            # 読み込み前も同じ大きさのアイコンを返して行の高さを揃える
+            self._placeholder = QPixmap(thumbnails.size)
+            self._placeholder.fill(Qt.GlobalColor.transparent)
+    
+    def set_filters(self, **filters) -> None:
+        """検索条件を設定して先頭から読み直す（query_records の引数）"""
+        self.beginResetModel()
+        self._filters = filters
+        self._epochs = array("q")
+        self._ids = array("q")
+        self._head = []
+        self._pages.clear()
+        self._loading_pages.clear()
+        self._thumbnail_rows.clear()
+        self._exhausted = False
+        self._generation += 1
+        self.endResetModel()
+    
+    def refresh(self) -> None:
+        self.set_filters(**self._filters)
+    
+    def add_record(self, record: TransferRecord) -> bool:
+        """新しく転送した記録を先頭に追加する（読み込み済みのページはそのまま）
+        
+        Returns:
+            反映できたか。全文検索の条件に合うかはここでは判定できないためFalse
+        """
+        if self._filters.get("text"):
+            return False
+        if self._filters.get("compressed") and not record.was_compressed:
+            return True
+        if not self._ids and not self._head:
+            # まだ何も表示していないので読み直しても位置は変わらない
+            self.refresh()
+            return True
+        if record.id is not None and (
+            any(r.id == record.id for r in self._head) or record.id in self._ids[:HISTORY_FETCH_ROWS]
+        ):
+            return True  # 先頭ページの読み込みに含まれていた
+        
+        self.beginInsertRows(QModelIndex(), 0, 0)
+        self._head.insert(0, record)
+        for key in self._thumbnail_rows:
+            self._thumbnail_rows[key] += 1
+        self.endInsertRows()
+        return True
+    
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(self._head) + len(self._ids)
+    
+    def canFetchMore(self, parent: QModelIndex = QModelIndex()) -> bool:
+        if parent.isValid() or self._exhausted:
+            return False
+        return len(self._ids) // HISTORY_FETCH_ROWS not in self._loading_pages
+    
+    def fetchMore(self, parent: QModelIndex = QModelIndex()) -> None:
+        if not self.canFetchMore(parent):
+            return
+        self._load_page(len(self._ids) // HISTORY_FETCH_ROWS)
+    
+    def _load_page(self, page: int) -> None:
+        if page in self._loading_pages:
+            return
+        cursor = None
+        if page > 0:
+            row = page * HISTORY_FETCH_ROWS - 1
+            cursor = (self._epochs[row], self._ids[row])
+        self._loading_pages.add(page)
+        self._pool.start(_PageTask(self._signals, self._generation, page, dict(self._filters), cursor))
+    
+    def _on_page_loaded(self, generation: int, page: int, records: List[TransferRecord], next_cursor) -> None:
+        if generation != self._generation:
+            return  # 条件が変わる前の要求
+        self._loading_pages.discard(page)
+        start = page * HISTORY_FETCH_ROWS
+        offset = len(self._head)
+        
+        if start >= len(self._ids):
+            # 末尾への追加
+            if records:
+                self.beginInsertRows(QModelIndex(), offset + start, offset + start + len(records) - 1)
+                for record in records:
+                    self._epochs.append(int(record.transferred_at.timestamp()) if record.transferred_at else 0)
+                    self._ids.append(record.id)
+                self._store_page(page, records)
+                self.endInsertRows()
+            if next_cursor is None:
+                self._exhausted = True
+        else:
+            # 追い出したページの読み直し
+            self._store_page(page, records)
+            end = min(start + len(records), len(self._ids)) - 1
+            if end >= start:
+                self.dataChanged.emit(self.index(offset + start), self.index(offset + end))
+    
+    def _store_page(self, page: int, records: List[TransferRecord]) -> None:
+        self._pages[page] = records
+        self._pages.move_to_end(page)
+        while len(self._pages) > HISTORY_CACHED_PAGES:
+            self._pages.popitem(last=False)
+    
+    def record_at(self, row: int) -> Optional[TransferRecord]:
+        """行の記録（読み込み中ならNone）"""
+        if row < len(self._head):
+            return self._head[row]
+        page, offset = divmod(row - len(self._head), HISTORY_FETCH_ROWS)
+        records = self._pages.get(page)
+        if records is None:
+            self._load_page(page)
+            return None
+        self._pages.move_to_end(page)
+        if offset >= len(records):
+            return None
+        return records[offset]
+    
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= self.rowCount():
+            return None
+        if role not in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.DecorationRole,
+                        Qt.ItemDataRole.ToolTipRole):
+            return None
+        
+        record = self.record_at(index.row())
+        if record is None:
+            if role == Qt.ItemDataRole.DisplayRole:
+                return "読み込み中…"
+            if role == Qt.ItemDataRole.DecorationRole and self.thumbnails is not None:
+                return self._placeholder
+            return None
+        
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self._format(record)
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return record.file_path
+        if self.thumbnails is None:
+            return None
+        pixmap = self.thumbnails.get(record.file_hash, record.file_path)
+        if pixmap is None:
+            self._thumbnail_rows[record.file_hash] = index.row()
+            if len(self._thumbnail_rows) > THUMBNAIL_QUEUE_MAX:
+                self._thumbnail_rows.popitem(last=False)
+            return self._placeholder
+        return pixmap
+    
+    @staticmethod
+    def _format(record: TransferRecord) -> str:
+        when = record.transferred_at.strftime("%Y-%m-%d %H:%M") if record.transferred_at else "-"
+        detail = when
+        if record.world_name:
+            detail += f"  {record.world_name}"
+        if record.was_compressed and record.file_size_original and record.file_size_compressed:
+            orig_mb = record.file_size_original / 1024 / 1024
+            comp_mb = record.file_size_compressed / 1024 / 1024
+            detail += f"  (圧縮: {orig_mb:.1f}MB → {comp_mb:.1f}MB)"
+        return f"{record.filename}\n{detail}"
+    
+    def _on_thumbnail_ready(self, key: str) -> None:
+        row = self._thumbnail_rows.pop(key, None)
+        if row is not None and row < self.rowCount():
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [Qt.ItemDataRole.DecorationRole])
+
+
+class HistoryWidget(QWidget):
+    """転送履歴ブラウザ（StackedWidget用）"""
+    
+    finished = pyqtSignal()  # 戻るシグナル
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        
+        self.thumbnails = ThumbnailLoader(parent=self)
+        self.model = HistoryModel(self.thumbnails, self)
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(SEARCH_DELAY_MS)
+        self._search_timer.timeout.connect(self._apply_filters)
+        
+        self._setup_ui()
+    
+    def _setup_ui(self):
+        """UIをセットアップ"""
+        layout = QVBoxLayout(self)
+        
+        # タイトル
+        title_label = QLabel("転送履歴")
+        title_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        title_label.setStyleSheet("font-size: 18px; font-weight: bold; margin-bottom: 10px;")
+        layout.addWidget(title_label)
+        
+        # 検索
+        search_layout = QHBoxLayout()
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("ファイル名・ワールド名・ユーザー名で検索")
+        self.search_input.setClearButtonEnabled(True)
+        self.search_input.textChanged.connect(self._search_timer.start)
+        search_layout.addWidget(self.search_input)
+        
+        self.compressed_check = QCheckBox("圧縮したもののみ")
+        self.compressed_check.stateChanged.connect(self._apply_filters)
+        search_layout.addWidget(self.compressed_check)
+        layout.addLayout(search_layout)
+        
+        # 一覧。行の高さを固定すると、表示範囲の計算が行ごとの問い合わせなしで済む
+        # （QListViewは行の追加ごとに全行をレイアウトし直すため使わない）
+        self.table_view = QTableView()
+        self.table_view.setModel(self.model)
+        self.table_view.setShowGrid(False)
+        self.table_view.setWordWrap(False)
+        self.table_view.setIconSize(THUMBNAIL_SIZE)
+        self.table_view.setAlternatingRowColors(True)
+        self.table_view.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table_view.horizontalHeader().hide()
+        self.table_view.horizontalHeader().setStretchLastSection(True)
+        self.model.rowsInserted.connect(self._keep_scroll_position)
+        vertical_header = self.table_view.verticalHeader()
+        vertical_header.hide()
+        vertical_header.setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        vertical_header.setDefaultSectionSize(THUMBNAIL_SIZE.height() + 8)
+        layout.addWidget(self.table_view)
+        
+        # ボタン
+        button_layout = QHBoxLayout()
+        # 先頭に追加できない変更（検索中の追加・削除）があったときだけ表示する
+        self.new_records_btn = QPushButton("履歴が更新されました（クリックで再読み込み）")
+        self.new_records_btn.clicked.connect(self.refresh)
+        self.new_records_btn.hide()
+        button_layout.addWidget(self.new_records_btn)
+        button_layout.addStretch()
+        self.back_btn = QPushButton("戻る")
+        self.back_btn.clicked.connect(self.finished.emit)
+        button_layout.addWidget(self.back_btn)
+        layout.addLayout(button_layout)
+    
+    def refresh(self):
+        """先頭から読み直す"""
+        self._apply_filters()
+    
+    def on_record_changed(self, record: Optional[TransferRecord]):
+        """転送記録の追加・削除を反映する（読み込み済みの行とスクロール位置は保つ）
+        
+        Args:
+            record: 追加された記録（削除などでまとめて変わったときはNone）
+        """
+        if record is not None and self.model.add_record(record):
+            return
+        self.new_records_btn.show()
+    
+    def _keep_scroll_position(self, parent: QModelIndex, first: int, last: int):
+        """先頭に行が追加されても見ている行がずれないようにする"""
+        scroll_bar = self.table_view.verticalScrollBar()
+        if first != 0 or scroll_bar.value() == 0:
+            return
+        step = 1
+        if self.table_view.verticalScrollMode() == QAbstractItemView.ScrollMode.ScrollPerPixel:
+            step = self.table_view.verticalHeader().defaultSectionSize()
+        # 範囲の更新は遅れて行われるので先に広げておく
+        scroll_bar.setMaximum(scroll_bar.maximum() + (last - first + 1) * step)
+        scroll_bar.setValue(scroll_bar.value() + (last - first + 1) * step)
+    
+    def _apply_filters(self):
+        self.new_records_btn.hide()
+        filters = {}
+        text = self.search_input.text().strip()
+        if text:
+            filters["text"] = text
+        if self.compressed_check.isChecked():
+            filters["compressed"] = True
+        self.model.set_filters(**filters)
@@ -3,165 +3,163 @@ VRChat Discord Uploader - メインウィンドウ
 ステータス表示、クイックアクション、転送ログ
 """
 import os
+import threading
 from pathlib import Path
-from typing import Optional
-from datetime import datetime
+from typing import Optional, TYPE_CHECKING
+from datetime import datetime, timedelta
 
 from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel,
-    QPushButton, QGroupBox, QListWidget, QListWidgetItem,
+    QPushButton, QGroupBox, QListView,
     QCheckBox, QFrame, QMessageBox, QApplication, QStackedWidget,
     QProgressDialog
 )
-from PyQt6.QtCore import Qt, QTimer, pyqtSignal, QThread
+from PyQt6.QtCore import Qt, QTimer, pyqtSignal, QThread, QObject
 from PyQt6.QtGui import QIcon, QCloseEvent, QFont
-import winsound
 
 from src.constants import APP_NAME, APP_VERSION
-from src.core.config_manager import config_manager
-from src.core.discord_webhook import DiscordWebhook
-from src.core.thread_manager import ThreadManager
-from src.core.image_processor import ImageProcessor
-from src.core.file_watcher import FileWatcher
+from src.core.config_manager import config_manager, Config, WatchRoot
+from src.core.control_commands import TransferCommands
+from src.core.control_server import ControlServer
+from src.core.transfer_pipeline import TransferPipeline, TransferQueue, TransferItem, TransferResult
 from src.core.vrchat_log_parser import vrchat_log_parser
 from src.core.updater import UpdateCheckWorker, UpdateDownloadWorker, Updater
 from src.db.repository import transfer_repository
-from src.db.models import TransferRecord
+from src.db.retention import history_retention
 from src.gui.settings_widget import SettingsWidget
+from src.gui.history_widget import HistoryWidget
+from src.gui.pipeline_monitor import PipelineMonitorWidget
+from src.gui.transfer_log_model import TransferLogModel
+from src.gui.webhook_check_dialog import WebhookCheckDialog
 from src.gui.system_tray import SystemTray
-from src.utils.helpers import calculate_file_hash, mask_webhook_url
-from src.utils.logger import get_logger
+from src.utils.helpers import mask_webhook_url
+from src.utils.logger import setup_logger, get_logger
+
+if TYPE_CHECKING:
+    from src.core.file_watcher import FileWatcher
 
 logger = get_logger()
 
 
-class TransferWorker(QThread):
-    """画像転送ワーカースレッド"""
+class DashboardLoader(QThread):
+    """ダッシュボードの統計（と起動時は直近の履歴）を読み込むワーカースレッド"""
     
-    finished = pyqtSignal(bool, str, str)  # success, filename, message
+    loaded = pyqtSignal(object, object)  # TransferStats, List[TransferRecord] または None
     
-    def __init__(self, image_path: Path, webhook: DiscordWebhook, 
-                 processor: ImageProcessor, thread_manager: Optional[ThreadManager] = None,
-                 enable_monthly_thread: bool = False,
-                 enable_instance_users: bool = False):
+    def __init__(self, include_history: bool = False, listener=None):
         super().__init__()
-        self.image_path = image_path
-        self.webhook = webhook
-        self.processor = processor
-        self.thread_manager = thread_manager
-        self.enable_monthly_thread = enable_monthly_thread
-        self.enable_instance_users = enable_instance_users
+        self.include_history = include_history
+        self.listener = listener
     
     def run(self):
         try:
-            filename = self.image_path.name
-            
-            # 重複チェック
-            file_hash = calculate_file_hash(self.image_path)
-            if transfer_repository.exists_by_hash(file_hash):
-                self.finished.emit(False, filename, "既に転送済みです")
-                return
-            
-            # 画像処理
-            processed_path, original_size, final_size, was_compressed = \
-                self.processor.process_image(self.image_path)
-            
-            # 日付を解析 (ファイル名から、失敗した場合は更新日時)
-            from src.utils.helpers import parse_vrchat_filename, get_file_modified_time
-            image_date = parse_vrchat_filename(filename)
-            if not image_date:
-                image_date = get_file_modified_time(self.image_path)
-            
-            # スレッドIDを取得
-            thread_id = None
-            if self.enable_monthly_thread and self.thread_manager:
-                thread_id, error = self.thread_manager.get_or_create_monthly_thread(image_date)
-                if error:
-                    if error == "TEXT_CHANNEL_LIMIT":
-                        logger.warning("テキストチャンネルのためスレッドを作成できませんでした。通常の投稿を行います。")
-                    else:
-                        logger.warning(f"スレッド作成エラー (日付: {image_date}): {error}")
-            
-            # ワールド名とユーザー情報を取得
-            world_name = None
-            instance_users = None
-            try:
-                world_name, users = vrchat_log_parser.get_world_and_users_at_time(image_date)
-                if self.enable_instance_users and users:
-                    instance_users = users
-            except Exception as e:
-                logger.warning(f"ワールド/ユーザー情報の取得に失敗しました: {e}")
-            
-            # 送信
-            success, message_id, error = self.webhook.send_image(
-                processed_path,
-                original_size=original_size,
-                compressed_size=final_size if was_compressed else None,
-                thread_id=thread_id,
-                world_name=world_name,
-                instance_users=instance_users
-            )
-            
-            # 一時ファイルを削除
-            if was_compressed:
-                self.processor.cleanup_temp_file(processed_path)
-            
-            if success:
-                # 履歴に記録
-                record = TransferRecord(
-                    filename=filename,
-                    file_path=str(self.image_path),
-                    file_hash=file_hash,
-                    file_size_original=original_size,
-                    file_size_compressed=final_size if was_compressed else None,
-                    discord_message_id=message_id,
-                    discord_thread_id=thread_id,
-                    was_compressed=was_compressed,
-                    compression_ratio=final_size / original_size if was_compressed else None
-                )
-                transfer_repository.add_record(record)
-                
-                msg = "転送成功"
-                if was_compressed:
-                    msg += f" (圧縮: {original_size/1024/1024:.1f}MB → {final_size/1024/1024:.1f}MB)"
-                self.finished.emit(True, filename, msg)
-            else:
-                self.finished.emit(False, filename, error or "転送失敗")
-        
+            # 初回の使用でDBを開くため、変更通知の登録もこのスレッドで行う
+            if self.listener:
+                transfer_repository.add_listener(self.listener)
+            stats = transfer_repository.get_stats()
+            records = transfer_repository.get_recent_records(10) if self.include_history else None
         except Exception as e:
-            logger.error(f"転送エラー: {e}")
-            self.finished.emit(False, self.image_path.name, str(e))
+            logger.error(f"ダッシュボードの読み込みエラー: {e}")
+            return
+        self.loaded.emit(stats, records)
+
+
+class RepositoryEvents(QObject):
+    """転送履歴の変更通知を書き込みスレッドからGUIスレッドへ中継"""
+    
+    changed = pyqtSignal(object)  # TransferRecord または None
+
+
+class TransferEvents(QObject):
+    """転送結果を転送スレッドからGUIスレッドへ中継"""
+    
+    finished = pyqtSignal(object, object)  # TransferItem, TransferResult
+
+
+class ConfigEvents(QObject):
+    """設定の変更通知を保存・監視スレッドからGUIスレッドへ中継"""
+    
+    changed = pyqtSignal(object, object)  # Config, 変わった項目名の集合
+
+
+class ControlEvents(QObject):
+    """制御コマンドを接続ごとのスレッドからGUIスレッドへ中継"""
+    
+    show_requested = pyqtSignal()
+    quit_requested = pyqtSignal()
+    state_changed = pyqtSignal()  # 一時停止・再開・ファイルの追加
 
 
 class MainWindow(QMainWindow):
     """メインウィンドウ"""
     
-    def __init__(self):
+    def __init__(self, control_server: Optional[ControlServer] = None):
+        """
+        Args:
+            control_server: 起動済みの制御用ソケット（コマンドの処理をこのウィンドウで引き受ける）
+        """
         super().__init__()
         
-        self.file_watcher: Optional[FileWatcher] = None
-        self.webhook: Optional[DiscordWebhook] = None
-        self.thread_manager: Optional[ThreadManager] = None
-        self.image_processor = ImageProcessor()
+        self.file_watcher: Optional["FileWatcher"] = None
+        self.pipeline = TransferPipeline()
         self.system_tray: Optional[SystemTray] = None
-        self.transfer_workers = []
+        
+        # 監視・制御コマンドで見つけたファイルを同じ待ち行列で転送する
+        self.transfer_events = TransferEvents()
+        self.transfer_events.finished.connect(self._on_transfer_finished)
+        self.transfer_queue = TransferQueue(self.pipeline, self.transfer_events.finished.emit)
+        self.transfer_queue.start()
+        # 制御コマンドでまとめて追加したファイルの結果（待ち行列が空になったら1回だけ通知する）
+        self._bulk_counts = {"transferred": 0, "duplicates": 0, "failed": 0}
+        self._bulk_summary_timer = QTimer(self)
+        self._bulk_summary_timer.setSingleShot(True)
+        self._bulk_summary_timer.setInterval(1000)
+        self._bulk_summary_timer.timeout.connect(self._notify_bulk_summary)
+        self._dashboard_loader: Optional[DashboardLoader] = None
+        self._dashboard_reload_pending = False
         
         self._setup_ui()
         self._setup_tray()
         self._load_config(initial=True)
-        self._update_status()
-        
-        # 自動監視開始
-        if config_manager.config.enable_auto_watch:
-            QTimer.singleShot(100, self._start_watching)
-            
-        # 更新確認 (自動で実行)
-        self._check_github_updates()
-        
-        # 定期更新タイマー
-        self.update_timer = QTimer()
-        self.update_timer.timeout.connect(self._update_status)
-        self.update_timer.start(5000)  # 5秒ごと
+        self._update_watch_status()
+        
+        # 設定は変わった項目に関係する部分だけ反映する（設定画面・config.json の外部編集）
+        self.config_events = ConfigEvents()
+        self.config_events.changed.connect(self._on_config_changed)
+        config_manager.add_listener(self.config_events.changed.emit)
+        
+        # 統計は転送記録が変わったときだけ読み直す
+        self.repository_events = RepositoryEvents()
+        self.repository_events.changed.connect(self._on_repository_changed)
+        
+        # 制御コマンド（二重起動時の表示要求・CLIからのファイル追加など）
+        self.control_events = ControlEvents()
+        self.control_events.show_requested.connect(self._show_from_tray)
+        self.control_events.quit_requested.connect(self._quit_app)
+        self.control_events.state_changed.connect(self._update_watch_status)
+        self.control_commands = TransferCommands(
+            self.pipeline, self.transfer_queue, "gui",
+            is_watching=lambda: bool(self.file_watcher and self.file_watcher.is_running),
+            on_shutdown=self.control_events.quit_requested.emit,
+            on_change=self.control_events.state_changed.emit
+        )
+        self.control_commands.handlers["show"] = self._handle_show_command
+        if control_server is not None:
+            control_server.handler = self.control_commands
+        
+        # DB・ネットワークを使う処理はウィンドウを表示してから始める
+        QTimer.singleShot(0, self._start_background_tasks)
+        
+        # 日付が変わったら本日の転送数を読み直す
+        self.midnight_timer = QTimer()
+        self.midnight_timer.setSingleShot(True)
+        self.midnight_timer.timeout.connect(self._on_midnight)
+        self._schedule_midnight_reload()
+        
+        # アイドル時の履歴アーカイブ・DB最適化
+        self.maintenance_timer = QTimer()
+        self.maintenance_timer.timeout.connect(self._run_idle_maintenance)
+        self.maintenance_timer.start(10 * 60 * 1000)  # 10分ごとに確認
     
     def _setup_ui(self):
         """UIをセットアップ"""
@@ -171,7 +169,7 @@ class MainWindow(QMainWindow):
         icon_path = Path(__file__).parent.parent / "assets" / "icon.ico"
         if icon_path.exists():
             self.setWindowIcon(QIcon(str(icon_path)))
-
+        
         # メインコンテナとStackedWidget
         container = QWidget()
         self.setCentralWidget(container)
@@ -191,6 +189,16 @@ class MainWindow(QMainWindow):
         self.settings_page.finished.connect(self._on_settings_finished)
         self.stacked_widget.addWidget(self.settings_page)
         
+        # 転送履歴（ページ2）
+        self.history_page = HistoryWidget()
+        self.history_page.finished.connect(lambda: self.stacked_widget.setCurrentIndex(0))
+        self.stacked_widget.addWidget(self.history_page)
+        
+        # パイプラインモニター（ページ3）
+        self.monitor_page = PipelineMonitorWidget()
+        self.monitor_page.finished.connect(lambda: self.stacked_widget.setCurrentIndex(0))
+        self.stacked_widget.addWidget(self.monitor_page)
+    
     def _setup_dashboard_ui(self, parent_widget):
         """ダッシュボードUIをセットアップ"""
         layout = QVBoxLayout(parent_widget)
@@ -224,6 +232,14 @@ class MainWindow(QMainWindow):
         self.open_folder_btn.clicked.connect(self._open_folder)
         action_layout.addWidget(self.open_folder_btn)
         
+        self.history_btn = QPushButton("📚 履歴")
+        self.history_btn.clicked.connect(self._open_history)
+        action_layout.addWidget(self.history_btn)
+        
+        self.monitor_btn = QPushButton("📈 モニター")
+        self.monitor_btn.clicked.connect(self._open_monitor)
+        action_layout.addWidget(self.monitor_btn)
+        
         self.settings_btn = QPushButton("⚙️ 設定")
         self.settings_btn.clicked.connect(self._open_settings)
         action_layout.addWidget(self.settings_btn)
@@ -238,8 +254,11 @@ class MainWindow(QMainWindow):
         log_group = QGroupBox("📜 転送ログ（直近10件）")
         log_layout = QVBoxLayout(log_group)
         
-        self.log_list = QListWidget()
+        self.log_model = TransferLogModel()
+        self.log_list = QListView()
+        self.log_list.setModel(self.log_model)
         self.log_list.setAlternatingRowColors(True)
+        self.log_list.setUniformItemSizes(True)
         log_layout.addWidget(self.log_list)
         
         layout.addWidget(log_group)
@@ -298,7 +317,18 @@ class MainWindow(QMainWindow):
         """設定を読み込み"""
         config = config_manager.config
         
-        # クイック設定を反映 (シグナルをブロックして誤保存を防止)
+        self._apply_quick_settings(config)
+        
+        # Webhook・圧縮閾値を設定
+        self.pipeline.load_config(config)
+        self._update_webhook_label(config)
+        
+        # 最小化起動
+        if initial and config.enable_minimize_to_tray:
+            QTimer.singleShot(100, self._minimize_to_tray)
+    
+    def _apply_quick_settings(self, config: Config):
+        """クイック設定を反映 (シグナルをブロックして誤保存を防止)"""
         self.auto_startup_check.blockSignals(True)
         self.minimize_tray_check.blockSignals(True)
         try:
@@ -307,25 +337,32 @@ class MainWindow(QMainWindow):
         finally:
             self.auto_startup_check.blockSignals(False)
             self.minimize_tray_check.blockSignals(False)
-        
-        # Webhookを設定
+    
+    def _update_webhook_label(self, config: Config):
         if config.webhook_url:
-            self.webhook = DiscordWebhook(config.webhook_url, config.webhook_username)
-            self.thread_manager = ThreadManager(config.webhook_url)
             self.webhook_label.setText(f"🌐 Webhook URL: {mask_webhook_url(config.webhook_url)}")
-        
-        # 圧縮閾値を設定
-        self.image_processor = ImageProcessor(
-            int(config.compression_threshold_mb * 1024 * 1024)
-        )
-        
-        # 最小化起動
-        if initial and config.enable_minimize_to_tray:
-            QTimer.singleShot(100, self._minimize_to_tray)
+        else:
+            self.webhook_label.setText("🌐 Webhook URL: 未設定")
+    
+    def _on_config_changed(self, config: Config, changed: set):
+        """設定の変更を反映（変わった項目に関係する部品だけを更新し、監視や転送は止めない）"""
+        if changed & {"enable_auto_startup", "enable_minimize_to_tray"}:
+            self._apply_quick_settings(config)
+        if "webhook_url" in changed:
+            self._update_webhook_label(config)
+        
+        self.pipeline.apply_config(config, changed)
+        
+        # 監視ルートを差分更新（変更のないルートの監視は継続）
+        if changed & {"watch_folder", "watch_roots"}:
+            if self.file_watcher and self.file_watcher.is_running:
+                self.file_watcher.update_roots(config.all_watch_roots())
+        
+        if "log_level" in changed:
+            setup_logger(config.log_level)
     
-    def _update_status(self):
-        """ステータスを更新"""
-        # 監視状態
+    def _update_watch_status(self):
+        """監視状態の表示を更新"""
         if self.file_watcher and self.file_watcher.is_running:
             self.status_label.setText("監視状態: ✓ 稼働中")
             self.status_label.setStyleSheet("color: green;")
@@ -335,39 +372,87 @@ class MainWindow(QMainWindow):
             self.status_label.setStyleSheet("color: gray;")
             self.toggle_watch_btn.setText("▶️ 開始")
         
-        # 転送統計
-        today_count = transfer_repository.get_today_count()
-        total_count = transfer_repository.get_total_count()
-        self.today_count_label.setText(f"本日転送数: {today_count}枚")
-        self.total_count_label.setText(f"累計転送数: {total_count:,}枚")
-        
-        # 最近の転送
-        recent = transfer_repository.get_recent_records(1)
-        if recent:
-            last = recent[0]
-            if last.transferred_at:
-                self.last_transfer_label.setText(
-                    f"最終転送: {last.transferred_at.strftime('%Y-%m-%d %H:%M:%S')}"
-                )
+        # 制御コマンドで転送を一時停止している
+        if self.transfer_queue.is_paused:
+            self.status_label.setText(
+                f"{self.status_label.text()}（転送一時停止中: 待ち {self.transfer_queue.pending}件）"
+            )
+            self.status_label.setStyleSheet("color: orange;")
+    
+    def _start_background_tasks(self):
+        """起動直後の読み込み・監視開始・更新確認（初回描画の後に実行）"""
+        self._reload_dashboard(include_history=True, listener=self.repository_events.changed.emit)
+        
+        # 自動監視開始
+        if config_manager.config.enable_auto_watch:
+            QTimer.singleShot(100, self._start_watching)
+        
+        # VRChatが古いログを削除する前にイベントストアへ取り込む
+        threading.Thread(target=vrchat_log_parser.ingest_logs, daemon=True).start()
+        
+        # 更新確認 (自動で実行)
+        self._check_github_updates()
         
-        # ログリスト更新
-        self._update_log_list()
-    
-    def _update_log_list(self):
-        """転送ログリストを更新"""
-        self.log_list.clear()
-        
-        records = transfer_repository.get_recent_records(10)
-        for record in records:
-            icon = "✓" if record.id else "⚠"
-            text = f"{icon} {record.filename}"
-            if record.was_compressed and record.file_size_original and record.file_size_compressed:
-                orig_mb = record.file_size_original / 1024 / 1024
-                comp_mb = record.file_size_compressed / 1024 / 1024
-                text += f" (圧縮: {orig_mb:.1f}MB → {comp_mb:.1f}MB)"
-            
-            item = QListWidgetItem(text)
-            self.log_list.addItem(item)
+        # config.json の外部編集を反映する
+        config_manager.start_watching()
+    
+    def _reload_dashboard(self, include_history: bool = False, listener=None):
+        """転送統計をバックグラウンドで読み込む（読み込み中なら完了後にもう一度読む）"""
+        if self._dashboard_loader and self._dashboard_loader.isRunning():
+            self._dashboard_reload_pending = True
+            return
+        
+        self._dashboard_loader = DashboardLoader(include_history, listener)
+        self._dashboard_loader.loaded.connect(self._on_dashboard_loaded)
+        self._dashboard_loader.finished.connect(self._on_dashboard_loader_finished)
+        self._dashboard_loader.start()
+    
+    def _on_dashboard_loader_finished(self):
+        if self._dashboard_reload_pending:
+            self._dashboard_reload_pending = False
+            self._reload_dashboard()
+    
+    def _on_dashboard_loaded(self, stats, records):
+        """転送統計の表示を更新"""
+        self.today_count_label.setText(f"本日転送数: {stats.today_count}枚")
+        self.total_count_label.setText(f"累計転送数: {stats.total_count:,}枚")
+        if stats.last_transferred_at:
+            self.last_transfer_label.setText(
+                f"最終転送: {stats.last_transferred_at.strftime('%Y-%m-%d %H:%M:%S')}"
+            )
+        else:
+            self.last_transfer_label.setText("最終転送: -")
+        
+        if records:
+            # 起動後に追加されたメッセージの下に並べる
+            self.log_model.append_history(records)
+    
+    def _on_repository_changed(self, record):
+        """転送記録が追加・削除された"""
+        self._reload_dashboard()
+        if self.stacked_widget.currentWidget() is self.history_page:
+            self.history_page.on_record_changed(record)
+    
+    def _schedule_midnight_reload(self):
+        now = datetime.now()
+        midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+        self.midnight_timer.start(int((midnight - now).total_seconds() * 1000) + 1000)
+    
+    def _on_midnight(self):
+        self._reload_dashboard()
+        self._schedule_midnight_reload()
+    
+    def _run_idle_maintenance(self):
+        """転送していない間に履歴のアーカイブとDBの最適化を行う"""
+        if not self.transfer_queue.is_idle:
+            return
+        if not history_retention.is_due():
+            return
+        threading.Thread(
+            target=history_retention.run_maintenance,
+            args=(config_manager.config.history_retention_months,),
+            daemon=True
+        ).start()
     
     def _toggle_watch(self):
         """監視の開始/停止を切り替え"""
@@ -377,15 +462,10 @@ class MainWindow(QMainWindow):
         else:
             self._start_watching()
         
-        self._update_status()
+        self._update_watch_status()
     
     def _start_watching(self):
         """監視を開始"""
-        # 既存の監視を停止
-        if self.file_watcher:
-            self.file_watcher.stop()
-            self.file_watcher = None
-            
         config = config_manager.config
         
         if not config.webhook_url:
@@ -395,6 +475,13 @@ class MainWindow(QMainWindow):
             )
             return
         
+        roots = config.all_watch_roots()
+        
+        # 既に稼働中なら変更のあったルートのみ更新
+        if self.file_watcher and self.file_watcher.is_running:
+            self.file_watcher.update_roots(roots)
+            return
+        
         watch_folder = Path(config.watch_folder)
         if not watch_folder.exists():
             QMessageBox.warning(
@@ -403,54 +490,56 @@ class MainWindow(QMainWindow):
             )
             return
         
-        self.file_watcher = FileWatcher(watch_folder, self._on_new_image)
+        from src.core.file_watcher import FileWatcher  # watchdogは監視を始めるときに読み込む
+        
+        self.file_watcher = FileWatcher(roots, self._on_new_image)
         if self.file_watcher.start():
-            self._add_log_message(f"監視開始: {watch_folder}", is_error=False)
+            for root in self.file_watcher.watched_roots:
+                self._add_log_message(f"監視開始: {root.path}", is_error=False)
             if self.system_tray:
                 self.system_tray.show_message(
                     APP_NAME,
                     "ファイル監視を開始しました"
                 )
+        self._update_watch_status()
     
-    def _on_new_image(self, image_path: Path):
-        """新しい画像が検出された"""
-        if not self.webhook:
-            return
-        
-        config = config_manager.config
-        
-        worker = TransferWorker(
-            image_path,
-            self.webhook,
-            self.image_processor,
-            self.thread_manager,
-            config.enable_monthly_thread,
-            config.enable_instance_users
-        )
-        worker.finished.connect(self._on_transfer_finished)
-        worker.start()
-        
-        self.transfer_workers.append(worker)
+    def _on_new_image(self, image_path: Path, root: WatchRoot):
+        """新しい画像が検出された（監視スレッドから呼ばれる）"""
+        self.transfer_queue.put(image_path, root)
     
-    def _on_transfer_finished(self, success: bool, filename: str, message: str):
+    def _on_transfer_finished(self, item: TransferItem, result: TransferResult):
         """転送完了"""
-        self._add_log_message(f"{filename}: {message}", is_error=not success)
-        self._update_status()
+        if item.bulk:
+            self._on_bulk_transfer_finished(result)
+        else:
+            self._notify_transfer(result)
+        
+        if self.transfer_queue.is_paused:
+            self._update_watch_status()
+    
+    def _notify_transfer(self, result: TransferResult):
+        """1件の転送結果をログ・音・トースト通知で知らせる"""
+        filename = result.filename
+        message = result.message
+        success = result.success
+        # 転送済みのファイルは失敗として扱わない
+        self._add_log_message(f"{filename}: {message}", is_error=not success and not result.duplicate)
+        if result.duplicate:
+            return
         
         # 音を鳴らす
         if success and config_manager.config.enable_sound_notification:
-            try:
-                # システムの通知音を再生
-                winsound.PlaySound("SystemNotification", winsound.SND_ALIAS | winsound.SND_ASYNC)
-            except Exception:
-                # 失敗した場合はビープ音
-                winsound.MessageBeep(winsound.MB_OK)
+            self._play_notification_sound()
         
         if self.system_tray and config_manager.config.enable_toast_notification:
             if success:
+                icon = QSystemTrayIcon.MessageIcon.Information
+                if result.thumbnail_path:
+                    icon = QIcon(str(result.thumbnail_path))
                 self.system_tray.show_message(
                     "転送完了",
-                    f"{filename}\n{message}"
+                    f"{filename}\n{message}",
+                    icon
                 )
             else:
                 self.system_tray.show_message(
@@ -459,18 +548,52 @@ class MainWindow(QMainWindow):
                     QSystemTrayIcon.MessageIcon.Warning
                 )
     
+    def _on_bulk_transfer_finished(self, result: TransferResult):
+        """まとめて追加したファイルの結果を集計（転送済みのファイルはログにも出さない）"""
+        if result.duplicate:
+            self._bulk_counts["duplicates"] += 1
+        elif result.success:
+            self._bulk_counts["transferred"] += 1
+            self._add_log_message(f"{result.filename}: {result.message}")
+        else:
+            self._bulk_counts["failed"] += 1
+            self._add_log_message(f"{result.filename}: {result.message}", is_error=True)
+        # 結果が続けて届く間は待ち、最後の結果から少し経ってからまとめて通知する
+        self._bulk_summary_timer.start()
+    
+    def _notify_bulk_summary(self):
+        """まとめて追加したファイルの処理が終わったら1回だけ通知"""
+        if not self.transfer_queue.is_idle:
+            return
+        counts = self._bulk_counts
+        if not any(counts.values()):
+            return
+        self._bulk_counts = {"transferred": 0, "duplicates": 0, "failed": 0}
+        summary = (
+            f"転送 {counts['transferred']}件 / 転送済み {counts['duplicates']}件 / "
+            f"失敗 {counts['failed']}件"
+        )
+        self._add_log_message(f"まとめて追加したファイルの処理が完了しました: {summary}",
+                              is_error=counts["failed"] > 0)
+        
+        if counts["transferred"] and config_manager.config.enable_sound_notification:
+            self._play_notification_sound()
+        if self.system_tray and config_manager.config.enable_toast_notification:
+            self.system_tray.show_message(
+                "まとめて転送しました",
+                summary,
+                QSystemTrayIcon.MessageIcon.Warning if counts["failed"]
+                else QSystemTrayIcon.MessageIcon.Information
+            )
+    
+    def _handle_show_command(self, request: dict) -> dict:
+        """二重起動時などにウィンドウの表示を要求された（接続ごとのスレッドから呼ばれる）"""
+        self.control_events.show_requested.emit()
+        return {"ok": True}
+    
     def _add_log_message(self, message: str, is_error: bool = False):
         """ログメッセージを追加"""
-        icon = "⚠" if is_error else "✓"
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        item = QListWidgetItem(f"[{timestamp}] {icon} {message}")
-        if is_error:
-            item.setForeground(Qt.GlobalColor.red)
-        self.log_list.insertItem(0, item)
-        
-        # 最大100件に制限
-        while self.log_list.count() > 100:
-            self.log_list.takeItem(self.log_list.count() - 1)
+        self.log_model.add_message(message, is_error)
     
     def _open_folder(self):
         """監視フォルダを開く"""
@@ -484,27 +607,44 @@ class MainWindow(QMainWindow):
         self.settings_page._load_settings()
         self.stacked_widget.setCurrentIndex(1)
     
+    def _open_history(self):
+        """転送履歴を開く"""
+        self.history_page.refresh()
+        self.stacked_widget.setCurrentIndex(2)
+    
+    def _open_monitor(self):
+        """パイプラインモニターを開く"""
+        self.stacked_widget.setCurrentIndex(3)
+    
     def _on_settings_finished(self):
-        """設定画面から戻る"""
-        self._load_config()
-        
-        # 監視を再起動（設定変更の可能性があるため）
-        if self.file_watcher and self.file_watcher.is_running:
-            self.file_watcher.restart()
-            
+        """設定画面から戻る（変更は保存時に _on_config_changed で反映済み）"""
         self.stacked_widget.setCurrentIndex(0)
     
+    @staticmethod
+    def _play_notification_sound():
+        """通知音を再生（winsound はWindowsのみ）"""
+        try:
+            import winsound
+        except ImportError:
+            QApplication.beep()
+            return
+        try:
+            # システムの通知音を再生
+            winsound.PlaySound("SystemNotification", winsound.SND_ALIAS | winsound.SND_ASYNC)
+        except Exception:
+            # 失敗した場合はビープ音
+            winsound.MessageBeep(winsound.MB_OK)
+    
     def _test_connection(self):
         """Webhook接続テスト"""
-        if not self.webhook:
+        if not self.pipeline.webhook:
             QMessageBox.warning(self, "エラー", "Webhook URLが設定されていません")
             return
         
-        success, message = self.webhook.test_connection()
-        if success:
-            QMessageBox.information(self, "接続成功", message)
-        else:
-            QMessageBox.warning(self, "接続失敗", message)
+        dialog = WebhookCheckDialog(self.pipeline.webhook.webhook_url, self)
+        self.test_connection_btn.setEnabled(False)
+        dialog.destroyed.connect(lambda: self.test_connection_btn.setEnabled(True))
+        dialog.start()
     
     def _on_quick_setting_changed(self):
         """クイック設定が変更された"""
@@ -527,7 +667,7 @@ class MainWindow(QMainWindow):
         self.show()
         self.activateWindow()
         self.raise_()
-        
+    
     # --- 自動アップデート処理 ---
     
     def _check_github_updates(self):
@@ -536,7 +676,7 @@ class MainWindow(QMainWindow):
         self.update_checker.update_available.connect(self._prompt_update)
         # エラーや更新なしの場合は特にUIを出さない（バックグラウンド処理）
         self.update_checker.start()
-        
+    
     def _prompt_update(self, version: str, release_notes: str, download_url: str):
         """アップデートを促すダイアログを表示"""
         msg = QMessageBox(self)
@@ -555,7 +695,7 @@ class MainWindow(QMainWindow):
         
         if button == QMessageBox.StandardButton.Yes:
             self._start_update_download(download_url)
-            
+    
     def _start_update_download(self, url: str):
         """インストーラーのダウンロードを開始"""
         self.progress_dialog = QProgressDialog("インストーラーをダウンロード中...", "キャンセル", 0, 100, self)
@@ -571,7 +711,7 @@ class MainWindow(QMainWindow):
         
         self.progress_dialog.show()
         self.downloader.start()
-        
+    
     def _on_download_finished(self, installer_path: str):
         """ダウンロード完了後、インストーラーを起動"""
         Updater.execute_installer(installer_path)
@@ -580,6 +720,9 @@ class MainWindow(QMainWindow):
         """アプリケーションを終了"""
         if self.file_watcher:
             self.file_watcher.stop()
+        config_manager.stop_watching()
+        # 転送中のファイルは少しだけ待ち、待ち行列は破棄する
+        self.transfer_queue.stop(timeout=5)
         QApplication.quit()
     
     def closeEvent(self, event: QCloseEvent):
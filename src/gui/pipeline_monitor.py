@@ -0,0 +1,137 @@
+"""
+VRChat Discord Uploader - パイプラインモニター
+転送の段階ごとの処理中件数・所要時間、送信速度、レート制限・リトライ回数を表示する
+"""
+from PyQt6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+    QTableWidget, QTableWidgetItem, QHeaderView, QFileDialog, QMessageBox
+)
+from PyQt6.QtCore import Qt, QTimer, pyqtSignal
+
+from src.core.pipeline_metrics import pipeline_metrics, STAGES, COUNTERS
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+MONITOR_REFRESH_MS = 1000
+STAGE_COLUMNS = ["処理中", "件数", "p50 (ms)", "p95 (ms)", "最大 (ms)"]
+STAGE_KEYS = ["in_flight", "count", "p50_ms", "p95_ms", "max_ms"]
+
+
+class PipelineMonitorWidget(QWidget):
+    """パイプラインモニター（StackedWidget用）
+    
+    表示中のみ定期的に集計値を読み直す。
+    """
+    
+    finished = pyqtSignal()  # 戻るシグナル
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        
+        self._timer = QTimer(self)
+        self._timer.setInterval(MONITOR_REFRESH_MS)
+        self._timer.timeout.connect(self.refresh)
+        
+        self._setup_ui()
+    
+    def _setup_ui(self):
+        """UIをセットアップ"""
+        layout = QVBoxLayout(self)
+        
+        # タイトル
+        title_label = QLabel("パイプラインモニター")
+        title_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        title_label.setStyleSheet("font-size: 18px; font-weight: bold; margin-bottom: 10px;")
+        layout.addWidget(title_label)
+        
+        self.window_label = QLabel()
+        self.window_label.setStyleSheet("color: gray;")
+        layout.addWidget(self.window_label)
+        
+        # 段階ごとの所要時間
+        self.stage_table = QTableWidget(len(STAGES), len(STAGE_COLUMNS))
+        self.stage_table.setHorizontalHeaderLabels(STAGE_COLUMNS)
+        self.stage_table.setVerticalHeaderLabels([label for _, label in STAGES])
+        self.stage_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.stage_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        for row in range(len(STAGES)):
+            for column in range(len(STAGE_COLUMNS)):
+                item = QTableWidgetItem("0")
+                item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                self.stage_table.setItem(row, column, item)
+        layout.addWidget(self.stage_table)
+        
+        # 送信速度・カウンター
+        self.upload_label = QLabel("送信速度: -")
+        layout.addWidget(self.upload_label)
+        self.counters_label = QLabel()
+        self.counters_label.setWordWrap(True)
+        layout.addWidget(self.counters_label)
+        
+        # ボタン
+        button_layout = QHBoxLayout()
+        self.export_btn = QPushButton("JSONで書き出す")
+        self.export_btn.clicked.connect(self._export_json)
+        button_layout.addWidget(self.export_btn)
+        
+        self.reset_btn = QPushButton("リセット")
+        self.reset_btn.clicked.connect(self._reset)
+        button_layout.addWidget(self.reset_btn)
+        
+        button_layout.addStretch()
+        self.back_btn = QPushButton("戻る")
+        self.back_btn.clicked.connect(self.finished.emit)
+        button_layout.addWidget(self.back_btn)
+        layout.addLayout(button_layout)
+    
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+        self._timer.start()
+    
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self._timer.stop()
+    
+    def refresh(self):
+        """集計値を表示"""
+        snapshot = pipeline_metrics.snapshot()
+        self.window_label.setText(
+            f"直近{snapshot['window_seconds'] // 60:.0f}分間の集計（カウンターは {snapshot['started_at']} から）"
+        )
+        
+        for row, (stage, _) in enumerate(STAGES):
+            values = snapshot["stages"].get(stage, {})
+            for column, key in enumerate(STAGE_KEYS):
+                self.stage_table.item(row, column).setText(f"{values.get(key, 0):,}")
+        
+        upload = snapshot["upload"]
+        if upload["count"]:
+            self.upload_label.setText(
+                f"送信速度: {upload['mb_per_s']:.2f} MB/s "
+                f"（{upload['count']}件, {upload['bytes'] / 1024 / 1024:.1f} MB）"
+            )
+        else:
+            self.upload_label.setText("送信速度: -")
+        
+        counters = snapshot["counters"]
+        self.counters_label.setText(
+            " / ".join(f"{label}: {counters.get(name, 0)}" for name, label in COUNTERS)
+        )
+    
+    def _export_json(self):
+        """集計値をJSONファイルに書き出す"""
+        path, _ = QFileDialog.getSaveFileName(
+            self, "計測値を書き出す", "pipeline_metrics.json", "JSON (*.json)"
+        )
+        if not path:
+            return
+        try:
+            pipeline_metrics.export_json(path)
+        except OSError as e:
+            QMessageBox.warning(self, "エラー", f"書き出しに失敗しました:\n{e}")
+    
+    def _reset(self):
+        pipeline_metrics.reset()
+        self.refresh()
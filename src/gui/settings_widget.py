@@ -5,16 +5,27 @@ VRChat Discord Uploader - 設定ウィジェット
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QTabWidget,
     QLabel, QLineEdit, QPushButton, QCheckBox, QSpinBox,
-    QFileDialog, QGroupBox, QFormLayout, QComboBox, QMessageBox
+    QFileDialog, QGroupBox, QFormLayout, QComboBox, QMessageBox,
+    QTableWidget, QTableWidgetItem, QHeaderView
 )
 from PyQt6.QtCore import Qt, pyqtSignal
 
-from src.core.config_manager import config_manager
-from src.core.discord_webhook import DiscordWebhook
+from src.core.config_manager import (
+    config_manager, WatchRoot,
+    THREAD_POLICY_DEFAULT, THREAD_POLICY_MONTHLY, THREAD_POLICY_NONE
+)
+from src.gui.webhook_check_dialog import WebhookCheckDialog
 from src.utils.logger import get_logger
 
 logger = get_logger()
 
+# 監視ルートのスレッドポリシー表示名
+THREAD_POLICY_LABELS = [
+    (THREAD_POLICY_DEFAULT, "既定"),
+    (THREAD_POLICY_MONTHLY, "月別スレッド"),
+    (THREAD_POLICY_NONE, "スレッドなし"),
+]
+
 
 class SettingsWidget(QWidget):
     """設定ウィジェット"""
@@ -106,6 +117,31 @@ class SettingsWidget(QWidget):
         folder_layout.addWidget(self.browse_btn)
         
         layout.addWidget(folder_group)
+        
+        # 追加の監視フォルダ設定
+        roots_group = QGroupBox("追加の監視フォルダ")
+        roots_layout = QVBoxLayout(roots_group)
+        
+        self.roots_table = QTableWidget(0, 4)
+        self.roots_table.setHorizontalHeaderLabels(
+            ["フォルダ", "拡張子", "Webhook URL (空欄で既定)", "スレッド"]
+        )
+        self.roots_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.roots_table.verticalHeader().setVisible(False)
+        roots_layout.addWidget(self.roots_table)
+        
+        roots_buttons = QHBoxLayout()
+        roots_buttons.addStretch()
+        self.add_root_btn = QPushButton("追加...")
+        self.add_root_btn.clicked.connect(self._add_watch_root)
+        roots_buttons.addWidget(self.add_root_btn)
+        
+        self.remove_root_btn = QPushButton("削除")
+        self.remove_root_btn.clicked.connect(self._remove_watch_root)
+        roots_buttons.addWidget(self.remove_root_btn)
+        roots_layout.addLayout(roots_buttons)
+        
+        layout.addWidget(roots_group)
         layout.addStretch()
         
         return widget
@@ -195,6 +231,15 @@ class SettingsWidget(QWidget):
         data_group = QGroupBox("データ管理")
         data_layout = QVBoxLayout(data_group)
         
+        retention_layout = QFormLayout()
+        self.history_retention = QSpinBox()
+        self.history_retention.setRange(0, 120)
+        self.history_retention.setSuffix(" か月")
+        self.history_retention.setSpecialValueText("無期限")
+        self.history_retention.setToolTip("これより古い転送履歴はアーカイブへ移します（重複判定には引き続き使われます）")
+        retention_layout.addRow("履歴の保持期間:", self.history_retention)
+        data_layout.addLayout(retention_layout)
+        
         self.clear_history_btn = QPushButton("転送履歴をクリア")
         self.clear_history_btn.clicked.connect(self._clear_history)
         data_layout.addWidget(self.clear_history_btn)
@@ -215,6 +260,9 @@ class SettingsWidget(QWidget):
         self.webhook_input.setText(config.webhook_url)
         self.webhook_username_input.setText(config.webhook_username)
         self.folder_input.setText(config.watch_folder)
+        self.roots_table.setRowCount(0)
+        for root in config.watch_roots:
+            self._append_root_row(root)
         self.monthly_thread_check.setChecked(config.enable_monthly_thread)
         self.instance_users_check.setChecked(config.enable_instance_users)
         self.compression_threshold.setValue(int(config.compression_threshold_mb))
@@ -227,6 +275,7 @@ class SettingsWidget(QWidget):
         index = self.log_level_combo.findText(config.log_level)
         if index >= 0:
             self.log_level_combo.setCurrentIndex(index)
+        self.history_retention.setValue(config.history_retention_months)
     
     def _save_settings(self):
         """設定を保存"""
@@ -234,6 +283,7 @@ class SettingsWidget(QWidget):
             webhook_url=self.webhook_input.text(),
             webhook_username=self.webhook_username_input.text() or "VRChat",
             watch_folder=self.folder_input.text(),
+            watch_roots=self._collect_watch_roots(),
             enable_monthly_thread=self.monthly_thread_check.isChecked(),
             enable_instance_users=self.instance_users_check.isChecked(),
             compression_threshold_mb=float(self.compression_threshold.value()),
@@ -242,7 +292,8 @@ class SettingsWidget(QWidget):
             enable_auto_watch=self.auto_watch_check.isChecked(),
             enable_sound_notification=self.sound_notification_check.isChecked(),
             enable_toast_notification=self.toast_notification_check.isChecked(),
-            log_level=self.log_level_combo.currentText()
+            log_level=self.log_level_combo.currentText(),
+            history_retention_months=self.history_retention.value()
         )
         
         # 自動起動設定を適用
@@ -271,13 +322,10 @@ class SettingsWidget(QWidget):
             QMessageBox.warning(self, "エラー", "Webhook URLを入力してください")
             return
         
-        webhook = DiscordWebhook(url)
-        success, message = webhook.test_connection()
-        
-        if success:
-            QMessageBox.information(self, "接続成功", message)
-        else:
-            QMessageBox.warning(self, "接続失敗", message)
+        dialog = WebhookCheckDialog(url, self)
+        self.test_webhook_btn.setEnabled(False)
+        dialog.destroyed.connect(lambda: self.test_webhook_btn.setEnabled(True))
+        dialog.start()
     
     def _browse_folder(self):
         """フォルダ選択ダイアログ"""
@@ -288,6 +336,59 @@ class SettingsWidget(QWidget):
         if folder:
             self.folder_input.setText(folder)
     
+    def _append_root_row(self, root: WatchRoot):
+        """監視ルートの行を追加"""
+        row = self.roots_table.rowCount()
+        self.roots_table.insertRow(row)
+        
+        path_item = QTableWidgetItem(root.path)
+        path_item.setFlags(path_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
+        self.roots_table.setItem(row, 0, path_item)
+        self.roots_table.setItem(row, 1, QTableWidgetItem(" ".join(root.extensions)))
+        self.roots_table.setItem(row, 2, QTableWidgetItem(root.webhook_url))
+        
+        policy_combo = QComboBox()
+        for policy, label in THREAD_POLICY_LABELS:
+            policy_combo.addItem(label, policy)
+        index = policy_combo.findData(root.thread_policy)
+        policy_combo.setCurrentIndex(max(index, 0))
+        self.roots_table.setCellWidget(row, 3, policy_combo)
+    
+    def _collect_watch_roots(self) -> list:
+        """テーブルから監視ルートを取得"""
+        roots = []
+        for row in range(self.roots_table.rowCount()):
+            path = self.roots_table.item(row, 0).text()
+            if not path:
+                continue
+            
+            extensions = []
+            for ext in self.roots_table.item(row, 1).text().replace(",", " ").split():
+                ext = ext.lower()
+                extensions.append(ext if ext.startswith(".") else f".{ext}")
+            
+            root = WatchRoot(
+                path=path,
+                webhook_url=self.roots_table.item(row, 2).text().strip(),
+                thread_policy=self.roots_table.cellWidget(row, 3).currentData()
+            )
+            if extensions:
+                root.extensions = extensions
+            roots.append(root)
+        return roots
+    
+    def _add_watch_root(self):
+        """監視フォルダを追加"""
+        folder = QFileDialog.getExistingDirectory(self, "追加の監視フォルダを選択")
+        if folder:
+            self._append_root_row(WatchRoot(path=folder))
+    
+    def _remove_watch_root(self):
+        """選択中の監視フォルダを削除"""
+        row = self.roots_table.currentRow()
+        if row >= 0:
+            self.roots_table.removeRow(row)
+    
     def _clear_history(self):
         """履歴をクリア"""
         reply = QMessageBox.question(
@@ -298,7 +399,11 @@ class SettingsWidget(QWidget):
         
         if reply == QMessageBox.StandardButton.Yes:
             from src.db.repository import transfer_repository
+            from src.db.retention import history_retention
+            from src.core.thumbnail_cache import thumbnail_cache
             transfer_repository.clear_all()
+            history_retention.clear_archive()
+            thumbnail_cache.clear()
             QMessageBox.information(self, "完了", "転送履歴を削除しました")
     
     def _reset_settings(self):
@@ -2,6 +2,8 @@
 VRChat Discord Uploader - タスクトレイ
 システムトレイアイコン・メニュー
 """
+from typing import Union
+
 from PyQt6.QtWidgets import QSystemTrayIcon, QMenu
 from PyQt6.QtGui import QIcon, QAction
 from PyQt6.QtCore import pyqtSignal, QObject
@@ -66,9 +68,9 @@ class SystemTray(QObject):
             self._tray_icon.hide()
     
     def show_message(self, title: str, message: str, 
-                     icon: QSystemTrayIcon.MessageIcon = QSystemTrayIcon.MessageIcon.Information,
+                     icon: Union[QSystemTrayIcon.MessageIcon, QIcon] = QSystemTrayIcon.MessageIcon.Information,
                      duration: int = 3000) -> None:
-        """トースト通知を表示"""
+        """トースト通知を表示（icon にQIconを渡すとサムネイルなどを表示できる）"""
         if self._tray_icon:
             self._tray_icon.showMessage(title, message, icon, duration)
     
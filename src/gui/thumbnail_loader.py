@@ -0,0 +1,143 @@
+"""
+VRChat Discord Uploader - サムネイル読み込み
+サムネイルキャッシュ（ディスク）からの読み込み・作成をバックグラウンドスレッドで行い、
+GUIスレッドでQPixmapに変換して容量上限つきのLRUキャッシュに保持する
+"""
+import threading
+from collections import OrderedDict, deque
+from typing import Optional
+
+from PyQt6.QtCore import Qt, QObject, QRunnable, QSize, QThreadPool, pyqtSignal
+from PyQt6.QtGui import QImage, QImageReader, QPixmap
+
+from src.core.thumbnail_cache import thumbnail_cache
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+THUMBNAIL_SIZE = QSize(128, 72)
+THUMBNAIL_CACHE_BYTES = 32 * 1024 * 1024  # 128x72で約900枚
+THUMBNAIL_QUEUE_MAX = 64  # 古い要求から捨てる（高速スクロール時は表示中の行だけ読み込む）
+THUMBNAIL_THREADS = 2
+
+
+def load_thumbnail_image(path: str, size: QSize = THUMBNAIL_SIZE) -> Optional[QImage]:
+    """画像をサイズ内に縮小して読み込む（任意のスレッドから呼べる）"""
+    reader = QImageReader(path)
+    reader.setAutoTransform(True)
+    original = reader.size()
+    if original.isValid():
+        # JPEGなどはデコード時に縮小できるため、先に縮小後のサイズを指定する
+        reader.setScaledSize(original.scaled(size, Qt.AspectRatioMode.KeepAspectRatio))
+    image = reader.read()
+    if image.isNull():
+        return None
+    if image.width() > size.width() or image.height() > size.height():
+        image = image.scaled(
+            size, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation
+        )
+    return image
+
+
+class _LoadTask(QRunnable):
+    """キューから最新の要求を1件取り出して読み込む"""
+    
+    def __init__(self, loader: "ThumbnailLoader"):
+        super().__init__()
+        self.loader = loader
+    
+    def run(self):
+        item = self.loader._take_request()
+        if item is None:
+            return
+        key, path = item
+        try:
+            # ディスクキャッシュになければ元画像から作成する
+            cached_path = thumbnail_cache.get_or_create(key, path)
+            image = load_thumbnail_image(str(cached_path), self.loader.size) if cached_path else None
+        except Exception as e:
+            logger.debug(f"サムネイルの読み込みに失敗しました: {path} ({e})")
+            image = None
+        self.loader._image_loaded.emit(key, image)
+
+
+class ThumbnailLoader(QObject):
+    """サムネイルの非同期読み込みとLRUキャッシュ
+    
+    get() はキャッシュにあればQPixmapを返し、なければ読み込みを登録して
+    Noneを返す。読み込みが終わると thumbnail_ready(key) が発火する。
+    """
+    
+    thumbnail_ready = pyqtSignal(str)
+    _image_loaded = pyqtSignal(str, object)  # key, QImage または None
+    
+    def __init__(self, size: QSize = THUMBNAIL_SIZE,
+                 cache_bytes: int = THUMBNAIL_CACHE_BYTES, parent=None):
+        super().__init__(parent)
+        self.size = size
+        self.cache_bytes = cache_bytes
+        self._cache: "OrderedDict[str, Optional[QPixmap]]" = OrderedDict()
+        self._cached_bytes = 0
+        self._requests: deque = deque()
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(THUMBNAIL_THREADS)
+        self._image_loaded.connect(self._on_image_loaded)
+    
+    def get(self, key: str, path: str) -> Optional[QPixmap]:
+        """サムネイルを取得（未読み込みならバックグラウンドで読み込む）
+        
+        Args:
+            key: キャッシュのキー（ファイルハッシュ）
+            path: 画像ファイルのパス
+        """
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+        
+        with self._lock:
+            if key in self._pending:
+                return None
+            if len(self._requests) >= THUMBNAIL_QUEUE_MAX:
+                dropped, _ = self._requests.popleft()
+                self._pending.discard(dropped)
+            self._requests.append((key, path))
+            self._pending.add(key)
+        self._pool.start(_LoadTask(self))
+        return None
+    
+    def clear(self) -> None:
+        """キャッシュと未処理の要求を破棄"""
+        with self._lock:
+            self._requests.clear()
+            self._pending.clear()
+        self._cache.clear()
+        self._cached_bytes = 0
+    
+    def _take_request(self):
+        with self._lock:
+            if not self._requests:
+                return None
+            return self._requests.pop()  # 最後に要求されたもの（表示中の行）から
+    
+    def _on_image_loaded(self, key: str, image: Optional[QImage]) -> None:
+        with self._lock:
+            if key not in self._pending:
+                return  # clear() 済み
+            self._pending.discard(key)
+        
+        # 読み込めない画像（削除済みなど）もNoneとして記録し、再読み込みしない
+        pixmap = QPixmap.fromImage(image) if image is not None else None
+        self._cache[key] = pixmap
+        self._cached_bytes += self._entry_bytes(pixmap)
+        while self._cached_bytes > self.cache_bytes and len(self._cache) > 1:
+            _, evicted = self._cache.popitem(last=False)
+            self._cached_bytes -= self._entry_bytes(evicted)
+        self.thumbnail_ready.emit(key)
+    
+    @staticmethod
+    def _entry_bytes(pixmap: Optional[QPixmap]) -> int:
+        if pixmap is None:
+            return 64
+        return pixmap.width() * pixmap.height() * 4
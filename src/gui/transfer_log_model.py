@@ -0,0 +1,84 @@
+"""
+VRChat Discord Uploader - 転送ログのモデル
+ダッシュボードの転送ログ（新しいものが先頭）を保持し、
+追加・削除した行だけをビューへ通知する
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional
+
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex
+from PyQt6.QtGui import QColor
+
+from src.db.models import TransferRecord
+
+LOG_MAX_ROWS = 100
+
+
+@dataclass
+class LogEntry:
+    """転送ログの1行"""
+    text: str
+    is_error: bool = False
+
+
+def format_record(record: TransferRecord) -> str:
+    """転送履歴の表示用テキスト"""
+    text = f"✓ {record.filename}"
+    if record.was_compressed and record.file_size_original and record.file_size_compressed:
+        orig_mb = record.file_size_original / 1024 / 1024
+        comp_mb = record.file_size_compressed / 1024 / 1024
+        text += f" (圧縮: {orig_mb:.1f}MB → {comp_mb:.1f}MB)"
+    return text
+
+
+class TransferLogModel(QAbstractListModel):
+    """転送ログのモデル"""
+    
+    def __init__(self, max_rows: int = LOG_MAX_ROWS, parent=None):
+        super().__init__(parent)
+        self.max_rows = max_rows
+        self._entries: List[LogEntry] = []
+    
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(self._entries)
+    
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._entries):
+            return None
+        entry = self._entries[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return entry.text
+        if role == Qt.ItemDataRole.ForegroundRole and entry.is_error:
+            return QColor(Qt.GlobalColor.red)
+        return None
+    
+    def add_message(self, message: str, is_error: bool = False,
+                    timestamp: Optional[datetime] = None) -> None:
+        """メッセージを先頭に追加"""
+        icon = "⚠" if is_error else "✓"
+        timestamp = timestamp or datetime.now()
+        self.beginInsertRows(QModelIndex(), 0, 0)
+        self._entries.insert(0, LogEntry(f"[{timestamp:%H:%M:%S}] {icon} {message}", is_error))
+        self.endInsertRows()
+        self._trim()
+    
+    def append_history(self, records: List[TransferRecord]) -> None:
+        """過去の転送履歴を末尾に追加（起動時の表示用）"""
+        rows = min(len(records), self.max_rows - len(self._entries))
+        if rows <= 0:
+            return
+        start = len(self._entries)
+        self.beginInsertRows(QModelIndex(), start, start + rows - 1)
+        self._entries.extend(LogEntry(format_record(record)) for record in records[:rows])
+        self.endInsertRows()
+    
+    def _trim(self) -> None:
+        excess = len(self._entries) - self.max_rows
+        if excess <= 0:
+            return
+        self.beginRemoveRows(QModelIndex(), self.max_rows, len(self._entries) - 1)
+        del self._entries[self.max_rows:]
+        self.endRemoveRows()
@@ -0,0 +1,97 @@
+"""
+VRChat Discord Uploader - Webhook接続確認ダイアログ
+接続確認をワーカースレッドで行い、中断できる進行表示を出す
+"""
+import threading
+from typing import Optional
+
+from PyQt6.QtWidgets import QWidget, QProgressDialog, QMessageBox
+from PyQt6.QtCore import Qt, QThread, pyqtSignal
+
+from src.core.webhook_check import webhook_checker, WebhookCheckResult
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+# 中断後も通信が終わるまでワーカーを保持する（実行中のQThreadを破棄しない）
+_running_workers = set()
+
+
+class WebhookCheckWorker(QThread):
+    """非同期でWebhookの接続確認を行うワーカー"""
+    
+    checked = pyqtSignal(object)  # WebhookCheckResult（中断された場合は発火しない）
+    
+    def __init__(self, webhook_url: str, use_cache: bool = True):
+        super().__init__()
+        self.webhook_url = webhook_url
+        self.use_cache = use_cache
+        self._cancel_event = threading.Event()
+    
+    def cancel(self):
+        """中断（通信中の要求は完了を待たずに結果を破棄する）"""
+        self._cancel_event.set()
+    
+    def run(self):
+        try:
+            result = webhook_checker.check(self.webhook_url, self._cancel_event, self.use_cache)
+        except Exception as e:
+            logger.error(f"接続確認エラー: {e}")
+            result = WebhookCheckResult(False, f"接続エラー: {str(e)}")
+        if result is not None and not self._cancel_event.is_set():
+            self.checked.emit(result)
+
+
+class WebhookCheckDialog(QProgressDialog):
+    """接続確認の進行表示
+    
+    結果はメッセージボックスで表示し、checked シグナルでも通知する。
+    期限内の確認結果があれば通信せずにすぐ表示する。
+    """
+    
+    checked = pyqtSignal(object)  # WebhookCheckResult
+    
+    def __init__(self, webhook_url: str, parent: Optional[QWidget] = None):
+        super().__init__("Webhookに接続しています…", "中止", 0, 0, parent)
+        self.webhook_url = webhook_url
+        self.setWindowTitle("接続確認")
+        self.setWindowModality(Qt.WindowModality.WindowModal)
+        self.setMinimumDuration(300)  # すぐに終われば表示しない
+        self.setAutoClose(False)
+        self.setAutoReset(False)
+        self.canceled.connect(self._on_canceled)
+        self._worker: Optional[WebhookCheckWorker] = None
+    
+    def start(self):
+        """確認を開始"""
+        cached = webhook_checker.get_cached(self.webhook_url)
+        if cached is not None:
+            self._on_checked(cached)
+            return
+        
+        worker = WebhookCheckWorker(self.webhook_url)
+        worker.checked.connect(self._on_checked)
+        worker.finished.connect(lambda: _running_workers.discard(worker))
+        _running_workers.add(worker)
+        self._worker = worker
+        worker.start()
+    
+    def _on_canceled(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+        logger.info("接続確認を中止しました")
+        self.deleteLater()
+    
+    def _on_checked(self, result: WebhookCheckResult):
+        self._worker = None
+        self.reset()
+        self.hide()
+        
+        parent = self.parentWidget()
+        if result.success:
+            QMessageBox.information(parent, "接続成功", result.summary())
+        else:
+            QMessageBox.warning(parent, "接続失敗", result.summary())
+        self.checked.emit(result)
+        self.deleteLater()
@@ -0,0 +1,139 @@
+"""
+VRChat Discord Uploader - ヘッドレスモード
+Qtを使わずにファイル監視と転送を行う常駐サービス。制御用ソケット（src.core.control_server）で操作する
+"""
+import signal
+import threading
+import time
+from typing import Optional, Set
+
+from src.constants import APP_NAME
+from src.core.config_manager import config_manager, Config
+from src.core.control_commands import TransferCommands
+from src.core.control_server import ControlServer
+from src.core.file_watcher import FileWatcher
+from src.core.transfer_pipeline import TransferPipeline, TransferQueue
+from src.core.vrchat_log_parser import vrchat_log_parser
+from src.db.retention import history_retention
+from src.utils.logger import setup_logger, get_logger
+
+logger = get_logger()
+
+MAINTENANCE_CHECK_SECONDS = 10 * 60  # アイドル時の履歴アーカイブ・DB最適化の確認間隔
+
+
+class HeadlessService:
+    """ヘッドレスモードの常駐サービス
+    
+    GUIと同じ TransferPipeline で転送し、監視で見つけたファイルと
+    制御コマンドで受け取ったファイルを同じ転送待ちキューに入れる。
+    """
+    
+    def __init__(self):
+        self.pipeline = TransferPipeline()
+        self.queue = TransferQueue(self.pipeline)
+        self.file_watcher: Optional[FileWatcher] = None
+        self.commands = TransferCommands(
+            self.pipeline, self.queue, "headless",
+            is_watching=lambda: bool(self.file_watcher and self.file_watcher.is_running),
+            on_shutdown=self.request_stop
+        )
+        self.control_server = ControlServer(self.commands)
+        self._stop_event = threading.Event()
+    
+    def start(self) -> bool:
+        """サービスを開始（既に起動中のインスタンスがある場合などはFalse）"""
+        if not self.control_server.start():
+            logger.error("既に起動中のインスタンスがあります")
+            return False
+        
+        config = config_manager.config
+        if not config.webhook_url:
+            logger.error("Webhook URLが設定されていません")
+            self.control_server.stop()
+            return False
+        
+        self.pipeline.load_config(config)
+        self.queue.start()
+        
+        # config.json の編集は変わった項目だけ反映する（監視・転送は止めない）
+        config_manager.add_listener(self._on_config_changed)
+        config_manager.start_watching()
+        
+        # VRChatが古いログを削除する前にイベントストアへ取り込む
+        threading.Thread(target=vrchat_log_parser.ingest_logs, daemon=True).start()
+        
+        self.file_watcher = FileWatcher(config.all_watch_roots(), self.queue.put)
+        if not self.file_watcher.start():
+            # 監視できなくても制御コマンドでの転送は受け付ける
+            logger.warning("ファイル監視を開始できませんでした")
+        return True
+    
+    def run(self) -> None:
+        """停止要求まで待機（メインスレッドで呼ぶ）"""
+        next_maintenance = time.monotonic() + MAINTENANCE_CHECK_SECONDS
+        # シグナルを受け取れるよう、短い間隔で待つ
+        while not self._stop_event.wait(1.0):
+            if time.monotonic() >= next_maintenance:
+                next_maintenance = time.monotonic() + MAINTENANCE_CHECK_SECONDS
+                self._run_idle_maintenance()
+    
+    def request_stop(self) -> None:
+        self._stop_event.set()
+    
+    def stop(self) -> None:
+        """監視・転送・制御用ソケットを停止"""
+        config_manager.stop_watching()
+        config_manager.remove_listener(self._on_config_changed)
+        if self.file_watcher:
+            self.file_watcher.stop()
+        self.queue.stop()
+        self.control_server.stop()
+    
+    def _on_config_changed(self, config: Config, changed: Set[str]) -> None:
+        """設定の変更を反映（設定ファイルの監視スレッドから呼ばれる）"""
+        self.pipeline.apply_config(config, changed)
+        if changed & {"watch_folder", "watch_roots"} and self.file_watcher:
+            self.file_watcher.update_roots(config.all_watch_roots())
+        if "log_level" in changed:
+            setup_logger(config.log_level)
+    
+    def _run_idle_maintenance(self) -> None:
+        """転送していない間に履歴のアーカイブとDBの最適化を行う"""
+        if not self.queue.is_idle or not history_retention.is_due():
+            return
+        threading.Thread(
+            target=history_retention.run_maintenance,
+            args=(config_manager.config.history_retention_months,),
+            daemon=True
+        ).start()
+
+
+def main() -> int:
+    """ヘッドレスモードのエントリーポイント"""
+    config = config_manager.config
+    setup_logger(config.log_level)
+    
+    logger.info("=" * 50)
+    logger.info(f"{APP_NAME} をヘッドレスモードで起動しています...")
+    
+    service = HeadlessService()
+    if not service.start():
+        return 1
+    
+    def on_signal(signum, frame):
+        logger.info(f"終了シグナルを受信しました ({signum})")
+        service.request_stop()
+    
+    signal.signal(signal.SIGINT, on_signal)
+    signal.signal(signal.SIGTERM, on_signal)
+    if hasattr(signal, "SIGBREAK"):
+        signal.signal(signal.SIGBREAK, on_signal)  # Windowsのコンソールを閉じたとき
+    
+    try:
+        service.run()
+    finally:
+        service.stop()
+    
+    logger.info("ヘッドレスモードを終了しました")
+    return 0
@@ -4,13 +4,14 @@ Webhook URLのAES-256暗号化・復号化
 """
 import os
 from pathlib import Path
-from cryptography.fernet import Fernet
 
 from src.constants import ENCRYPTION_KEY_FILE, APPDATA_DIR
 
 
 def _ensure_key_file() -> bytes:
     """暗号化キーファイルを確保し、キーを返す"""
+    from cryptography.fernet import Fernet
+    
     APPDATA_DIR.mkdir(parents=True, exist_ok=True)
     
     if ENCRYPTION_KEY_FILE.exists():
@@ -23,18 +24,23 @@ def _ensure_key_file() -> bytes:
         return key
 
 
+def _get_fernet():
+    """Fernetを生成（cryptographyはWebhook URLを扱うときに読み込む）"""
+    from cryptography.fernet import Fernet
+    
+    return Fernet(_ensure_key_file())
+
+
 def encrypt(plaintext: str) -> str:
     """文字列を暗号化してBase64エンコードされた文字列を返す"""
-    key = _ensure_key_file()
-    fernet = Fernet(key)
+    fernet = _get_fernet()
     encrypted = fernet.encrypt(plaintext.encode("utf-8"))
     return encrypted.decode("utf-8")
 
 
 def decrypt(ciphertext: str) -> str:
     """暗号化された文字列を復号化して元の文字列を返す"""
-    key = _ensure_key_file()
-    fernet = Fernet(key)
+    fernet = _get_fernet()
     decrypted = fernet.decrypt(ciphertext.encode("utf-8"))
     return decrypted.decode("utf-8")
 
@@ -42,8 +48,7 @@ def decrypt(ciphertext: str) -> str:
 def is_encrypted(text: str) -> bool:
     """文字列が暗号化されているかどうかを判定"""
     try:
-        key = _ensure_key_file()
-        fernet = Fernet(key)
+        fernet = _get_fernet()
         fernet.decrypt(text.encode("utf-8"))
         return True
     except Exception:
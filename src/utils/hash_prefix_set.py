@@ -0,0 +1,45 @@
+"""
+VRChat Discord Uploader - ハッシュ接頭辞集合
+「確実に未登録」をDBに問い合わせずに判定するための、SHA-256（16進）の
+先頭32ビットをソート済み配列で保持する集合
+
+1件あたり4バイト（100万件で約4MB）。誤検出率は 件数 / 2^32
+（100万件で約0.02%）で、偽陰性はない。
+"""
+import bisect
+import zlib
+from array import array
+from typing import Iterable
+
+PREFIX_HEX_DIGITS = 8  # 32ビット
+
+
+def _prefix(file_hash: str) -> int:
+    try:
+        return int(file_hash[:PREFIX_HEX_DIGITS], 16)
+    except ValueError:
+        # 16進でないキーでも一貫した値になればよい
+        return zlib.crc32(file_hash.encode("utf-8"))
+
+
+class HashPrefixSet:
+    """ハッシュ接頭辞のソート済み配列（偽陽性あり・偽陰性なし）"""
+    
+    def __init__(self, hashes: Iterable[str] = ()):
+        self._prefixes = array("I", sorted(_prefix(h) for h in hashes))
+    
+    def add(self, file_hash: str) -> None:
+        bisect.insort(self._prefixes, _prefix(file_hash))
+    
+    def __contains__(self, file_hash: str) -> bool:
+        prefixes = self._prefixes
+        value = _prefix(file_hash)
+        i = bisect.bisect_left(prefixes, value)
+        return i < len(prefixes) and prefixes[i] == value
+    
+    def __len__(self) -> int:
+        return len(self._prefixes)
+    
+    @property
+    def size_bytes(self) -> int:
+        return self._prefixes.itemsize * len(self._prefixes)
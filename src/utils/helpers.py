@@ -1,6 +1,7 @@
 """
 VRChat Discord Uploader - ヘルパー関数
 """
+import re
 import hashlib
 from pathlib import Path
 from datetime import datetime
@@ -68,3 +69,9 @@ def mask_webhook_url(url: str) -> str:
     if len(url) > 30:
         return url[:20] + "..." + url[-10:]
     return "●" * len(url)
+
+
+def get_webhook_id(url: str) -> Optional[str]:
+    """Webhook URLからWebhook IDを取得"""
+    match = re.search(r"/webhooks/(\d+)/", url or "")
+    return match.group(1) if match else None
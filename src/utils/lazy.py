@@ -0,0 +1,41 @@
+"""
+VRChat Discord Uploader - 遅延初期化
+DBを開くなど初期化の重いシングルトンを、import時ではなく初めて使うときに生成する
+"""
+import threading
+from typing import Callable, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class LazySingleton(Generic[T]):
+    """初めて属性にアクセスしたときにインスタンスを生成するプロキシ
+    
+    `from module import instance` の形でimportしていても、生成は最初に使った
+    スレッドで行われる。GUIスレッドで初期化させないよう、起動時はワーカースレッドから使う。
+    """
+    
+    def __init__(self, factory: Callable[[], T]):
+        object.__setattr__(self, "_lazy_factory", factory)
+        object.__setattr__(self, "_lazy_instance", None)
+        object.__setattr__(self, "_lazy_lock", threading.Lock())
+    
+    def _lazy_get(self) -> T:
+        """インスタンスを取得（未生成なら生成する）
+        
+        プロキシ自身の属性は生成するオブジェクトの属性と衝突しないよう _lazy_ で始める。
+        """
+        instance: Optional[T] = self._lazy_instance
+        if instance is None:
+            with self._lazy_lock:
+                instance = self._lazy_instance
+                if instance is None:
+                    instance = self._lazy_factory()
+                    object.__setattr__(self, "_lazy_instance", instance)
+        return instance
+    
+    def __getattr__(self, name: str):
+        return getattr(self._lazy_get(), name)
+    
+    def __setattr__(self, name: str, value) -> None:
+        setattr(self._lazy_get(), name, value)